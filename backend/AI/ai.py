@@ -7,13 +7,15 @@ from sklearn.metrics import classification_report, accuracy_score
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import LabelEncoder
 
+from corpus import load_corpus
+
 # ---------------------------------------------------------
 # 1) Charger le dataset
 # ---------------------------------------------------------
 
 
-# Read with detected encoding
-CVs = pd.read_csv("utils/Resume.csv")
+# Lecture par morceaux, sans la colonne Resume_html (voir corpus.py)
+CVs = load_corpus("utils/Resume.csv").to_frame()
 
 print("\n✅ Dataset chargé avec succès")
 print(f"Nombre de CVs : {len(CVs)}")
@@ -28,7 +30,6 @@ print(CVs.info())
 # 2) Préparer les données
 # ---------------------------------------------------------
 print("\n🔧 Préparation du texte des CVs...")
-CVs['CV_text'] = CVs['Resume_str'].fillna('') + ' ' + CVs['Resume_html'].fillna('')
 X = CVs['CV_text']
 y= CVs['Category']
 le = LabelEncoder()
@@ -21,11 +21,16 @@ import json
 from datetime import datetime
 import re
 
+from corpus import load_corpus
+from corpus_index import CorpusIndex, DEFAULT_INDEX_DIR, index_key
+from model_store import file_sha256
+
 # ---------------------------------------------------------
 # 1) Charger le dataset
 # ---------------------------------------------------------
 print("🔄 Chargement du dataset...")
-CVs = pd.read_csv("utils/Resume.csv", encoding='latin-1')
+# Lecture par morceaux, sans la colonne Resume_html (voir corpus.py)
+CVs = load_corpus("utils/Resume.csv").to_frame()
 print("\n✅ Dataset chargé avec succès")
 print(f"Nombre de CVs : {len(CVs)}")
 print(CVs.head())
@@ -38,7 +43,6 @@ print(f"Colonnes : {CVs.columns.tolist()}")
 # 2) Préparer les données
 # ---------------------------------------------------------
 print("\n🔧 Préparation des données...")
-CVs['CV_text'] = CVs['Resume_str'].fillna('') + ' ' + CVs['Resume_html'].fillna('')
 
 # Encoder les catégories
 le = LabelEncoder()
@@ -71,6 +75,21 @@ clf.fit(X_train_vec, y_train)
 pred = clf.predict(X_test_vec)
 print(f"\n📊 Accuracy : {accuracy_score(y_test, pred):.3f}")
 
+# ---------------------------------------------------------
+# 4) Index du corpus (vecteurs + probabilités calculés une fois)
+# ---------------------------------------------------------
+INDEX_KEY = index_key(file_sha256("utils/Resume.csv"), {
+    'vectorizer': vectorizer.get_params(),
+    'clf': clf.get_params(),
+    'split': {'test_size': 0.2, 'random_state': 42},
+    'html': 'skip',
+})
+corpus_index = CorpusIndex.load(DEFAULT_INDEX_DIR, INDEX_KEY)
+if corpus_index is None:
+    corpus_index = CorpusIndex.build(
+        DEFAULT_INDEX_DIR, INDEX_KEY, vectorizer, clf, CVs['CV_text'], CVs['Category']
+    )
+
 
 # ========================== FILTRAGE DES CV ==========================
 
@@ -93,8 +112,11 @@ def select_best_candidates(
     - Description du poste (scoring)
     - Nombre de postes disponibles
     
+    Les CV sont filtrés et scorés dans corpus_index: df ne sert qu'à
+    retrouver leurs lignes, ce doit être le DataFrame indexé (CVs).
+    
     Args:
-        df: DataFrame avec colonnes 'CV_text' et 'Category'
+        df: DataFrame des CV indexés par corpus_index (mêmes lignes, même ordre)
         target_category: Catégorie recherchée (ex: "Data Science", "Java Developer")
         job_description: Description détaillée du poste
         nb_postes: Nombre de candidats à sélectionner
@@ -104,37 +126,31 @@ def select_best_candidates(
         DataFrame avec les meilleurs candidats classés
     """
     
+    # Les positions de l'index ne valent que pour le DataFrame indexé
+    if len(df) != corpus_index.meta['shape'][0]:
+        raise ValueError(
+            f"df has {len(df)} rows but the corpus index was built from "
+            f"{corpus_index.meta['shape'][0]}"
+        )
+    
     print(f"\n🎯 Recherche de candidats pour: {target_category}")
     print(f"   Nombre de postes: {nb_postes}")
     
-    # 1) Filtrer par catégorie
-    filtered_cvs = df[df['Category'] == target_category].copy() 
-    
-    if len(filtered_cvs) == 0:
+    # 1) Filtrer par catégorie (lignes précalculées dans l'index)
+    if target_category not in corpus_index.categories:
         print(f"❌ Aucun CV trouvé dans la catégorie '{target_category}'")
         return pd.DataFrame()
     
-    print(f"✅ {len(filtered_cvs)} CV trouvés dans cette catégorie")
-    
     # 2) Calculer le score de pertinence pour chaque CV
-    cv_texts = filtered_cvs['CV_text'].tolist()
-    
-    # Vectoriser les CV + job description
-    all_texts = cv_texts + [job_description]
-    all_vectors = vectorizer.transform(all_texts)
-    
-    # Probabilités de correspondance à la catégorie
-    probas = clf.predict_proba(all_vectors[:-1])
-    
-    # Récupérer l'index de la catégorie cible
+    # Seule la description du poste est vectorisée, les CV sont dans l'index
+    job_vector = vectorizer.transform([job_description])
     target_idx = le.transform([target_category])[0]
-    category_scores = probas[:, target_idx]
+    rows, category_scores, similarity_scores = corpus_index.search(
+        target_category, job_vector, target_idx
+    )
     
-    # Similarité cosinus avec la job description
-    from sklearn.metrics.pairwise import cosine_similarity
-    job_vector = all_vectors[-1]
-    cv_vectors = all_vectors[:-1]
-    similarity_scores = cosine_similarity(cv_vectors, job_vector).flatten()
+    filtered_cvs = df.iloc[rows].copy()
+    print(f"✅ {len(filtered_cvs)} CV trouvés dans cette catégorie")
     
     # Score combiné (moyenne pondérée)
     final_scores = (0.4 * category_scores) + (0.6 * similarity_scores)
@@ -1,69 +1,45 @@
 #!/usr/bin/env python3
 """
 cv_screening.py - Script de screening de CV avec intégration API
-Usage: python cv_screening.py <json_data_file>
+Usage: python cv_screening.py <json_data_file> [--stream] [--quiet] [--metrics] [--profile <path>]
+       [--model <bundle>] [--classifier forest|linear] [--prefilter off|bound|heuristic]
+       [--vector-store] [--report <ndjson|dossier.parquet> [--resume]] [--dedup off|exact|near]
+       [--featurizer tfidf|compact|hashing]
+       python cv_screening.py --selftest   (rapport de temps de démarrage)
+       (le fichier contient 'resume_paths' et 'job', ou 'jobs' pour plusieurs postes;
+        'search_pool' au lieu de 'resume_paths' cherche dans tout le stock de vecteurs)
+       python cv_screening.py --serve [--socket <path>] [--workers <n>]
+                                  [--queue [--tenant-workers <n>]] [--processes <n>]
 """
 
 import sys
+import os
+import argparse
+import cProfile
+import tracemalloc
+import time
 import json
-import pandas as pd
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import LabelEncoder
-import PyPDF2
-import pdfplumber
-import docx2txt
-import re
-from pathlib import Path
+import importlib
 
-# ==================== EXTRACTION DE TEXTE ====================
+# Début de l'import du module (rapport --selftest)
+_IMPORT_START = time.perf_counter()
 
-def extract_text_from_pdf(pdf_path):
-    """Extrait le texte d'un PDF"""
-    text = ""
-    try:
-        # Méthode 1: pdfplumber (meilleure pour la plupart des PDFs)
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        
-        # Si pdfplumber échoue, essayer PyPDF2
-        if not text.strip():
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-    except Exception as e:
-        print(f"⚠️ Error extracting text from {pdf_path}: {e}", file=sys.stderr)
-    
-    return text.strip()
-
-def extract_text_from_docx(docx_path):
-    """Extrait le texte d'un DOCX"""
-    try:
-        text = docx2txt.process(docx_path)
-        return text.strip()
-    except Exception as e:
-        print(f"⚠️ Error extracting text from {docx_path}: {e}", file=sys.stderr)
-        return ""
+import numpy as np
+from pathlib import Path
 
-def extract_resume_text(file_path):
-    """Extrait le texte d'un CV (PDF ou DOCX)"""
-    file_path = Path(file_path)
-    
-    if file_path.suffix.lower() == '.pdf':
-        return extract_text_from_pdf(file_path)
-    elif file_path.suffix.lower() in ['.docx', '.doc']:
-        return extract_text_from_docx(file_path)
-    else:
-        print(f"⚠️ Unsupported file format: {file_path}", file=sys.stderr)
-        return ""
+from extraction import (
+    cache_version, extract_text_from_pdf, extract_text_from_docx, extract_resume_text,
+    extract_many
+)
+from instrumentation import Metrics, stage
+from linear_scorer import LinearCategoryScorer
+from prefilter import PREFILTER_MODES, prefilter_config, prefilter_mask
+from dedup import DEDUP_MODES, DuplicateIndex, dedup_config
+from featurizer import FEATURIZERS, DEFAULT_HASH_FEATURES, HashedTfidfVectorizer, compact_vectorizer
+from model_store import (
+    DEFAULT_BUNDLE_PATH, LINEAR_BUNDLE_PATH, dataset_fingerprint, model_version,
+    save_bundle, load_bundle
+)
 
 # ==================== CHARGEMENT DU MODÈLE ====================
 
@@ -72,51 +48,196 @@ SCRIPT_DIR = Path(__file__).parent.absolute()
 # The dataset is in the utils folder at the project root
 DATASET_PATH = SCRIPT_DIR.parent.parent / 'utils' / 'Resume.csv'
 
+# Paramètres du modèle (toute modification invalide le bundle sauvegardé)
+MODEL_PARAMS = {
+    'max_features': 5000,
+    'stop_words': 'english',
+    'ngram_range': (1, 2),
+    'n_estimators': 100,
+    'random_state': 42,
+    # Resume_html duplique Resume_str avec du balisage (voir corpus.py)
+    'html': 'skip',
+}
+
+# Variante linéaire: même TF-IDF, régression logistique un-contre-tous
+# (voir linear_scorer.py) à la place de la forêt pour le score de catégorie
+LINEAR_MODEL_PARAMS = {
+    'max_features': MODEL_PARAMS['max_features'],
+    'stop_words': MODEL_PARAMS['stop_words'],
+    'ngram_range': MODEL_PARAMS['ngram_range'],
+    'classifier': 'linear',
+    'C': 10.0,
+    'max_iter': 300,
+    'html': MODEL_PARAMS['html'],
+}
+
+# Classificateur -> (paramètres, bundle par défaut)
+CLASSIFIERS = {
+    'forest': (MODEL_PARAMS, DEFAULT_BUNDLE_PATH),
+    'linear': (LINEAR_MODEL_PARAMS, LINEAR_BUNDLE_PATH),
+}
+
+# Featurizer 'hashing' (voir featurizer.py): pas de vocabulaire, autre espace
+# de features, donc d'autres paramètres et un bundle à part
+HASHING_PARAMS = {
+    'featurizer': 'hashing',
+    'n_features': DEFAULT_HASH_FEATURES,
+}
+
+def model_config(classifier='forest', featurizer='tfidf'):
+    """Paramètres et bundle par défaut d'un classificateur et d'un featurizer"""
+    params, bundle_path = CLASSIFIERS[classifier]
+    if featurizer == 'hashing':
+        params = {key: value for key, value in params.items() if key != 'max_features'}
+        params.update(HASHING_PARAMS)
+        bundle_path = bundle_path.with_name(f"{bundle_path.stem}_hashing{bundle_path.suffix}")
+    return params, bundle_path
+
 class CVScreener:
-    def __init__(self, dataset_path=None):
-        """Initialise le screener avec le dataset"""
+    def __init__(self, dataset_path=None, model_path=None, retrain=False, verbose=True,
+                 trust_model=False, classifier='forest', prefilter='off', dedup='off',
+                 shared_model=None, featurizer='tfidf'):
+        """
+        Initialise le screener
+
+        Charge le bundle sauvegardé s'il est encore valide, sinon entraîne
+        le modèle sur le dataset puis sauvegarde le bundle.
+        trust_model=True charge model_path tel quel (ex: bundle incrémental)
+        sans vérifier le dataset ni les paramètres, et ne réentraîne jamais.
+        classifier: 'forest' (RandomForest) ou 'linear' (score de catégorie
+        par un seul produit creux, voir linear_scorer.py).
+        prefilter: mode du pré-filtre pour les postes qui n'en précisent pas
+        ('off', 'bound' ou 'heuristic', voir prefilter.py).
+        dedup: regroupement des CV en double pour les requêtes qui ne le
+        précisent pas ('off', 'exact', 'near' ou un dict, voir dedup.py).
+        shared_model: dossier écrit par shared_model.export_model; le modèle
+        est alors ouvert en mémoire mappée, sans bundle ni dataset.
+        featurizer: 'tfidf' (TfidfVectorizer), 'compact' (même modèle,
+        vocabulaire figé en tableaux, transform plus rapide) ou 'hashing'
+        (modèle entraîné sur des features hachées), voir featurizer.py.
+        verbose=False désactive le résumé des scores sur stderr.
+        """
+        self.verbose = verbose
+        self.prefilter = prefilter
+        self.dedup = dedup
+        if featurizer not in FEATURIZERS:
+            raise ValueError(f"featurizer must be one of {FEATURIZERS}, got {featurizer!r}")
+        self.featurizer = featurizer
+        self.params, default_model_path = model_config(classifier, featurizer)
         print("🔄 Loading CV screening model...", file=sys.stderr)
         
+        if shared_model is not None:
+            from shared_model import load_model
+            
+            with stage('model_load'):
+                model = load_model(shared_model)
+            if model is None:
+                raise RuntimeError(f"Cannot load shared model: {shared_model}")
+            self.vectorizer = model['vectorizer']
+            self.clf = model['clf']
+            self.le = model['le']
+            self.model_version = model['model_version']
+            print(f"✅ Shared model mapped from: {shared_model}", file=sys.stderr)
+            return
+        
         # Use the provided path or default to the calculated absolute path
         if dataset_path is None:
             dataset_path = DATASET_PATH
+        if model_path is None:
+            model_path = default_model_path
         
-        # Charger le dataset
-        print(f"📂 Loading dataset from: {dataset_path}", file=sys.stderr)
-        self.CVs = pd.read_csv(dataset_path, encoding='latin-1')
-        print(f"✅ Dataset loaded: {len(self.CVs)} CVs", file=sys.stderr)
-        print(f"Colonnes : {self.CVs.columns.tolist()}", file=sys.stderr)
-        # Préparer les données
-        self.CVs['CV_text'] = (
-            self.CVs['Resume_str'].fillna('') + ' ' + 
-            self.CVs['Resume_html'].fillna('')
-        )
+        # Chemin rapide: modèle déjà entraîné
+        with stage('model_load'):
+            if trust_model:
+                bundle = load_bundle(model_path)
+                if bundle is None:
+                    raise RuntimeError(f"Cannot load model bundle: {model_path}")
+            else:
+                bundle = None if retrain else load_bundle(model_path, dataset_path, self.params)
+        if bundle is not None:
+            self.vectorizer = self._featurize(bundle['vectorizer'])
+            self.clf = bundle['clf']
+            self.le = bundle['le']
+            self.model_version = model_version(bundle['dataset'], bundle['params'])
+            print(f"✅ Model loaded from: {model_path}", file=sys.stderr)
+            return
         
-        # Encoder les catégories
-        self.le = LabelEncoder()
-        self.CVs['Category_encoded'] = self.le.fit_transform(self.CVs['Category'])
+        self._load_dataset(dataset_path)
         
         # Entraîner le modèle
         self._train_model()
         
+        fingerprint = dataset_fingerprint(dataset_path)
+        self.model_version = model_version(fingerprint, self.params)
+        try:
+            save_bundle(
+                model_path, self.vectorizer, self.clf, self.le, fingerprint, self.params
+            )
+        except OSError as e:
+            print(f"⚠️ Could not save model bundle: {e}", file=sys.stderr)
+        self.vectorizer = self._featurize(self.vectorizer)
+        
         print("✅ Model loaded successfully", file=sys.stderr)
     
+    def _featurize(self, vectorizer):
+        """Vectorizer utilisé pour le screening (même espace de features)"""
+        if self.featurizer == 'compact':
+            with stage('featurizer_compact'):
+                return compact_vectorizer(vectorizer)
+        return vectorizer
+    
+    def _load_dataset(self, dataset_path):
+        """Charge le dataset et prépare les textes et catégories"""
+        # pandas n'est nécessaire que pour l'entraînement
+        from corpus import load_corpus
+        from sklearn.preprocessing import LabelEncoder
+        
+        print(f"📂 Loading dataset from: {dataset_path}", file=sys.stderr)
+        with stage('csv_load'):
+            self.corpus = load_corpus(dataset_path, html_mode=self.params['html'])
+        
+        # Encoder les catégories (mêmes classes triées que le corpus)
+        self.le = LabelEncoder().fit(self.corpus.classes)
+    
     def _train_model(self):
         """Entraîne le modèle de classification"""
-        # TF-IDF Vectorizer
-        self.vectorizer = TfidfVectorizer(
-            max_features=5000,
-            stop_words='english',
-            ngram_range=(1, 2)
-        )
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.ensemble import RandomForestClassifier
+        
+        # TF-IDF Vectorizer (ou TF-IDF haché, voir HASHING_PARAMS)
+        if self.params.get('featurizer') == 'hashing':
+            self.vectorizer = HashedTfidfVectorizer.create(
+                n_features=self.params['n_features'],
+                ngram_range=self.params['ngram_range'],
+                stop_words=self.params['stop_words']
+            )
+        else:
+            self.vectorizer = TfidfVectorizer(
+                max_features=self.params['max_features'],
+                stop_words=self.params['stop_words'],
+                ngram_range=self.params['ngram_range']
+            )
         
         # Vectoriser les CV
-        X = self.vectorizer.fit_transform(self.CVs['CV_text'])
-        y = self.CVs['Category_encoded']
+        with stage('training_vectorization', items=len(self.corpus)):
+            X = self.vectorizer.fit_transform(self.corpus.texts)
+        # Termes écartés par max_features: inutiles au transform, lourds dans le bundle
+        if hasattr(self.vectorizer, 'stop_words_'):
+            del self.vectorizer.stop_words_
+        y = self.corpus.labels
         
         # Entraîner le classificateur
-        self.clf = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.clf.fit(X, y)
+        with stage('training_fit', items=len(self.corpus)):
+            if self.params.get('classifier') == 'linear':
+                self.clf = LinearCategoryScorer.fit(
+                    X, y, C=self.params['C'], max_iter=self.params['max_iter']
+                )
+            else:
+                self.clf = RandomForestClassifier(
+                    n_estimators=self.params['n_estimators'],
+                    random_state=self.params['random_state']
+                )
+                self.clf.fit(X, y)
     
     def screen_candidates(self, job_data, resume_texts):
         """
@@ -129,80 +250,917 @@ class CVScreener:
         Returns:
             list de dicts avec les résultats
         """
-        print(f"\n🎯 Screening for: {job_data['category']}", file=sys.stderr)
-        print(f"   Candidates to screen: {len(resume_texts)}", file=sys.stderr)
+        return self.screen_batch([job_data], resume_texts)[0]
+    
+    def screen_batch(self, jobs, resume_texts):
+        """
+        Screen les mêmes candidats pour plusieurs postes en une seule passe
         
-        if not resume_texts:
-            return []
+        Les CV sont vectorisés et classifiés une seule fois, puis toutes les
+        similarités CV x postes sont calculées par un seul produit creux.
+        
+        Args:
+            jobs: list de job_data (voir screen_candidates)
+            resume_texts: list de textes de CV extraits
+        
+        Returns:
+            list (une par poste, même ordre que jobs) de listes de résultats
+        """
+        print(f"\n🎯 Screening {len(resume_texts)} candidates for {len(jobs)} job(s)", file=sys.stderr)
+        
+        if not resume_texts or not jobs:
+            return [[] for _ in jobs]
+        
+        job_vectors = self.vectorizer.transform([job['description'] for job in jobs])
+        
+        # Pré-filtre (optionnel): seuls les CV gardés par au moins un poste
+        # passent par les étapes coûteuses
+        masks = self._prefilter(jobs, job_vectors, resume_texts)
+        if masks is None:
+            candidates = np.arange(len(resume_texts))
+            texts = resume_texts
+        else:
+            candidates = np.flatnonzero(np.logical_or.reduce(masks))
+            texts = [resume_texts[i] for i in candidates]
+            if not texts:
+                return [[] for _ in jobs]
+        
+        # Vectoriser les CV
+        with stage('vectorization', items=len(texts) + len(jobs)):
+            cv_vectors = self.vectorizer.transform(texts)
+        
+        return self._score_and_rank(jobs, job_vectors, cv_vectors, resume_texts, candidates, masks)
+    
+    def screen_vectors(self, jobs, cv_vectors, previews, probas=None):
+        """
+        Screen des CV déjà vectorisés (voir vector_store.py)
+        
+        Seules les descriptions de poste sont vectorisées. Le pré-filtre
+        n'est pas appliqué: les scores ne coûtent qu'un produit creux.
+        
+        Args:
+            jobs: list de job_data (voir screen_candidates)
+            cv_vectors: matrice creuse des CV (lignes TF-IDF)
+            previews: début du texte de chaque CV (pour cv_preview)
+            probas: probabilités de catégorie déjà calculées, ou None
+        """
+        n_cv = cv_vectors.shape[0]
+        print(f"\n🎯 Screening {n_cv} stored candidates for {len(jobs)} job(s)", file=sys.stderr)
         
-        # Vectoriser les CV et la job description
-        all_texts = resume_texts + [job_data['description']]
-        all_vectors = self.vectorizer.transform(all_texts)
+        if not n_cv or not jobs:
+            return [[] for _ in jobs]
         
-        cv_vectors = all_vectors[:-1]
-        job_vector = all_vectors[-1]
+        with stage('vectorization', items=len(jobs)):
+            job_vectors = self.vectorizer.transform([job['description'] for job in jobs])
         
-        # Calculer les probabilités de catégorie
-        probas = self.clf.predict_proba(cv_vectors)
+        return self._score_and_rank(
+            jobs, job_vectors, cv_vectors, previews, np.arange(n_cv), probas=probas
+        )
+    
+    def encode(self, resume_texts):
+        """Vecteurs TF-IDF et scores de chaque catégorie des CV (pour vector_store.py)"""
+        with stage('vectorization', items=len(resume_texts)):
+            cv_vectors = self.vectorizer.transform(resume_texts)
+        with stage('predict_proba', items=len(resume_texts)):
+            probas = self._class_scores(cv_vectors)
+        return cv_vectors, probas
+    
+    def _class_scores(self, cv_vectors):
+        """
+        Score de chaque catégorie, sur l'échelle de category_scores: sigmoïde
+        un-contre-tous non normalisée pour le modèle linéaire, predict_proba
+        pour la forêt
+        """
+        if hasattr(self.clf, 'class_scores'):
+            return self.clf.class_scores(cv_vectors)
+        return self.clf.predict_proba(cv_vectors)
+    
+    def _score_and_rank(self, jobs, job_vectors, cv_vectors, resume_texts, candidates,
+                        masks=None, probas=None):
+        """Scores de catégorie et de similarité puis classement, pour chaque poste"""
+        from sklearn.metrics.pairwise import cosine_similarity
+        
+        # Calculer les scores de catégorie (une colonne par poste)
+        with stage('category_scores', items=cv_vectors.shape[0]):
+            category_matrix = self.category_scores(cv_vectors, jobs, probas)
         
-        # Trouver l'index de la catégorie cible
+        # Calculer la similarité cosinus (matrice CV x postes)
+        with stage('cosine_similarity', items=cv_vectors.shape[0] * len(jobs)):
+            similarity_matrix = cosine_similarity(cv_vectors, job_vectors)
+        
+        with stage('ranking', items=len(jobs)):
+            results = []
+            for j, job_data in enumerate(jobs):
+                # CV gardés pour ce poste parmi les survivants
+                keep = slice(None) if masks is None else masks[j][candidates]
+                results.append(self._rank_candidates(
+                    job_data, category_matrix[keep, j], similarity_matrix[keep, j],
+                    resume_texts, candidates[keep]
+                ))
+            return results
+    
+    def _prefilter(self, jobs, job_vectors, resume_texts):
+        """
+        Masques des CV gardés par poste (None si aucun pré-filtre n'est actif)
+        
+        Voir prefilter.py: le mode 'bound' n'écarte que des CV qui ne peuvent
+        pas atteindre min_score, et n'est pas calculé s'il ne peut écarter
+        personne (min_score <= 0.4, featurizer 'hashing').
+        """
+        if all(prefilter_config(job_data, self.prefilter)[0] == 'off' for job_data in jobs):
+            return None
+        masks = []
+        with stage('prefilter', items=len(resume_texts) * len(jobs)) as info:
+            for j, job_data in enumerate(jobs):
+                mode, keep = prefilter_mask(
+                    self.vectorizer, job_data, job_vectors[j], resume_texts, self.prefilter
+                )
+                if keep is not None:
+                    dropped = int(len(keep) - keep.sum())
+                    print(f"   🧹 Prefilter ({mode}) for {job_data['category']}: "
+                          f"{dropped}/{len(keep)} candidates dropped", file=sys.stderr)
+                elif mode != 'off':
+                    print(f"   ⏭️ Prefilter ({mode}) for {job_data['category']}: "
+                          f"cannot drop anyone (min_score {job_data.get('min_score', 0.0)})",
+                          file=sys.stderr)
+                masks.append(keep)
+            if all(keep is None for keep in masks):
+                return None
+            masks = [np.ones(len(resume_texts), dtype=bool) if keep is None else keep
+                     for keep in masks]
+            info['dropped'] = [int(len(keep) - keep.sum()) for keep in masks]
+        return masks
+    
+    def _target_index(self, category):
+        """Colonne de la catégorie dans le classificateur (None si inconnue)"""
         try:
-            target_idx = self.le.transform([job_data['category']])[0]
-            category_scores = probas[:, target_idx]
-        except:
+            return int(self.le.transform([category])[0])
+        except ValueError:
+            return None
+    
+    def category_scores(self, cv_vectors, jobs, probas=None):
+        """
+        Score de catégorie de chaque CV pour chaque poste
+        
+        Avec le modèle linéaire, seules les colonnes des catégories visées
+        sont calculées (un produit creux par lot de postes). Si la catégorie
+        d'un poste est inconnue, le score est le meilleur score de catégorie,
+        sur la même échelle (voir _class_scores).
+        probas: sortie de _class_scores déjà calculée (ex: vector_store.py)
+        
+        Returns:
+            array (n_cv, n_jobs)
+        """
+        targets = [self._target_index(job['category']) for job in jobs]
+        known = [j for j, target in enumerate(targets) if target is not None]
+        scores = np.empty((cv_vectors.shape[0], len(jobs)))
+        
+        if probas is None and hasattr(self.clf, 'target_scores'):
+            if known:
+                scores[:, known] = self.clf.target_scores(cv_vectors, [targets[j] for j in known])
+        else:
+            if probas is None:
+                probas = self._class_scores(cv_vectors)
+            for j in known:
+                scores[:, j] = probas[:, targets[j]]
+        
+        if len(known) < len(jobs):
             # Si la catégorie n'existe pas, utiliser la prédiction
-            category_scores = np.max(probas, axis=1)
+            if probas is None:
+                probas = self._class_scores(cv_vectors)
+            best = np.max(probas, axis=1)
+            for j, target in enumerate(targets):
+                if target is None:
+                    scores[:, j] = best
+        return scores
+    
+    def _rank_candidates(self, job_data, category_scores, similarity_scores, resume_texts,
+                         candidates=None):
+        """
+        Combine les scores d'un poste et classe les candidats
         
-        # Calculer la similarité cosinus
-        similarity_scores = cosine_similarity(cv_vectors, job_vector).flatten()
+        candidates: index dans resume_texts des CV scorés (tous par défaut),
+        alignés avec category_scores et similarity_scores
+        """
+        if candidates is None:
+            candidates = np.arange(len(resume_texts))
+        print(f"\n🎯 Screening for: {job_data['category']}", file=sys.stderr)
+        print(f"   Candidates to screen: {len(candidates)}", file=sys.stderr)
         
         # Score combiné (60% similarité, 40% catégorie)
         final_scores = (0.4 * category_scores) + (0.6 * similarity_scores)
         
-        # Debug: Print scores for all candidates
-        print(f"   📊 Score details:", file=sys.stderr)
-        for i, (cat_score, sim_score, final_score) in enumerate(
-            zip(category_scores, similarity_scores, final_scores)
-        ):
-            print(f"      CV {i+1}: cat={cat_score:.3f}, sim={sim_score:.3f}, final={final_score:.3f}", file=sys.stderr)
-        
-        # Créer les résultats pour TOUS les candidats (triés par score)
-        results = []
         min_score = job_data.get('min_score', 0.0)  # Default to 0 to show all
+        nb_postes = job_data.get('nb_postes', 10)
+        
+        if self.verbose:
+            self._log_summary(category_scores, similarity_scores, final_scores, min_score)
         
-        for i, (cat_score, sim_score, final_score, text) in enumerate(
-            zip(category_scores, similarity_scores, final_scores, resume_texts)
-        ):
+        # Ne construire les résultats que pour les candidats retenus
+        top = select_top_k(final_scores, nb_postes)
+        results = []
+        for i in top:
+            text = resume_texts[candidates[i]]
             # Include all candidates but mark those below threshold
             results.append({
-                'candidate_id': i + 1,
-                'category_score': float(cat_score),
-                'similarity_score': float(sim_score),
-                'final_score': float(final_score),
-                'meets_threshold': bool(final_score >= min_score),
+                'candidate_id': int(candidates[i]) + 1,
+                'category_score': float(category_scores[i]),
+                'similarity_score': float(similarity_scores[i]),
+                'final_score': float(final_scores[i]),
+                'meets_threshold': bool(final_scores[i] >= min_score),
                 'cv_preview': text[:200] + '...' if len(text) > 200 else text
             })
         
-        # Trier par score final (meilleur en premier)
-        results.sort(key=lambda x: x['final_score'], reverse=True)
-        
-        # Limiter au nombre de postes demandés
-        nb_postes = job_data.get('nb_postes', 10)
-        results = results[:nb_postes]
-        
         print(f"✅ Screening complete: {len(results)} candidates selected", file=sys.stderr)
         
         return results
+    
+    def _log_summary(self, category_scores, similarity_scores, final_scores, min_score):
+        """Affiche un résumé des scores (le détail par CV avec CV_SCREENING_DEBUG=1)"""
+        print(
+            f"   📊 Scores: final max={final_scores.max():.3f} mean={final_scores.mean():.3f}, "
+            f"sim mean={similarity_scores.mean():.3f}, cat mean={category_scores.mean():.3f}, "
+            f"{int((final_scores >= min_score).sum())}/{len(final_scores)} above {min_score}",
+            file=sys.stderr
+        )
+        if os.environ.get('CV_SCREENING_DEBUG'):
+            for i, (cat_score, sim_score, final_score) in enumerate(
+                zip(category_scores, similarity_scores, final_scores)
+            ):
+                print(f"      CV {i+1}: cat={cat_score:.3f}, sim={sim_score:.3f}, final={final_score:.3f}", file=sys.stderr)
+
+def select_top_k(scores, k):
+    """
+    Indices des k meilleurs scores, du meilleur au moins bon
+    
+    Sélection en O(n) avec np.partition puis tri des seuls k retenus. À score
+    égal, l'ordre d'origine est conservé (comme un tri stable complet).
+    """
+    n = len(scores)
+    k = max(0, min(k, n))
+    if k == 0:
+        return np.array([], dtype=int)
+    
+    if k < n:
+        # k-ième meilleur score: tout ce qui est au-dessus est retenu,
+        # les ex aequo au seuil sont pris dans l'ordre d'origine
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        top = np.concatenate([above, ties])
+    else:
+        top = np.arange(n)
+    
+    return top[np.lexsort((top, -scores[top]))]
 
 # ==================== FONCTION PRINCIPALE ====================
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python cv_screening.py <json_data_file>", file=sys.stderr)
+def extract_resumes(resume_paths, workers=None, timeout=None):
+    """Extrait le texte des CV et retourne (textes, chemins valides)"""
+    print(f"\n📄 Extracting text from {len(resume_paths)} resumes...", file=sys.stderr)
+    resume_texts = []
+    valid_paths = []
+    
+    # Les textes reviennent dans l'ordre des chemins (candidate_id reste valide)
+    with stage('extraction', items=len(resume_paths)):
+        texts = extract_many(resume_paths, workers=workers, timeout=timeout)
+    for path, text in zip(resume_paths, texts):
+        if text:
+            resume_texts.append(text)
+            valid_paths.append(path)
+        else:
+            print(f"⚠️ Skipping {path}: no text extracted", file=sys.stderr)
+    
+    return resume_texts, valid_paths
+
+def duplicate_index(screener, dedup=None):
+    """
+    Empreintes des CV d'un job (dedup.DuplicateIndex), à partager entre ses
+    paquets; dedup est la configuration de la requête, sinon celle du screener
+    """
+    if isinstance(dedup, DuplicateIndex):
+        return dedup
+    return DuplicateIndex(*dedup_config(dedup, screener.dedup))
+
+def dedupe_resumes(resume_texts, valid_paths, index):
+    """
+    Regroupe les CV en double avant la vectorisation (voir dedup.py)
+    
+    Args:
+        index: DuplicateIndex du job (les CV des paquets précédents y sont déjà)
+    
+    Returns:
+        (index des CV gardés, dict chemin gardé -> doublons
+        [{'file_path', 'file_name', 'reason'}]); le CV gardé peut être d'un
+        paquet précédent
+    """
+    if not index.active:
+        return list(range(len(resume_texts))), {}
+    
+    with stage('dedup', items=len(resume_texts)) as info:
+        keep, duplicates = index.add(resume_texts, valid_paths)
+        info['collapsed'] = len(duplicates)
+    if not duplicates:
+        return keep, {}
+    
+    collapsed = {}
+    for d, original, reason in duplicates:
+        collapsed.setdefault(original, []).append(
+            {'file_path': valid_paths[d], 'file_name': Path(valid_paths[d]).name, 'reason': reason}
+        )
+    print(f"🧬 Dedup ({index.mode}): {len(duplicates)} duplicate resumes collapsed "
+          f"into {len(collapsed)} candidates", file=sys.stderr)
+    return keep, collapsed
+
+def _attach_paths(batch_results, valid_paths, collapsed=None):
+    """Ajoute le chemin et le nom du fichier (et les doublons regroupés) à chaque résultat"""
+    for results in batch_results:
+        for result in results:
+            result['file_path'] = valid_paths[result['candidate_id'] - 1]
+            result['file_name'] = Path(valid_paths[result['candidate_id'] - 1]).name
+            if collapsed and result['file_path'] in collapsed:
+                result['duplicates'] = collapsed[result['file_path']]
+    return batch_results
+
+def screen_resumes(screener, jobs, resume_texts, valid_paths, dedup=None):
+    """
+    Fait le screening pour chaque poste et ajoute les chemins de fichiers
+    
+    dedup: configuration de la requête (voir dedup_config), sinon celle du
+    screener, ou DuplicateIndex partagé par les paquets d'un même job. Les
+    doublons regroupés ne sont ni vectorisés ni scorés: ils sont listés dans
+    'duplicates' du CV gardé (s'il est dans ce paquet, sinon voir
+    DuplicateIndex.duplicate_of), et candidate_id reste la position du CV
+    dans valid_paths.
+    
+    Returns:
+        (résultats par poste, chemins des CV valides)
+    """
+    keep, collapsed = dedupe_resumes(resume_texts, valid_paths, duplicate_index(screener, dedup))
+    if len(keep) < len(resume_texts):
+        resume_texts = [resume_texts[i] for i in keep]
+    batch_results = screener.screen_batch(jobs, resume_texts)
+    for results in batch_results:
+        for result in results:
+            result['candidate_id'] = keep[result['candidate_id'] - 1] + 1
+    return _attach_paths(batch_results, valid_paths, collapsed), valid_paths
+
+def open_vector_store(screener):
+    """Stock de vecteurs propre au modèle chargé et à la version de l'extracteur"""
+    from vector_store import VectorStore
+    
+    return VectorStore(f"{screener.model_version}-x{cache_version()}")
+
+def screen_stored(screener, store, jobs, resume_paths, extract_workers=None, extract_timeout=None):
+    """
+    Screening via le stock de vecteurs (voir vector_store.py)
+    
+    Seuls les CV dont le contenu n'a jamais été vu sont extraits, vectorisés
+    et classifiés; les autres sont relus depuis le stock.
+    
+    Returns:
+        (résultats par poste, chemins des CV valides)
+    """
+    with stage('hashing', items=len(resume_paths)):
+        hashes = store.hash_files(resume_paths)
+    known = store.lookup(digest for digest in hashes if digest)
+    
+    # Un seul fichier par contenu inconnu
+    new = {}
+    for path, digest in zip(resume_paths, hashes):
+        if digest and digest not in known:
+            new.setdefault(digest, path)
+    print(f"🗃️ Vector store: {len(known)} known resumes, {len(new)} new", file=sys.stderr)
+    
+    if new:
+        path_hashes = {path: digest for digest, path in new.items()}
+        texts, new_paths = extract_resumes(
+            list(new.values()), workers=extract_workers, timeout=extract_timeout
+        )
+        if texts:
+            cv_vectors, probas = screener.encode(texts)
+            with stage('vector_store_write', items=len(texts)):
+                store.add([path_hashes[path] for path in new_paths], cv_vectors, probas, texts)
+        known = store.lookup(digest for digest in hashes if digest)
+    
+    valid = [(path, digest) for path, digest in zip(resume_paths, hashes) if digest in known]
+    if not valid:
+        print("❌ No valid resumes found", file=sys.stderr)
+        return [[] for _ in jobs], []
+    valid_paths = [path for path, _ in valid]
+    
+    with stage('vector_store_read', items=len(valid)):
+        cv_vectors, probas, previews = store.get([digest for _, digest in valid])
+    batch_results = screener.screen_vectors(jobs, cv_vectors, previews, probas)
+    return _attach_paths(batch_results, valid_paths), valid_paths
+
+def search_pool(screener, store, jobs, nprobe=None, rerank=None):
+    """
+    Cherche les meilleurs candidats de chaque poste dans tout le stock
+    
+    L'index IVF (ann_index.py) présélectionne nb_postes * rerank CV par
+    poste, puis le classement exact (screen_vectors) est fait sur cette
+    présélection. Les CV ajoutés au stock après la construction de l'index
+    sont scorés en plus; sans index, tout le stock est scoré.
+    
+    Returns:
+        list (une par poste) de résultats avec content_hash (et file_path
+        si le fichier est connu)
+    """
+    from ann_index import DEFAULT_NPROBE, DEFAULT_RERANK, load_pool_index
+    
+    if nprobe is None:
+        nprobe = DEFAULT_NPROBE
+    if rerank is None:
+        rerank = DEFAULT_RERANK
+    pool_size = len(store)
+    if not pool_size or not jobs:
+        return [[] for _ in jobs]
+    
+    index = load_pool_index(store)
+    if index is None:
+        print("⚠️ No ANN index for this vector store, scoring the whole pool", file=sys.stderr)
+        tail = store.hashes()
+    elif pool_size == len(index):
+        tail = []
+    else:
+        indexed = index.contains()
+        tail = [digest for digest in store.hashes() if digest not in indexed]
+        if len(tail) > 0.1 * len(index):
+            print(f"⚠️ {len(tail)} resumes are not in the ANN index yet, "
+                  f"rebuild it with: python pool_index.py build", file=sys.stderr)
+    
+    paths = store.paths_by_hash()
+    batch_results = []
+    for job_data in jobs:
+        candidates = list(tail)
+        if index is not None:
+            with stage('ann_search', items=len(index)):
+                job_vector = screener.vectorizer.transform([job_data['description']])
+                found, _ = index.search(
+                    job_vector, job_data.get('nb_postes', 10) * rerank, nprobe,
+                    target=screener._target_index(job_data['category'])
+                )
+            candidates = found + candidates
+        
+        with stage('vector_store_read', items=len(candidates)):
+            cv_vectors, probas, previews = store.get(candidates)
+        results = screener.screen_vectors([job_data], cv_vectors, previews, probas)[0]
+        for result in results:
+            digest = candidates[result.pop('candidate_id') - 1]
+            result['content_hash'] = digest
+            if digest in paths:
+                result['file_path'] = paths[digest]
+                result['file_name'] = Path(paths[digest]).name
+        batch_results.append(results)
+    return batch_results
+
+def _needs_texts(screener, jobs, dedup=None):
+    """
+    Le pré-filtre heuristique et la déduplication lisent le texte des CV,
+    que le stock ne garde pas
+    """
+    mode, _, email = dedup_config(dedup, screener.dedup)
+    if mode != 'off' or email:
+        return True
+    return any(prefilter_config(job, screener.prefilter)[0] == 'heuristic' for job in jobs)
+
+# ==================== RAPPORT DE LOT ====================
+
+# CV traités entre deux écritures du rapport
+REPORT_CHUNK = 256
+
+def _report_schema():
+    """Schéma Parquet des lignes du rapport (les CV en échec n'ont pas de score)"""
+    import pyarrow as pa
+    
+    return pa.schema([
+        ('job_index', pa.int32()),
+        ('category_score', pa.float64()),
+        ('similarity_score', pa.float64()),
+        ('final_score', pa.float64()),
+        ('meets_threshold', pa.bool_()),
+        ('cv_preview', pa.string()),
+        ('file_path', pa.string()),
+        ('file_name', pa.string()),
+        ('status', pa.string()),
+        ('duplicate_of', pa.string()),
+    ])
+
+def _report_rows(jobs, chunk, batch_results, valid_paths, duplicate_of):
+    """
+    Une ligne par fichier et par poste: 'scored', 'duplicate' (regroupé avec
+    duplicate_of, éventuellement d'un paquet précédent), 'filtered'
+    (pré-filtre) ou 'failed'
+    
+    Args:
+        duplicate_of: DuplicateIndex.duplicate_of du rapport
+    """
+    valid = set(valid_paths)
+    rows = []
+    for j, results in enumerate(batch_results):
+        scored = set()
+        for result in results:
+            del result['candidate_id']
+            result.pop('duplicates', None)
+            scored.add(result['file_path'])
+            rows.append({'job_index': j, **result, 'status': 'scored'})
+        for path in chunk:
+            if path in duplicate_of:
+                rows.append({'job_index': j, 'file_path': path, 'file_name': Path(path).name,
+                             'status': 'duplicate', 'duplicate_of': duplicate_of[path][0]})
+            elif path not in scored:
+                status = 'filtered' if path in valid else 'failed'
+                rows.append({'job_index': j, 'file_path': path,
+                             'file_name': Path(path).name, 'status': status})
+    return rows
+
+def _report_rankings(sink, jobs):
+    """Classement final de chaque poste, en relisant le rapport (top-k par tas)"""
+    import heapq
+    
+    heaps = [[] for _ in jobs]
+    seen = [set() for _ in jobs]
+    for order, row in enumerate(sink.iter_records()):
+        if row.get('status') != 'scored':
+            continue
+        j = row['job_index']
+        # Une reprise peut avoir réécrit les lignes d'un fichier
+        if row['file_path'] in seen[j]:
+            continue
+        seen[j].add(row['file_path'])
+        # À score égal, le premier écrit passe devant (comme select_top_k)
+        item = (row['final_score'], -order, row)
+        if len(heaps[j]) < jobs[j].get('nb_postes', 10):
+            heapq.heappush(heaps[j], item)
+        else:
+            heapq.heappushpop(heaps[j], item)
+    return [[row for _, _, row in sorted(heap, reverse=True)] for heap in heaps]
+
+def _seed_duplicate_index(index, sink, paths, done, extract_workers=None, extract_timeout=None):
+    """
+    Reprise d'un rapport: les CV gardés qu'il contient déjà (ni doublons ni
+    échecs) entrent dans les empreintes, dans l'ordre du lot, pour que leurs
+    copies restantes soient reconnues
+    """
+    kept = {record['file_path'] for record in sink.iter_records()
+            if record.get('status') in ('scored', 'filtered')}
+    kept = [path for path in paths if path in done and path in kept]
+    print(f"🧬 Dedup: re-reading {len(kept)} resumes already in the report", file=sys.stderr)
+    for begin in range(0, len(kept), REPORT_CHUNK):
+        texts, valid_paths = extract_resumes(
+            kept[begin:begin + REPORT_CHUNK], workers=extract_workers, timeout=extract_timeout
+        )
+        index.add(texts, valid_paths)
+
+def screen_to_report(screener, data, sink, extract_workers=None, extract_timeout=None,
+                     vector_store=None):
+    """
+    Screening d'un gros lot écrit au fil de l'eau dans un rapport (report_sink.py)
+    
+    Les CV sont traités par paquets de REPORT_CHUNK. Chaque fichier donne une
+    ligne par poste (scores de tous les CV, pas seulement le top-k), écrite
+    dès la fin de son paquet. Les fichiers déjà dans le rapport (reprise) ne
+    sont pas retraités. La synthèse contient le classement final de chaque poste.
+    Les doublons sont cherchés dans tout le lot, pas seulement dans un paquet.
+    
+    Returns:
+        l'enregistrement de synthèse
+    """
+    jobs = data['jobs'] if 'jobs' in data else [data['job']]
+    paths = [str(path) for path in data['resume_paths']]
+    done = sink.done_keys(min_records=len(jobs))
+    todo = [path for path in paths if path not in done]
+    # Tous les CV du paquet sont classés, pas seulement nb_postes
+    all_jobs = [dict(job, nb_postes=REPORT_CHUNK) for job in jobs]
+    index = duplicate_index(screener, data.get('dedup'))
+    if index.active and done:
+        _seed_duplicate_index(index, sink, paths, done, extract_workers, extract_timeout)
+    
+    counts = {'scored': 0, 'duplicate': 0, 'filtered': 0, 'failed': 0}
+    for begin in range(0, len(todo), REPORT_CHUNK):
+        chunk = todo[begin:begin + REPORT_CHUNK]
+        batch_results, valid_paths = screen_paths(
+            screener, all_jobs, chunk, extract_workers=extract_workers,
+            extract_timeout=extract_timeout, vector_store=vector_store, dedup=index
+        )
+        rows = _report_rows(jobs, chunk, batch_results, valid_paths, index.duplicate_of)
+        sink.write_many(rows)
+        for row in rows:
+            counts[row['status']] += 1
+        print(f"📝 Report: {begin + len(chunk)}/{len(todo)} files written", file=sys.stderr)
+    
+    return sink.close({
+        'files': len(paths),
+        'skipped_already_done': len(paths) - len(todo),
+        # Lignes écrites par cette exécution (hors reprise)
+        'rows_written': counts,
+        'rankings': _report_rankings(sink, jobs),
+    })
+
+def run_screening(screener, data, extract_workers=None, extract_timeout=None, vector_store=None):
+    """
+    Pipeline complet: extraction puis screening
+    
+    data contient 'resume_paths' et soit 'job' (un poste, retourne une liste
+    de résultats), soit 'jobs' (plusieurs postes, retourne une liste par poste)
+    vector_store: VectorStore à utiliser (voir open_vector_store), ou None
+    
+    Avec 'search_pool' au lieu de 'resume_paths', les candidats sont cherchés
+    dans tout le stock de vecteurs (voir search_pool); 'search_pool' peut
+    préciser 'nprobe' et 'rerank'.
+    """
+    jobs = data['jobs'] if 'jobs' in data else [data['job']]
+    if 'search_pool' in data:
+        options = data['search_pool'] if isinstance(data['search_pool'], dict) else {}
+        batch_results = search_pool(
+            screener, vector_store or open_vector_store(screener), jobs,
+            nprobe=options.get('nprobe'), rerank=options.get('rerank')
+        )
+        return batch_results if 'jobs' in data else batch_results[0]
+    batch_results, _ = screen_paths(
+        screener, jobs, data['resume_paths'], extract_workers=extract_workers,
+        extract_timeout=extract_timeout, vector_store=vector_store, dedup=data.get('dedup')
+    )
+    return batch_results if 'jobs' in data else batch_results[0]
+
+def screen_paths(screener, jobs, resume_paths, extract_workers=None, extract_timeout=None,
+                 vector_store=None, dedup=None):
+    """
+    Screening d'une liste de fichiers (via le stock de vecteurs s'il est donné)
+    
+    dedup: configuration de la déduplication de la requête (voir
+    screen_resumes); le stock de vecteurs n'est pas utilisé si elle est active.
+    
+    Returns:
+        (résultats par poste, chemins des CV valides); candidate_id est la
+        position du CV dans les chemins valides
+    """
+    if vector_store is not None and not _needs_texts(screener, jobs, dedup):
+        return screen_stored(
+            screener, vector_store, jobs, resume_paths,
+            extract_workers=extract_workers, extract_timeout=extract_timeout
+        )
+    
+    resume_texts, valid_paths = extract_resumes(
+        resume_paths, workers=extract_workers, timeout=extract_timeout
+    )
+    if not resume_texts:
+        print("❌ No valid resumes found", file=sys.stderr)
+        return [[] for _ in jobs], []
+    return screen_resumes(screener, jobs, resume_texts, valid_paths, dedup)
+
+def write_ndjson(batch_results, with_job_index=False, out=sys.stdout):
+    """Écrit les résultats classés, un objet JSON par ligne"""
+    for job_index, results in enumerate(batch_results):
+        for result in results:
+            if with_job_index:
+                result = {'job_index': job_index, **result}
+            out.write(json.dumps(result) + "\n")
+        out.flush()
+
+def parse_args(argv=None):
+    """Analyse les arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(
+        description="CV screening: one-shot on a JSON job file, or as a long-lived worker"
+    )
+    parser.add_argument('json_file', nargs='?',
+                        help="JSON file with 'resume_paths' and 'job' (or a 'jobs' list)")
+    parser.add_argument('--serve', action='store_true',
+                        help="run as a worker reading newline-delimited JSON jobs")
+    parser.add_argument('--socket', metavar='PATH',
+                        help="with --serve, listen on this Unix socket instead of stdin")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="with --serve, number of jobs screened concurrently (default: 4)")
+    parser.add_argument('--queue', action='store_true',
+                        help="with --serve, screen each job in chunks with progress events, "
+                             "cancellation and per-tenant limits (see job_queue.py)")
+    parser.add_argument('--tenant-workers', type=int, default=2,
+                        help="with --queue, jobs screened concurrently per tenant (default: 2)")
+    parser.add_argument('--processes', type=int, default=0,
+                        help="with --serve, screen jobs in N worker processes that share one "
+                             "memory-mapped copy of the model (see shared_model.py)")
+    parser.add_argument('--model', metavar='PATH',
+                        help="screen with this model bundle as is (e.g. the incremental one)")
+    parser.add_argument('--classifier', choices=sorted(CLASSIFIERS),
+                        default=os.environ.get('CV_SCREENING_CLASSIFIER', 'forest'),
+                        help="category scorer: 'forest' or the faster 'linear' model "
+                             "(default: $CV_SCREENING_CLASSIFIER or forest)")
+    parser.add_argument('--featurizer', choices=FEATURIZERS,
+                        default=os.environ.get('CV_SCREENING_FEATURIZER', 'tfidf'),
+                        help="resume vectorization: 'tfidf', 'compact' (same model, faster "
+                             "array-backed vocabulary) or 'hashing' (model trained on hashed "
+                             "features) (default: $CV_SCREENING_FEATURIZER or tfidf)")
+    parser.add_argument('--prefilter', choices=PREFILTER_MODES,
+                        default=os.environ.get('CV_SCREENING_PREFILTER', 'off'),
+                        help="drop candidates before full scoring: 'bound' only drops those "
+                             "that cannot reach min_score (needs min_score > 0.4 and a "
+                             "tfidf/compact featurizer), 'heuristic' also checks skills "
+                             "and experience (default: $CV_SCREENING_PREFILTER or off)")
+    parser.add_argument('--dedup', choices=DEDUP_MODES,
+                        default=os.environ.get('CV_SCREENING_DEDUP', 'off'),
+                        help="collapse duplicate resumes before scoring: 'exact' (same text) "
+                             "or 'near' (also MinHash near-duplicates) "
+                             "(default: $CV_SCREENING_DEDUP or off)")
+    parser.add_argument('--dedup-email', action='store_true',
+                        help="also collapse resumes that share the same email address")
+    parser.add_argument('--vector-store', action='store_true',
+                        default=os.environ.get('CV_VECTOR_STORE') == '1',
+                        help="keep resume vectors on disk (by content hash) and reuse them "
+                             "(default: on if $CV_VECTOR_STORE=1)")
+    parser.add_argument('--report', metavar='PATH',
+                        help="write every scored resume to PATH as it goes (NDJSON, or a "
+                             "Parquet directory if PATH ends with .parquet) and print only the summary")
+    parser.add_argument('--report-format', choices=['ndjson', 'parquet'],
+                        help="with --report, force the report format")
+    parser.add_argument('--resume', action='store_true',
+                        help="with --report, complete an interrupted report: files already "
+                             "in it are skipped")
+    parser.add_argument('--stream', action='store_true',
+                        help="print ranked results as NDJSON, one result per line")
+    parser.add_argument('--quiet', action='store_true',
+                        help="do not log the per-job score summary on stderr")
+    parser.add_argument('--extract-workers', type=int, default=None,
+                        help="processes used for text extraction (default: one per CPU core)")
+    parser.add_argument('--extract-timeout', type=float, default=60,
+                        help="maximum extraction time per file in seconds (default: 60)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="add per-stage timing and memory metrics to the output")
+    parser.add_argument('--metrics-memory', action='store_true',
+                        help="also trace Python allocations per stage (slower)")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="dump cProfile statistics to PATH on exit")
+    parser.add_argument('--selftest', action='store_true',
+                        help="print a startup timing report (imports, model load, first screening)")
+    args = parser.parse_args(argv)
+    if not args.serve and not args.json_file and not args.selftest:
+        parser.print_usage(sys.stderr)
         sys.exit(1)
+    if args.processes and (args.queue or args.vector_store):
+        # La file et le stock de vecteurs sont propres à un processus
+        parser.error("--processes cannot be combined with --queue or --vector-store")
+    return args
+
+def _make_screener(args):
+    """Screener configuré par les options de la ligne de commande"""
+    return CVScreener(
+        model_path=args.model, trust_model=args.model is not None,
+        classifier=args.classifier, prefilter=args.prefilter,
+        dedup={'mode': args.dedup, 'email': args.dedup_email},
+        featurizer=args.featurizer, verbose=not args.quiet
+    )
+
+# Screener d'un processus worker (--processes), ouvert par _init_process
+_process_screener = None
+_process_args = None
+
+def _init_process(shared_path, args):
+    """Initialisation d'un processus worker: modèle partagé en mémoire mappée"""
+    global _process_screener, _process_args
+    _process_screener = CVScreener(
+        shared_model=shared_path, prefilter=args.prefilter,
+        dedup={'mode': args.dedup, 'email': args.dedup_email}, verbose=not args.quiet
+    )
+    _process_args = args
+
+def _screen_in_process(data):
+    """Un job dans un processus worker (même réponse que le mode à threads)"""
+    metrics = Metrics()
+    with metrics.activate():
+        results = run_screening(
+            _process_screener, data,
+            extract_workers=_process_args.extract_workers,
+            extract_timeout=_process_args.extract_timeout
+        )
+    if _process_args.metrics:
+        return {'results': results, 'metrics': metrics.as_dict()}
+    return {'results': results}
+
+def _serve_processes(args):
+    """
+    --serve --processes N: les jobs sont répartis sur N processus
+    
+    Le modèle est chargé (ou entraîné) une fois ici, exporté en tableaux
+    (shared_model.py) puis libéré: chaque processus l'ouvre en mémoire
+    mappée, les pages du modèle sont communes à tous.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from screening_worker import serve
+    from shared_model import export_model
+    
+    screener = _make_screener(args)
+    shared_path = export_model(screener.vectorizer, screener.clf, screener.le, screener.model_version)
+    del screener
+    
+    # 'spawn': les processus ne recopient pas le modèle chargé ci-dessus
+    pool = ProcessPoolExecutor(
+        max_workers=args.processes, mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_process, initargs=(str(shared_path), args)
+    )
+    
+    def handle(data):
+        return pool.submit(_screen_in_process, data).result()
+    
+    print(f"🧩 Screening in {args.processes} processes sharing {shared_path}", file=sys.stderr)
+    try:
+        serve(handle, socket_path=args.socket, workers=max(args.workers, args.processes))
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+def _serve(args):
+    """Mode worker: un screener chargé une fois, des jobs en continu"""
+    from screening_worker import serve
     
+    if args.processes:
+        _serve_processes(args)
+        return
+    
+    startup = Metrics()
+    with startup.activate():
+        screener = _make_screener(args)
+    if args.metrics:
+        print(json.dumps({'startup_metrics': startup.as_dict()}), file=sys.stderr)
+    vector_store = open_vector_store(screener) if args.vector_store else None
+    
+    if args.queue:
+        from job_queue import serve_queue
+        
+        def screen_chunk(jobs, resume_paths, dedup=None):
+            return screen_paths(
+                screener, jobs, resume_paths,
+                extract_workers=args.extract_workers,
+                extract_timeout=args.extract_timeout,
+                vector_store=vector_store, dedup=dedup
+            )
+        
+        def run_job(data):
+            return run_screening(
+                screener, data,
+                extract_workers=args.extract_workers,
+                extract_timeout=args.extract_timeout,
+                vector_store=vector_store
+            )
+        
+        serve_queue(screen_chunk, run_job, socket_path=args.socket, workers=args.workers,
+                    tenant_workers=args.tenant_workers, metrics=args.metrics,
+                    dedup_index=lambda dedup: duplicate_index(screener, dedup))
+        return
+    
+    def handle(data):
+        metrics = Metrics()
+        with metrics.activate():
+            results = run_screening(
+                screener, data,
+                extract_workers=args.extract_workers,
+                extract_timeout=args.extract_timeout,
+                vector_store=vector_store
+            )
+        if args.metrics:
+            return {'results': results, 'metrics': metrics.as_dict()}
+        return {'results': results}
+    
+    serve(handle, socket_path=args.socket, workers=args.workers)
+
+def _output(args, results, batch_results, is_batch, metrics):
+    """Écrit les résultats (et les métriques si demandées) sur stdout"""
+    if args.stream:
+        write_ndjson(batch_results, with_job_index=is_batch)
+        if args.metrics:
+            print(json.dumps({'metrics': metrics.as_dict()}))
+    elif args.metrics:
+        print(json.dumps({'results': results, 'metrics': metrics.as_dict()}, indent=2))
+    else:
+        print(json.dumps(results, indent=2))
+
+def _run_report(args, data):
+    """--report: le lot va dans le rapport, seule la synthèse est affichée"""
+    from contextlib import nullcontext
+    from report_sink import ReportSink, resolve_format
+    
+    report_format = resolve_format(args.report, args.report_format)
+    # Les métriques gardent le détail de chaque fichier: seulement sur demande
+    metrics = Metrics()
+    with metrics.activate() if args.metrics else nullcontext():
+        screener = _make_screener(args)
+        vector_store = open_vector_store(screener) if args.vector_store else None
+        schema = _report_schema() if report_format == 'parquet' else None
+        with ReportSink(args.report, report_format, resume=args.resume, schema=schema) as sink:
+            summary = screen_to_report(
+                screener, data, sink,
+                extract_workers=args.extract_workers,
+                extract_timeout=args.extract_timeout,
+                vector_store=vector_store
+            )
+    print(f"📊 Report written to {args.report}", file=sys.stderr)
+    if args.metrics:
+        summary = {'summary': summary, 'metrics': metrics.as_dict()}
+    print(json.dumps(summary, indent=2))
+
+def _run_once(args):
+    """Mode ligne de commande: un fichier JSON, une sortie"""
     # Lire le fichier JSON
-    json_file = sys.argv[1]
+    json_file = args.json_file
     
     try:
         with open(json_file, 'r', encoding='utf-8') as f:
@@ -211,40 +1169,124 @@ def main():
         print(f"Error reading JSON file: {e}", file=sys.stderr)
         sys.exit(1)
     
-    job_data = data['job']
-    resume_paths = data['resume_paths']
+    if args.report:
+        _run_report(args, data)
+        return
     
-    # Extraire le texte des CV
-    print(f"\n📄 Extracting text from {len(resume_paths)} resumes...", file=sys.stderr)
-    resume_texts = []
-    valid_paths = []
+    jobs = data['jobs'] if 'jobs' in data else [data['job']]
+    is_batch = 'jobs' in data
     
-    for path in resume_paths:
-        text = extract_resume_text(path)
-        if text:
-            resume_texts.append(text)
-            valid_paths.append(path)
+    metrics = Metrics()
+    if args.vector_store or 'search_pool' in data:
+        # Le stock dépend du modèle: il est chargé avant l'extraction
+        with metrics.activate():
+            screener = _make_screener(args)
+            results = run_screening(
+                screener, data,
+                extract_workers=args.extract_workers,
+                extract_timeout=args.extract_timeout,
+                vector_store=open_vector_store(screener)
+            )
+        batch_results = results if is_batch else [results]
+        _output(args, results, batch_results, is_batch, metrics)
+        return
+    
+    with metrics.activate():
+        # Extraire le texte des CV
+        resume_texts, valid_paths = extract_resumes(
+            data['resume_paths'], workers=args.extract_workers, timeout=args.extract_timeout
+        )
+        
+        if not resume_texts:
+            print("❌ No valid resumes found", file=sys.stderr)
+            batch_results = [[] for _ in jobs]
         else:
-            print(f"⚠️ Skipping {path}: no text extracted", file=sys.stderr)
+            # Initialiser le screener
+            screener = _make_screener(args)
+            
+            # Faire le screening (une liste de résultats par poste)
+            batch_results, _ = screen_resumes(
+                screener, jobs, resume_texts, valid_paths, data.get('dedup')
+            )
     
-    if not resume_texts:
-        print("❌ No valid resumes found", file=sys.stderr)
-        print(json.dumps([]))
-        sys.exit(0)
+    results = batch_results if is_batch else batch_results[0]
     
-    # Initialiser le screener
-    screener = CVScreener()
+    # Sortir les résultats en JSON
+    _output(args, results, batch_results, is_batch, metrics)
+
+# Dépendances lourdes, chargées seulement par l'étape qui en a besoin
+HEAVY_MODULES = ('pandas', 'sklearn', 'scipy', 'joblib', 'pdfplumber', 'PyPDF2', 'docx2txt')
+
+def _loaded_heavy_modules():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+def _selftest(args):
+    """
+    Rapport de démarrage: coût de chaque étape et dépendances qu'elle charge
     
-    # Faire le screening
-    results = screener.screen_candidates(job_data, resume_texts)
+    Les étapes sont mesurées dans l'ordre où le CLI les rencontre.
+    """
+    report = {
+        'ai3_import_s': round(time.perf_counter() - _IMPORT_START, 4),
+        'loaded_at_startup': _loaded_heavy_modules(),
+        'steps': [],
+    }
+    state = {}
     
-    # Ajouter les chemins de fichiers aux résultats
-    for i, result in enumerate(results):
-        result['file_path'] = valid_paths[result['candidate_id'] - 1]
-        result['file_name'] = Path(valid_paths[result['candidate_id'] - 1]).name
+    def load_model():
+        state['screener'] = _make_screener(args)
     
-    # Sortir les résultats en JSON
-    print(json.dumps(results, indent=2))
+    def first_screening():
+        job = {'category': 'selftest', 'description': 'python developer', 'nb_postes': 1}
+        state['screener'].screen_batch([job], ['python developer with sql experience'])
+    
+    steps = [
+        ('docx_backend', lambda: importlib.import_module('docx2txt')),
+        ('pdf_backends', lambda: [importlib.import_module(name) for name in ('pdfplumber', 'PyPDF2')]),
+        ('model_load', load_model),
+        ('first_screening', first_screening),
+    ]
+    for name, step in steps:
+        before = set(_loaded_heavy_modules())
+        start = time.perf_counter()
+        entry = {'step': name}
+        try:
+            step()
+        except Exception as e:
+            entry['error'] = str(e)
+        entry['wall_s'] = round(time.perf_counter() - start, 4)
+        entry['loaded'] = [m for m in _loaded_heavy_modules() if m not in before]
+        report['steps'].append(entry)
+        if 'error' in entry and name == 'model_load':
+            break
+    
+    print(json.dumps(report, indent=2))
+
+def main():
+    args = parse_args()
+    
+    if args.selftest:
+        _selftest(args)
+        return
+    
+    if args.metrics_memory:
+        tracemalloc.start()
+    
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    
+    try:
+        if args.serve:
+            _serve(args)
+        else:
+            _run_once(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"📈 Profile written to {args.profile}", file=sys.stderr)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+ann_index.py - Recherche approchée des CV d'un grand pool
+Les vecteurs TF-IDF du stock (vector_store.py) sont projetés par une SVD
+tronquée en vecteurs denses float32 normalisés, puis regroupés par k-means
+sphérique (index IVF: une liste de CV par centroïde). Une requête ne parcourt
+que les listes des nprobe centroïdes les plus proches, le temps reste donc à
+peu près constant quand le pool grandit. Dans ces listes, les CV sont triés
+par une approximation du score final (similarité dans l'espace SVD et
+probabilité de la catégorie visée, avec les poids du score final), puis les
+meilleurs sont re-classés exactement (CVScreener.screen_vectors).
+
+Fichiers (dans <stock>/ann/): components, centroids, offsets, embeddings,
+probas, hashes (.npy, ouverts en mémoire mappée) et meta.json.
+"""
+
+import sys
+import json
+import time
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from prefilter import CATEGORY_WEIGHT, SIMILARITY_WEIGHT
+
+INDEX_VERSION = 1
+DEFAULT_COMPONENTS = 128
+# Lignes utilisées pour ajuster la SVD et les centroïdes
+SVD_SAMPLE = 50000
+KMEANS_POINTS_PER_LIST = 64
+KMEANS_ITERATIONS = 15
+DEFAULT_NPROBE = 32
+# Candidats re-classés exactement, en multiple de nb_postes
+DEFAULT_RERANK = 100
+_CHUNK = 8192
+
+_ARRAYS = ('components', 'centroids', 'offsets', 'embeddings', 'probas', 'hashes')
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+def project(matrix, components):
+    """Projection des lignes TF-IDF dans l'espace SVD, normalisée (float32)"""
+    embeddings = np.empty((matrix.shape[0], components.shape[0]), dtype=np.float32)
+    for begin in range(0, matrix.shape[0], _CHUNK):
+        block = np.asarray(matrix[begin:begin + _CHUNK] @ components.T, dtype=np.float32)
+        embeddings[begin:begin + _CHUNK] = _normalize(block)
+    return embeddings
+
+def assign(embeddings, centroids):
+    """Centroïde le plus proche (produit scalaire) de chaque vecteur"""
+    labels = np.empty(len(embeddings), dtype=np.int32)
+    for begin in range(0, len(embeddings), _CHUNK):
+        labels[begin:begin + _CHUNK] = np.argmax(embeddings[begin:begin + _CHUNK] @ centroids.T, axis=1)
+    return labels
+
+def spherical_kmeans(embeddings, n_lists, iterations=KMEANS_ITERATIONS, seed=42):
+    """k-means sur la sphère: centroïdes normalisés, affectation par cosinus"""
+    rng = np.random.default_rng(seed)
+    centroids = embeddings[rng.choice(len(embeddings), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(embeddings, centroids)
+        counts = np.bincount(labels, minlength=n_lists)
+        sums = np.zeros_like(centroids)
+        order = np.argsort(labels, kind='stable')
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        filled = counts > 0
+        sums[filled] = np.add.reduceat(embeddings[order], starts[filled], axis=0)
+        # Listes vides: repartir d'un point au hasard
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            sums[empty] = embeddings[rng.choice(len(embeddings), len(empty), replace=False)]
+        centroids = _normalize(sums).astype(np.float32)
+    return centroids
+
+class IVFIndex:
+    def __init__(self, path, meta, arrays):
+        self.path = Path(path)
+        self.meta = meta
+        self.components = arrays['components']
+        self.centroids = arrays['centroids']
+        self.offsets = arrays['offsets']
+        self.embeddings = arrays['embeddings']
+        self.probas = arrays['probas']
+        self.hashes = arrays['hashes']
+        self._hash_set = None
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @classmethod
+    def build(cls, path, matrix, probas, hashes, n_components=DEFAULT_COMPONENTS, n_lists=None,
+              seed=42):
+        """
+        Construit l'index à partir des lignes TF-IDF du stock
+
+        Args:
+            path: dossier de l'index (remplacé de façon atomique)
+            matrix: matrice creuse (n, n_features)
+            probas: probabilités de catégorie de chaque ligne (n, n_classes)
+            hashes: hash de contenu de chaque ligne
+            n_lists: nombre de listes (défaut: 4 * racine de n)
+        """
+        from sklearn.decomposition import TruncatedSVD
+
+        start = time.perf_counter()
+        n = matrix.shape[0]
+        rng = np.random.default_rng(seed)
+        n_components = max(1, min(n_components, matrix.shape[1] - 1, n - 1))
+        if n_lists is None:
+            n_lists = int(round(4 * np.sqrt(n)))
+        n_lists = max(1, min(n_lists, n))
+
+        sample = rng.choice(n, min(n, SVD_SAMPLE), replace=False)
+        svd = TruncatedSVD(n_components=n_components, random_state=seed)
+        svd.fit(matrix[np.sort(sample)])
+        components = svd.components_.astype(np.float32)
+        embeddings = project(matrix, components)
+
+        train = rng.choice(n, min(n, n_lists * KMEANS_POINTS_PER_LIST), replace=False)
+        centroids = spherical_kmeans(embeddings[train], n_lists, seed=seed)
+        labels = assign(embeddings, centroids)
+        order = np.argsort(labels, kind='stable')
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=n_lists), out=offsets[1:])
+
+        arrays = {
+            'components': components,
+            'centroids': centroids,
+            'offsets': offsets,
+            'embeddings': embeddings[order],
+            'probas': np.asarray(probas, dtype=np.float32)[order],
+            'hashes': np.asarray(hashes, dtype='S64')[order],
+        }
+        meta = {
+            'version': INDEX_VERSION,
+            'rows': n,
+            'n_components': n_components,
+            'n_lists': n_lists,
+            'explained_variance': round(float(svd.explained_variance_ratio_.sum()), 4),
+            'build_s': round(time.perf_counter() - start, 3),
+        }
+
+        path = Path(path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+        for name, array in arrays.items():
+            np.save(tmp_path / f"{name}.npy", array)
+        (tmp_path / 'meta.json').write_text(json.dumps(meta, indent=2), encoding='utf-8')
+        shutil.rmtree(path, ignore_errors=True)
+        tmp_path.rename(path)
+        print(f"✅ ANN index built: {n} resumes, {n_lists} lists, {n_components} dims "
+              f"in {meta['build_s']}s", file=sys.stderr)
+        return cls.load(path)
+
+    @classmethod
+    def load(cls, path):
+        """Ouvre l'index en mémoire mappée (None s'il est absent ou d'une autre version)"""
+        path = Path(path)
+        try:
+            meta = json.loads((path / 'meta.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != INDEX_VERSION:
+            return None
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode='r') for name in _ARRAYS}
+        return cls(path, meta, arrays)
+
+    def contains(self):
+        """Ensemble des hashes indexés (calculé une fois)"""
+        if self._hash_set is None:
+            self._hash_set = {digest.decode('ascii') for digest in self.hashes}
+        return self._hash_set
+
+    def project(self, matrix):
+        return project(matrix, self.components)
+
+    def search(self, query, k, nprobe=DEFAULT_NPROBE, target=None):
+        """
+        Les k meilleurs CV pour la requête dans les listes parcourues
+
+        Args:
+            query: vecteur TF-IDF (1, n_features)
+            k: nombre de CV retournés
+            nprobe: nombre de listes parcourues
+            target: index de la catégorie visée (None: similarité seule)
+
+        Returns:
+            (hashes, scores), du plus proche au moins proche
+        """
+        q = self.project(query)[0]
+        nprobe = min(nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ q), nprobe - 1)[:nprobe]
+
+        # Les listes sont contiguës: une tranche par liste
+        ranges = [(self.offsets[i], self.offsets[i + 1]) for i in lists]
+        ids = np.concatenate([np.arange(begin, end) for begin, end in ranges])
+        if not len(ids):
+            return [], np.zeros(0, dtype=np.float32)
+        scores = np.concatenate([self.embeddings[begin:end] @ q for begin, end in ranges])
+        if target is not None:
+            scores = SIMILARITY_WEIGHT * scores + CATEGORY_WEIGHT * self.probas[ids, target]
+
+        k = min(k, len(ids))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [digest.decode('ascii') for digest in self.hashes[ids[best]]], scores[best]
+
+def index_path(store):
+    """Dossier de l'index associé à un stock de vecteurs"""
+    return store.path / 'ann'
+
+def build_pool_index(store, n_components=DEFAULT_COMPONENTS, n_lists=None):
+    """Construit l'index de tous les CV du stock"""
+    hashes = store.hashes()
+    if not hashes:
+        raise ValueError("The vector store is empty")
+    matrix, probas, _ = store.get(hashes)
+    return IVFIndex.build(index_path(store), matrix, probas, hashes, n_components, n_lists)
+
+def load_pool_index(store):
+    return IVFIndex.load(index_path(store))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+bench_featurizer.py - Vectorisation des CV selon le featurizer (--featurizer)
+Entraîne les modèles sur un corpus synthétique puis mesure, pour chaque
+featurizer, le temps de vectorizer.transform par lot de CV, le temps du
+screening complet (screen_batch) et la taille du vectorizer sérialisé:
+  - tfidf:   TfidfVectorizer de scikit-learn (modèle actuel)
+  - compact: même modèle, vocabulaire figé en tableaux (featurizer.py);
+             la matrice doit être identique à celle de tfidf
+  - hashing: features hachées, modèle entraîné à part
+Usage: python benchmarks/bench_featurizer.py [--classifier forest|linear] [--output featurizer.json]
+"""
+
+import io
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+
+import joblib
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_retrieval import write_training_csv, pool_text
+from bench_screening import CATEGORY_TERMS
+from featurizer import FEATURIZERS
+
+def pickled_kb(obj):
+    """Taille sérialisée avec joblib (comme dans le bundle)"""
+    buffer = io.BytesIO()
+    joblib.dump(obj, buffer)
+    return round(buffer.tell() / 1024, 1)
+
+def best_time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+# ==================== PROGRAMME PRINCIPAL ====================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark resume featurizers")
+    parser.add_argument('--classifier', choices=['forest', 'linear'], default='forest')
+    parser.add_argument('--train-size', type=int, default=5000,
+                        help="rows in the synthetic training corpus (default: 5000)")
+    parser.add_argument('--words', type=int, default=300)
+    parser.add_argument('--skills', type=int, default=5000)
+    parser.add_argument('--batch', type=int, default=1000, help="resumes vectorized per run")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+def main():
+    from ai3 import CVScreener
+
+    args = parse_args()
+    rng = random.Random(args.seed)
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'config': vars(args),
+        'runs': [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix='cv_bench_') as workdir:
+        dataset = Path(workdir) / 'Resume.csv'
+        write_training_csv(dataset, rng, args.train_size, args.words, args.skills)
+        texts = [pool_text(rng, rng.choice(list(CATEGORY_TERMS)), args.words, args.skills)
+                 for _ in range(args.batch)]
+        job = {'category': 'INFORMATION-TECHNOLOGY', 'description': CATEGORY_TERMS['INFORMATION-TECHNOLOGY'],
+               'nb_postes': 10, 'min_score': 0.3}
+
+        reference = None
+        for featurizer in FEATURIZERS:
+            print(f"⏱️ Measuring {featurizer}...", file=sys.stderr)
+            # compact réutilise le bundle de tfidf, hashing a le sien
+            bundle = Path(workdir) / ('hashing.joblib' if featurizer == 'hashing' else 'tfidf.joblib')
+            screener = CVScreener(dataset_path=dataset, model_path=bundle, classifier=args.classifier,
+                                  featurizer=featurizer, verbose=False)
+            matrix = screener.vectorizer.transform(texts)
+            transform_s = best_time(lambda: screener.vectorizer.transform(texts), args.repeat)
+            screen_s = best_time(lambda: screener.screen_batch([job], texts), args.repeat)
+            run = {
+                'featurizer': featurizer,
+                'n_features': matrix.shape[1],
+                'transform_s': round(transform_s, 3),
+                'transform_ms_per_cv': round(1000 * transform_s / len(texts), 3),
+                'screen_batch_s': round(screen_s, 3),
+                'vectorizer_kb': pickled_kb(screener.vectorizer),
+                'model_version': screener.model_version,
+            }
+            if featurizer == 'tfidf':
+                reference = matrix
+            elif featurizer == 'compact':
+                run['identical_to_tfidf'] = bool(
+                    matrix.shape == reference.shape and (matrix != reference).nnz == 0
+                )
+            report['runs'].append(run)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+        print(f"📊 Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+bench_retrieval.py - Recherche approchée (ann_index.py) contre classement exact
+Remplit un stock de vecteurs temporaire avec des CV synthétiques (sans
+fichiers: les textes sont vectorisés directement), construit l'index IVF puis
+mesure, pour chaque taille de pool, la latence par requête de search_pool et
+du classement exact de tout le stock, ainsi que le rappel des top-N.
+Usage: python benchmarks/bench_retrieval.py [--sizes 10000 50000 100000] [--output retrieval.json]
+"""
+
+import sys
+import os
+import csv
+import json
+import time
+import random
+import hashlib
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai3 import CVScreener
+from ann_index import DEFAULT_COMPONENTS, DEFAULT_NPROBE, DEFAULT_RERANK, build_pool_index
+from vector_store import VectorStore
+from pool_index import evaluate_index
+from bench_screening import CATEGORY_TERMS, synthetic_text, timed
+
+# Vectorisation par blocs pour borner la mémoire des textes
+_ENCODE_CHUNK = 5000
+
+# ==================== DONNÉES SYNTHÉTIQUES ====================
+
+def pool_text(rng, category, n_words, n_skills):
+    """
+    Texte de CV: celui de bench_screening plus des compétences tirées selon
+    une loi de Zipf, pour que les CV d'une même catégorie se distinguent
+    """
+    skills = ' '.join(
+        f"skill{min(int(rng.paretovariate(1.1)), n_skills)}" for _ in range(n_words // 5)
+    )
+    return f"{synthetic_text(rng, category, n_words)} {skills}"
+
+def write_training_csv(path, rng, n_rows, n_words, n_skills):
+    """Comme bench_screening.write_training_csv, avec les compétences"""
+    with open(path, 'w', newline='', encoding='latin-1') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'Resume_str', 'Resume_html', 'Category'])
+        for i in range(n_rows):
+            category = rng.choice(list(CATEGORY_TERMS))
+            text = pool_text(rng, category, n_words, n_skills)
+            writer.writerow([i, text, f'<div class="section"><p>{text}</p></div>', category])
+
+def fill_store(screener, store, rng, size, args):
+    """Ajoute des CV synthétiques au stock jusqu'à size lignes"""
+    while len(store) < size:
+        texts = [
+            pool_text(rng, rng.choice(list(CATEGORY_TERMS)), args.words, args.skills)
+            for _ in range(min(_ENCODE_CHUNK, size - len(store)))
+        ]
+        hashes = [hashlib.sha256(text.encode('utf-8')).hexdigest() for text in texts]
+        cv_vectors, probas = screener.encode(texts)
+        store.add(hashes, cv_vectors, probas, texts)
+
+# ==================== PROGRAMME PRINCIPAL ====================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ANN candidate retrieval")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000, 100000],
+                        help="resumes in the pool (default: 10000 50000 100000)")
+    parser.add_argument('--train-size', type=int, default=2000,
+                        help="rows in the synthetic training corpus (default: 2000)")
+    parser.add_argument('--words', type=int, default=200,
+                        help="words per synthetic resume (default: 200)")
+    parser.add_argument('--skills', type=int, default=3000,
+                        help="distinct skill tokens (default: 3000)")
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--nprobe', type=int, default=DEFAULT_NPROBE)
+    parser.add_argument('--rerank', type=int, default=DEFAULT_RERANK)
+    parser.add_argument('--components', type=int, default=DEFAULT_COMPONENTS)
+    parser.add_argument('--classifier', choices=['forest', 'linear'], default='forest',
+                        help="category scorer (default: forest)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'config': vars(args),
+        'runs': [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix='cv_bench_') as workdir:
+        dataset = Path(workdir) / 'Resume.csv'
+        write_training_csv(dataset, rng, args.train_size, args.words, args.skills)
+        screener = CVScreener(dataset_path=dataset, model_path=Path(workdir) / 'model.joblib',
+                              retrain=True, verbose=False, classifier=args.classifier)
+        # Le pool grandit d'une taille à la suivante
+        store = VectorStore('bench', store_dir=Path(workdir) / 'vectors')
+
+        for size in sorted(args.sizes):
+            print(f"⏱️ Benchmarking retrieval over {size} resumes...", file=sys.stderr)
+            stages = {}
+            timed(stages, 'encode_and_store', size - len(store),
+                  fill_store, screener, store, rng, size, args)
+            timed(stages, 'build_index', size, build_pool_index, store, args.components)
+            run = evaluate_index(screener, store, n_queries=args.queries, top=args.top,
+                                 nprobe=args.nprobe, rerank=args.rerank, seed=args.seed)
+            run['stages'] = stages
+            report['runs'].append(run)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+        print(f"📊 Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
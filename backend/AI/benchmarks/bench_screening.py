@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+bench_screening.py - Benchmark du pipeline de screening sur des CV synthétiques
+Génère hors ligne un corpus d'entraînement, des CV PDF/DOCX et des offres,
+puis mesure chaque étape (entraînement, extraction, vectorisation,
+classification, similarité, classement) pour plusieurs tailles de lot.
+Usage: python benchmarks/bench_screening.py [--sizes 10 100 1000 10000] [--output bench.json]
+"""
+
+import sys
+import os
+import csv
+import json
+import time
+import random
+import zipfile
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+# Le cache de texte fausserait les mesures d'extraction
+os.environ.setdefault('CV_TEXT_CACHE_MAX_MB', '0')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sklearn.metrics.pairwise import cosine_similarity
+
+from ai3 import CVScreener
+from extraction import extract_many
+from instrumentation import peak_rss_mb
+
+# ==================== DONNÉES SYNTHÉTIQUES ====================
+
+CATEGORY_TERMS = {
+    'INFORMATION-TECHNOLOGY': "python java sql linux network server cloud docker kubernetes developer software api",
+    'HR': "recruitment payroll onboarding employee relations hiring benefits training interview compliance",
+    'FINANCE': "accounting budget audit tax financial analysis reporting excel forecasting ledger",
+    'ADVOCATE': "law court legal litigation contract client attorney case counsel hearing",
+    'DESIGNER': "photoshop illustrator design ui ux figma branding typography creative layout",
+    'HEALTHCARE': "patient clinical nurse care medical hospital treatment health records pharmacy",
+    'SALES': "sales client negotiation pipeline crm quota prospect account revenue territory",
+    'ENGINEERING': "mechanical cad autocad design manufacturing maintenance quality project tolerances",
+}
+COMMON_TERMS = (
+    "team management communication project experience years skills work "
+    "responsible company department improved led developed organized"
+).split()
+
+def synthetic_text(rng, category, n_words):
+    """Texte de CV: mots de la catégorie mélangés à du vocabulaire commun"""
+    terms = CATEGORY_TERMS[category].split()
+    return ' '.join(
+        rng.choice(terms) if rng.random() < 0.45 else rng.choice(COMMON_TERMS)
+        for _ in range(n_words)
+    )
+
+def write_training_csv(path, rng, n_rows, n_words):
+    """Écrit un dataset au format de utils/Resume.csv"""
+    with open(path, 'w', newline='', encoding='latin-1') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'Resume_str', 'Resume_html', 'Category'])
+        for i in range(n_rows):
+            category = rng.choice(list(CATEGORY_TERMS))
+            text = synthetic_text(rng, category, n_words)
+            writer.writerow([i, text, f'<div class="section"><p>{text}</p></div>', category])
+
+def _wrap(text, words_per_line=12):
+    words = text.split()
+    return [' '.join(words[i:i + words_per_line]) for i in range(0, len(words), words_per_line)]
+
+def write_pdf(path, text, lines_per_page=60):
+    """Écrit un PDF texte minimal (police Helvetica standard, sans dépendance)"""
+    lines = _wrap(text)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    n_pages = len(pages)
+    font_id = 3 + 2 * n_pages
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            ' '.join(f"{3 + 2 * i} 0 R" for i in range(n_pages)), n_pages
+        ),
+    ]
+    for i, page_lines in enumerate(pages):
+        content = "BT /F1 10 Tf 50 770 Td 12 TL\n" + ''.join(
+            "({}) Tj T*\n".format(line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)'))
+            for line in page_lines
+        ) + "ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {4 + 2 * i} 0 R /Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    out += ''.join(f"{offset:010d} 00000 n \n" for offset in offsets).encode('latin-1')
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    Path(path).write_bytes(bytes(out))
+
+def write_docx(path, text):
+    """Écrit un DOCX minimal lisible par docx2txt"""
+    paragraphs = ''.join(
+        f"<w:p><w:r><w:t>{escape(line)}</w:t></w:r></w:p>" for line in _wrap(text)
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{paragraphs}</w:body></w:document>'
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" ContentType='
+        '"application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    )
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', content_types)
+        archive.writestr('word/document.xml', document)
+
+def write_resumes(directory, rng, count, n_words, formats):
+    """Génère count CV en alternant les formats demandés"""
+    paths = []
+    for i in range(count):
+        category = rng.choice(list(CATEGORY_TERMS))
+        text = synthetic_text(rng, category, n_words)
+        fmt = formats[i % len(formats)]
+        path = Path(directory) / f"resume_{i:05d}.{fmt}"
+        if fmt == 'pdf':
+            write_pdf(path, text)
+        else:
+            write_docx(path, text)
+        paths.append(str(path))
+    return paths
+
+def synthetic_job(rng, n_words=60):
+    """Offre d'emploi au format du payload envoyé par CVScreeningService"""
+    category = rng.choice(list(CATEGORY_TERMS))
+    return {
+        'category': category,
+        'description': synthetic_text(rng, category, n_words),
+        'nb_postes': 10,
+        'min_score': 0.3,
+    }
+
+# ==================== MESURES ====================
+
+def timed(stages, name, items, func, *args, **kwargs):
+    """Exécute func, enregistre temps, CPU et mémoire de l'étape"""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = func(*args, **kwargs)
+    wall = time.perf_counter() - wall_start
+    stages[name] = {
+        'wall_s': round(wall, 6),
+        'cpu_s': round(time.process_time() - cpu_start, 6),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'items': items,
+        'throughput_per_s': round(items / wall, 2) if wall > 0 else None,
+    }
+    return result
+
+def bench_size(screener, rng, workdir, size, args):
+    """Mesure toutes les étapes pour un lot de size CV"""
+    directory = Path(workdir) / f"resumes_{size}"
+    directory.mkdir()
+    paths = write_resumes(directory, rng, size, args.words, args.formats)
+    job = synthetic_job(rng)
+
+    stages = {}
+    texts = timed(stages, 'extraction', size, extract_many,
+                  paths, workers=args.workers, timeout=args.timeout)
+    texts = [text for text in texts if text]
+
+    cv_vectors = timed(stages, 'vectorization', len(texts),
+                       screener.vectorizer.transform, texts)
+    job_vector = screener.vectorizer.transform([job['description']])
+    category = timed(stages, 'classification', len(texts),
+                     screener.category_scores, cv_vectors, [job])
+    similarity = timed(stages, 'similarity', len(texts),
+                       cosine_similarity, cv_vectors, job_vector)
+    timed(stages, 'ranking', len(texts), screener._rank_candidates,
+          job, category[:, 0], similarity[:, 0], texts)
+
+    # Référence: le chemin complet tel qu'appelé en production
+    timed(stages, 'screen_candidates', len(texts), screener.screen_candidates, job, texts)
+
+    return {
+        'candidates': size,
+        'extracted': len(texts),
+        'stages': stages,
+    }
+
+# ==================== PROGRAMME PRINCIPAL ====================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the CV screening pipeline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                        help="numbers of candidates to screen (default: 10 100 1000 10000)")
+    parser.add_argument('--train-size', type=int, default=2000,
+                        help="rows in the synthetic training corpus (default: 2000)")
+    parser.add_argument('--words', type=int, default=300,
+                        help="words per synthetic resume (default: 300)")
+    parser.add_argument('--formats', nargs='+', choices=['pdf', 'docx'], default=['pdf', 'docx'],
+                        help="resume formats to generate (default: pdf docx)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="extraction processes (default: one per CPU core)")
+    parser.add_argument('--timeout', type=float, default=60,
+                        help="extraction timeout per file in seconds")
+    parser.add_argument('--classifier', choices=['forest', 'linear'], default='forest',
+                        help="category scorer to benchmark (default: forest)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'config': vars(args),
+        'runs': [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix='cv_bench_') as workdir:
+        dataset = Path(workdir) / 'Resume.csv'
+        write_training_csv(dataset, rng, args.train_size, args.words)
+
+        training = {}
+        screener = timed(training, 'train_model', args.train_size, CVScreener,
+                         dataset_path=dataset, model_path=Path(workdir) / 'model.joblib',
+                         retrain=True, verbose=False, classifier=args.classifier)
+        timed(training, 'load_model', 1, CVScreener,
+              dataset_path=dataset, model_path=Path(workdir) / 'model.joblib', verbose=False,
+              classifier=args.classifier)
+        report['training'] = training
+
+        for size in args.sizes:
+            print(f"⏱️ Benchmarking {size} candidates...", file=sys.stderr)
+            report['runs'].append(bench_size(screener, rng, workdir, size, args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+        print(f"📊 Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
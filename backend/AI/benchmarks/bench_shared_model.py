@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+bench_shared_model.py - Mémoire par processus: bundle joblib contre modèle partagé
+Entraîne un modèle sur un corpus synthétique, l'exporte (shared_model.py),
+puis lance N processus qui chargent le modèle et screenent un lot de CV,
+pour chaque mode:
+  - baseline: imports seulement (coût d'un processus Python sans modèle)
+  - bundle:   chaque processus charge le bundle joblib (ai3.py --serve)
+  - shared:   chaque processus ouvre le modèle partagé en mémoire mappée
+Pendant que tous les processus sont vivants, la mémoire de chacun est lue
+dans /proc/<pid>/smaps_rollup (Linux): USS (pages privées), PSS (pages
+partagées divisées entre les processus) et RSS.
+Usage: python benchmarks/bench_shared_model.py [--processes 4] [--output shared.json]
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_retrieval import write_training_csv, pool_text
+from bench_screening import CATEGORY_TERMS
+
+MODES = ('baseline', 'bundle', 'shared')
+
+def memory_mb(pid):
+    """USS, PSS et RSS d'un processus en Mo (smaps_rollup)"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding='ascii') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    uss = fields['Private_Clean'] + fields['Private_Dirty']
+    return {'uss': round(uss / 1024, 1), 'pss': round(fields['Pss'] / 1024, 1),
+            'rss': round(fields['Rss'] / 1024, 1)}
+
+def worker(mode, model_path, shared_path, texts, ready, done):
+    """Charge le modèle selon le mode, screene le lot puis attend la mesure"""
+    from ai3 import CVScreener
+
+    if mode == 'bundle':
+        screener = CVScreener(model_path=model_path, trust_model=True, verbose=False)
+    elif mode == 'shared':
+        screener = CVScreener(shared_model=shared_path, verbose=False)
+    if mode != 'baseline':
+        job = {'category': 'INFORMATION-TECHNOLOGY', 'description': CATEGORY_TERMS['INFORMATION-TECHNOLOGY'],
+               'nb_postes': 10, 'min_score': 0.3}
+        screener.screen_batch([job], texts)
+    ready.put(os.getpid())
+    done.wait()
+
+def measure(mode, args, model_path, shared_path, texts):
+    context = multiprocessing.get_context('spawn')
+    ready, done = context.Queue(), context.Event()
+    processes = [
+        context.Process(target=worker, args=(mode, model_path, shared_path, texts, ready, done))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    pids = [ready.get(timeout=300) for _ in processes]
+    per_process = [memory_mb(pid) for pid in pids]
+    done.set()
+    for process in processes:
+        process.join()
+    return {
+        'mode': mode,
+        'per_process': per_process,
+        'uss_mean_mb': round(sum(m['uss'] for m in per_process) / len(per_process), 1),
+        'pss_total_mb': round(sum(m['pss'] for m in per_process), 1),
+    }
+
+# ==================== PROGRAMME PRINCIPAL ====================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-process memory of the shared model")
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--train-size', type=int, default=5000,
+                        help="rows in the synthetic training corpus (default: 5000)")
+    parser.add_argument('--words', type=int, default=300)
+    parser.add_argument('--skills', type=int, default=5000)
+    parser.add_argument('--batch', type=int, default=200, help="resumes screened per process")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+def main():
+    from ai3 import CVScreener
+    from shared_model import export_model
+
+    args = parse_args()
+    rng = random.Random(args.seed)
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'config': vars(args),
+        'runs': [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix='cv_bench_') as workdir:
+        dataset = Path(workdir) / 'Resume.csv'
+        model_path = Path(workdir) / 'model.joblib'
+        write_training_csv(dataset, rng, args.train_size, args.words, args.skills)
+        screener = CVScreener(dataset_path=dataset, model_path=model_path, retrain=True, verbose=False)
+        shared_path = export_model(screener.vectorizer, screener.clf, screener.le,
+                                   screener.model_version, Path(workdir) / 'shared')
+        report['model'] = {
+            'bundle_mb': round(model_path.stat().st_size / (1024 * 1024), 1),
+            'shared_arrays_mb': json.loads((shared_path / 'meta.json').read_text())['arrays_mb'],
+            'vocabulary': len(screener.vectorizer.vocabulary_),
+            'tree_nodes': sum(tree.tree_.node_count for tree in screener.clf.estimators_),
+        }
+        del screener
+
+        texts = [pool_text(rng, rng.choice(list(CATEGORY_TERMS)), args.words, args.skills)
+                 for _ in range(args.batch)]
+        for mode in MODES:
+            print(f"⏱️ Measuring {args.processes} processes ({mode})...", file=sys.stderr)
+            report['runs'].append(measure(mode, args, str(model_path), str(shared_path), texts))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+        print(f"📊 Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
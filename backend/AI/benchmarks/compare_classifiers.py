@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+compare_classifiers.py - Compare la forêt aléatoire et le score linéaire
+Mesure, sur un jeu de test, la précision, la qualité du classement (MAP avec
+le score de production 0.4 catégorie + 0.6 similarité), le temps de calcul
+du score de catégorie par CV et la taille du modèle sauvegardé, avec les
+scores qu'utilise CVScreener.category_scores:
+  - 'forest': RandomForestClassifier.predict_proba
+  - 'linear': sigmoïde un-contre-tous non normalisée (class_scores pour la
+    précision et la MAP); le temps est celui de target_scores sur la seule
+    colonne de la catégorie visée, comme en production
+Usage: python benchmarks/compare_classifiers.py [--dataset utils/Resume.csv] [--output compare.json]
+"""
+
+import io
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai3 import DATASET_PATH, MODEL_PARAMS, LINEAR_MODEL_PARAMS
+from corpus import load_corpus
+from linear_scorer import LinearCategoryScorer
+from compare_corpus import ranking_map
+
+def model_size_kb(model):
+    """Taille du modèle sérialisé avec joblib (comme dans le bundle)"""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return round(buffer.tell() / 1024, 1)
+
+def best_time(fn, repeat):
+    """Meilleur temps sur repeat exécutions (secondes)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare forest and linear category scoring")
+    parser.add_argument('--dataset', default=str(DATASET_PATH))
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="timing repetitions, the best one is kept (default: 5)")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.dataset, html_mode=MODEL_PARAMS['html'])
+    indices = np.arange(len(corpus))
+    train_idx, test_idx = train_test_split(
+        indices, test_size=0.2, random_state=42, stratify=corpus.labels
+    )
+
+    vectorizer = TfidfVectorizer(
+        max_features=MODEL_PARAMS['max_features'],
+        stop_words=MODEL_PARAMS['stop_words'],
+        ngram_range=MODEL_PARAMS['ngram_range']
+    )
+    X_train = vectorizer.fit_transform(corpus.texts.take(train_idx))
+    X_test = vectorizer.transform(corpus.texts.take(test_idx))
+    y_train, y_test = corpus.labels[train_idx], corpus.labels[test_idx]
+    n_classes = len(corpus.classes)
+    # Catégorie "visée" pour la mesure du score d'une seule colonne
+    target = int(np.bincount(y_train).argmax())
+
+    start = time.perf_counter()
+    forest = RandomForestClassifier(
+        n_estimators=MODEL_PARAMS['n_estimators'], random_state=MODEL_PARAMS['random_state']
+    ).fit(X_train, y_train)
+    forest_fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    linear = LinearCategoryScorer.fit(
+        X_train, y_train, C=LINEAR_MODEL_PARAMS['C'], max_iter=LINEAR_MODEL_PARAMS['max_iter']
+    )
+    linear_fit_s = time.perf_counter() - start
+
+    variants = [
+        ('forest', forest, forest_fit_s, forest.predict_proba(X_test),
+         lambda: forest.predict_proba(X_test)),
+        ('linear', linear, linear_fit_s, linear.class_scores(X_test),
+         lambda: linear.target_scores(X_test, [target])),
+    ]
+
+    results = []
+    for name, model, fit_s, scores, score_fn in variants:
+        seconds = best_time(score_fn, args.repeat)
+        results.append({
+            'scorer': name,
+            'fit_s': round(fit_s, 3),
+            'model_kb': model_size_kb(model),
+            'accuracy': round(accuracy_score(y_test, scores.argmax(axis=1)), 4),
+            'ranking_map': round(ranking_map(X_train, y_train, X_test, y_test, scores,
+                                             n_classes), 4),
+            'category_scoring_us_per_cv': round(seconds / len(test_idx) * 1e6, 2),
+        })
+
+    forest_us = results[0]['category_scoring_us_per_cv']
+    for result in results:
+        us = result['category_scoring_us_per_cv']
+        result['speedup_vs_forest'] = round(forest_us / us, 1) if us > 0 else None
+
+    report = {
+        'dataset': args.dataset,
+        'train_rows': len(train_idx),
+        'test_rows': len(test_idx),
+        'categories': n_classes,
+        'results': results,
+    }
+    if all(result['accuracy'] == 1.0 for result in results):
+        report['note'] = ("every scorer reaches 1.0 accuracy on this dataset: it shows the latency "
+                          "gap only, not that the scorers are equally accurate")
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+        print(f"📊 Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
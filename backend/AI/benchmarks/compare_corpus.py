@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+compare_corpus.py - Compare les modes d'ingestion du corpus (Resume_html)
+Pour chaque mode ('raw' = ancien comportement, 'strip', 'skip'), mesure la
+mémoire et le temps de chargement, le temps d'ajustement du TF-IDF, la
+précision du classificateur et la qualité du classement sur un jeu de test.
+utils/Resume.csv n'est pas dans le dépôt: --synthetic génère un corpus au
+même schéma (Resume_html reprend le texte dans des balises).
+Usage: python benchmarks/compare_corpus.py [--dataset utils/Resume.csv | --synthetic 5000]
+           [--output compare.json]
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, average_precision_score
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai3 import DATASET_PATH, MODEL_PARAMS
+from corpus import HTML_MODES, load_corpus
+
+def ranking_map(X_train, y_train, X_test, y_test, probas, n_classes):
+    """
+    MAP du classement utilisé en production (0.4 catégorie + 0.6 similarité)
+
+    Chaque catégorie sert de requête; la "description de poste" est le
+    centroïde TF-IDF des CV d'entraînement de la catégorie.
+    """
+    scores = []
+    for c in range(n_classes):
+        relevant = (y_test == c)
+        if not relevant.any():
+            continue
+        centroid = np.asarray(X_train[y_train == c].mean(axis=0))
+        norm = np.linalg.norm(centroid)
+        similarity = (X_test @ centroid.T).ravel() / norm if norm > 0 else np.zeros(X_test.shape[0])
+        final = 0.4 * probas[:, c] + 0.6 * similarity
+        scores.append(average_precision_score(relevant, final))
+    return float(np.mean(scores))
+
+def evaluate(dataset, html_mode, n_estimators):
+    """Charge, vectorise, entraîne et évalue pour un mode d'ingestion"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    corpus = load_corpus(dataset, html_mode=html_mode)
+    load_s = time.perf_counter() - start
+    _, load_peak = tracemalloc.get_traced_memory()
+
+    indices = np.arange(len(corpus))
+    train_idx, test_idx = train_test_split(
+        indices, test_size=0.2, random_state=42, stratify=corpus.labels
+    )
+
+    vectorizer = TfidfVectorizer(
+        max_features=MODEL_PARAMS['max_features'],
+        stop_words=MODEL_PARAMS['stop_words'],
+        ngram_range=MODEL_PARAMS['ngram_range']
+    )
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    X_train = vectorizer.fit_transform(corpus.texts.take(train_idx))
+    fit_s = time.perf_counter() - start
+    _, fit_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    X_test = vectorizer.transform(corpus.texts.take(test_idx))
+    y_train, y_test = corpus.labels[train_idx], corpus.labels[test_idx]
+
+    clf = RandomForestClassifier(n_estimators=n_estimators, random_state=42)
+    clf.fit(X_train, y_train)
+    probas = clf.predict_proba(X_test)
+
+    vocabulary = vectorizer.get_feature_names_out()
+    markup_terms = sum(1 for term in vocabulary if any(
+        token in ('div', 'span', 'class', 'br', 'li', 'ul', 'href', 'nbsp') for token in term.split()
+    ))
+
+    return {
+        'html_mode': html_mode,
+        'rows': len(corpus),
+        'text_mb': round(corpus.texts.nbytes / (1024 * 1024), 2),
+        'load_s': round(load_s, 3),
+        'load_peak_mb': round(load_peak / (1024 * 1024), 1),
+        'tfidf_fit_s': round(fit_s, 3),
+        'tfidf_fit_peak_mb': round(fit_peak / (1024 * 1024), 1),
+        'markup_terms_in_vocabulary': markup_terms,
+        'accuracy': round(accuracy_score(y_test, probas.argmax(axis=1)), 4),
+        'ranking_map': round(ranking_map(X_train, y_train, X_test, y_test, probas,
+                                         len(corpus.classes)), 4),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare corpus ingestion modes")
+    parser.add_argument('--dataset', default=str(DATASET_PATH))
+    parser.add_argument('--synthetic', type=int, metavar='ROWS',
+                        help="compare on a synthetic corpus of ROWS resumes instead of --dataset")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--modes', nargs='+', choices=HTML_MODES, default=list(HTML_MODES))
+    parser.add_argument('--n-estimators', type=int, default=MODEL_PARAMS['n_estimators'])
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='cv_corpus_') as workdir:
+        dataset = Path(args.dataset)
+        if args.synthetic:
+            from bench_retrieval import write_training_csv
+
+            dataset = Path(workdir) / 'Resume.csv'
+            write_training_csv(dataset, random.Random(args.seed), args.synthetic, 300, 5000)
+        report = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'dataset': f"synthetic ({args.synthetic} rows)" if args.synthetic else args.dataset,
+            'results': [evaluate(dataset, mode, args.n_estimators) for mode in args.modes],
+        }
+    if all(result['accuracy'] == 1.0 and result['ranking_map'] == 1.0 for result in report['results']):
+        report['note'] = ("every mode reaches 1.0 accuracy and MAP on this dataset: it shows the "
+                          "memory and fit-time gap only, not that the modes rank equally well")
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+        print(f"📊 Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
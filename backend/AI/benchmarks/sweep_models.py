@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+sweep_models.py - Recherche des paramètres du modèle par validation croisée
+Évalue toutes les combinaisons de classificateur ('forest', 'linear'),
+max_features, n-grammes du TF-IDF et poids du score de catégorie dans le
+score final (poids * catégorie + (1 - poids) * similarité; production: 0.4),
+sur K plis stratifiés au lieu d'un seul train_test_split.
+
+  - Chaque pli est vectorisé une fois par configuration du TF-IDF et gardé
+    sur disque (AI/cache/sweep/<clé>/: matrices .npz et vectorizer): un
+    second sweep sur le même dataset ne revectorise rien.
+  - Vectorisation et entraînements sont répartis sur les cœurs (--jobs).
+  - Le poids ne demande pas de nouvel entraînement: il est appliqué aux
+    scores de chaque pli.
+  - La latence par CV (vectorisation + score de catégorie + similarité,
+    comme screen_batch) est mesurée après le sweep, un modèle à la fois,
+    pour ne pas être faussée par les entraînements en parallèle.
+
+Chaque ligne du rapport donne la précision, la MAP et la précision des k
+premiers (moyenne et écart-type sur les plis) et la latence par CV;
+--latency-budget-ms choisit la meilleure MAP qui tient dans le budget.
+Usage: python benchmarks/sweep_models.py [--dataset utils/Resume.csv | --synthetic 5000]
+           [--classifiers forest linear] [--max-features 2000 5000] [--ngrams 1-1 1-2]
+           [--weights 0.2 0.4 0.6] [--folds 5] [--jobs N] [--latency-budget-ms 2]
+           [--output sweep.json]
+"""
+
+import io
+import sys
+import os
+import json
+import time
+import random
+import shutil
+import hashlib
+import argparse
+import platform
+import tempfile
+import itertools
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai3 import SCRIPT_DIR, DATASET_PATH, MODEL_PARAMS, LINEAR_MODEL_PARAMS
+from corpus import load_corpus
+from featurizer import compact_vectorizer
+from linear_scorer import LinearCategoryScorer
+from model_store import dataset_fingerprint
+
+DEFAULT_CACHE_DIR = SCRIPT_DIR / 'cache' / 'sweep'
+# Incrémenter si le contenu des plis en cache change
+SWEEP_CACHE_VERSION = 1
+
+# Corpus du processus worker, chargé une fois par _init_worker
+_corpus = None
+
+def _init_worker(dataset, html_mode):
+    global _corpus
+    _corpus = load_corpus(dataset, html_mode=html_mode)
+
+def parse_ngram(value):
+    """'1-2' -> (1, 2)"""
+    low, _, high = value.partition('-')
+    return int(low), int(high or low)
+
+# ==================== PLIS VECTORISÉS (CACHE) ====================
+
+def fold_key(sha256, args, fold, vectorizer_config):
+    """Clé d'un pli vectorisé: dataset, découpage et paramètres du TF-IDF"""
+    import sklearn
+
+    payload = json.dumps({
+        'dataset': sha256, 'html': MODEL_PARAMS['html'], 'folds': args.folds, 'seed': args.seed,
+        'fold': fold, 'vectorizer': vectorizer_config, 'sklearn': sklearn.__version__,
+        'version': SWEEP_CACHE_VERSION,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def vectorize_fold(cache_path, train_idx, test_idx, vectorizer_config):
+    """Vectorise un pli (dans un worker) s'il n'est pas déjà en cache"""
+    import joblib
+    import scipy.sparse as sp
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    cache_path = Path(cache_path)
+    if (cache_path / 'vectorizer.joblib').exists():
+        return False
+    vectorizer = TfidfVectorizer(
+        max_features=vectorizer_config['max_features'],
+        stop_words=MODEL_PARAMS['stop_words'],
+        ngram_range=tuple(vectorizer_config['ngram_range'])
+    )
+    X_train = vectorizer.fit_transform(_corpus.texts.take(train_idx))
+    X_test = vectorizer.transform(_corpus.texts.take(test_idx))
+    if hasattr(vectorizer, 'stop_words_'):
+        del vectorizer.stop_words_
+
+    # Écriture dans un dossier temporaire puis renommage: pas de pli à moitié écrit
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+    sp.save_npz(tmp_path / 'X_train.npz', X_train)
+    sp.save_npz(tmp_path / 'X_test.npz', X_test)
+    joblib.dump(vectorizer, tmp_path / 'vectorizer.joblib')
+    try:
+        tmp_path.rename(cache_path)
+    except OSError:
+        # Un autre sweep a écrit le même pli entre-temps
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return True
+
+def load_fold(cache_path):
+    import scipy.sparse as sp
+
+    cache_path = Path(cache_path)
+    return sp.load_npz(cache_path / 'X_train.npz').tocsr(), sp.load_npz(cache_path / 'X_test.npz').tocsr()
+
+# ==================== ÉVALUATION ====================
+
+def fit_classifier(classifier, X, y):
+    from sklearn.ensemble import RandomForestClassifier
+
+    if classifier == 'linear':
+        return LinearCategoryScorer.fit(
+            X, y, C=LINEAR_MODEL_PARAMS['C'], max_iter=LINEAR_MODEL_PARAMS['max_iter']
+        )
+    return RandomForestClassifier(
+        n_estimators=MODEL_PARAMS['n_estimators'], random_state=MODEL_PARAMS['random_state']
+    ).fit(X, y)
+
+def model_size_kb(model):
+    import joblib
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return round(buffer.tell() / 1024, 1)
+
+def ranking_scores(X_train, y_train, X_test, y_test, probas, n_classes, weights, k):
+    """
+    MAP et précision des k premiers du classement, pour chaque poids
+
+    Comme compare_corpus.ranking_map: chaque catégorie sert de requête, la
+    "description de poste" est le centroïde TF-IDF des CV d'entraînement.
+    """
+    from sklearn.metrics import average_precision_score
+
+    scores = {weight: {'map': [], 'precision_at_k': []} for weight in weights}
+    for c in range(n_classes):
+        relevant = (y_test == c)
+        if not relevant.any():
+            continue
+        centroid = np.asarray(X_train[y_train == c].mean(axis=0))
+        norm = np.linalg.norm(centroid)
+        similarity = (X_test @ centroid.T).ravel() / norm if norm > 0 else np.zeros(X_test.shape[0])
+        for weight in weights:
+            final = weight * probas[:, c] + (1 - weight) * similarity
+            top = np.argsort(-final, kind='stable')[:k]
+            scores[weight]['map'].append(average_precision_score(relevant, final))
+            scores[weight]['precision_at_k'].append(float(relevant[top].mean()))
+    return {weight: {name: float(np.mean(values)) for name, values in metrics.items()}
+            for weight, metrics in scores.items()}
+
+def evaluate_fold(cache_path, train_idx, test_idx, classifier, weights, k, keep_model):
+    """Entraîne et évalue un classificateur sur un pli (dans un worker)"""
+    X_train, X_test = load_fold(cache_path)
+    y_train, y_test = _corpus.labels[train_idx], _corpus.labels[test_idx]
+    n_classes = len(_corpus.classes)
+
+    start = time.perf_counter()
+    model = fit_classifier(classifier, X_train, y_train)
+    fit_s = time.perf_counter() - start
+
+    probas = np.zeros((X_test.shape[0], n_classes))
+    probas[:, _model_classes(model, n_classes)] = category_scores(model, X_test)
+    return {
+        'fit_s': fit_s,
+        'accuracy': float(np.mean(probas.argmax(axis=1) == y_test)),
+        'ranking': ranking_scores(X_train, y_train, X_test, y_test, probas, n_classes, weights, k),
+        'model_kb': model_size_kb(model),
+        # Modèle du premier pli, pour la mesure de latence
+        'model': model if keep_model else None,
+    }
+
+def category_scores(model, X):
+    """
+    Scores de catégorie comme en production (ai3 CVScreener._class_scores):
+    sigmoïde un-contre-tous du modèle linéaire, predict_proba de la forêt
+    """
+    if hasattr(model, 'class_scores'):
+        return model.class_scores(X)
+    return model.predict_proba(X)
+
+def _model_classes(model, n_classes):
+    """Colonnes des scores (une catégorie absente d'un pli n'en a pas)"""
+    classes = getattr(model, 'classes_', None)
+    return np.asarray(classes) if classes is not None else np.arange(n_classes)
+
+def latency_ms_per_cv(vectorizer, model, texts, job_text, repeat):
+    """
+    Temps par CV du chemin de screen_batch: transform des CV, score de la
+    catégorie visée et similarité cosinus avec la description du poste
+    """
+    job_vector = vectorizer.transform([job_text])
+    target = [0]
+
+    def screen():
+        cv_vectors = vectorizer.transform(texts)
+        if hasattr(model, 'target_scores'):
+            model.target_scores(cv_vectors, target)
+        else:
+            model.predict_proba(cv_vectors)[:, target]
+        np.asarray((cv_vectors @ job_vector.T).todense())
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        screen()
+        best = min(best, time.perf_counter() - start)
+    return 1000 * best / len(texts)
+
+# ==================== SWEEP ====================
+
+def run_sweep(args, dataset):
+    """Vectorise (ou relit) les plis, évalue la grille et mesure la latence"""
+    import joblib
+    from sklearn.model_selection import StratifiedKFold
+
+    cache_dir = Path(args.cache_dir)
+    sha256 = dataset_fingerprint(dataset)['sha256']
+    corpus = load_corpus(dataset, html_mode=MODEL_PARAMS['html'])
+    splitter = StratifiedKFold(n_splits=args.folds, shuffle=True, random_state=args.seed)
+    folds = list(splitter.split(np.zeros(len(corpus)), corpus.labels))
+    vectorizer_configs = [
+        {'max_features': max_features, 'ngram_range': list(parse_ngram(ngram))}
+        for max_features, ngram in itertools.product(args.max_features, args.ngrams)
+    ]
+    paths = {
+        (v, f): cache_dir / fold_key(sha256, args, f, config)
+        for v, config in enumerate(vectorizer_configs) for f in range(args.folds)
+    }
+
+    timings = {}
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker,
+                             initargs=(str(dataset), MODEL_PARAMS['html'])) as pool:
+        print(f"📦 Vectorizing {len(paths)} folds ({args.jobs} workers)...", file=sys.stderr)
+        start = time.perf_counter()
+        futures = [
+            pool.submit(vectorize_fold, str(path), folds[f][0], folds[f][1], vectorizer_configs[v])
+            for (v, f), path in paths.items()
+        ]
+        written = [future.result() for future in futures]
+        timings['vectorize_s'] = round(time.perf_counter() - start, 3)
+        timings['folds_vectorized'] = sum(written)
+        timings['folds_from_cache'] = len(written) - sum(written)
+
+        tasks = list(itertools.product(range(len(vectorizer_configs)), args.classifiers, range(args.folds)))
+        print(f"🏋️ Fitting {len(tasks)} models ({args.jobs} workers)...", file=sys.stderr)
+        start = time.perf_counter()
+        futures = [
+            pool.submit(evaluate_fold, str(paths[v, f]), folds[f][0], folds[f][1], classifier,
+                        args.weights, args.top_k, f == 0)
+            for v, classifier, f in tasks
+        ]
+        evaluations = {task: future.result() for task, future in zip(tasks, futures)}
+        timings['fit_s'] = round(time.perf_counter() - start, 3)
+
+    # Latence: un modèle à la fois, CV du premier pli de test
+    rng = random.Random(args.seed)
+    test_idx = folds[0][1]
+    sample = corpus.texts.take(rng.sample(list(test_idx), min(args.latency_sample, len(test_idx))))
+    job_text = corpus.texts[int(folds[0][0][0])]
+    rows = []
+    for (v, config), classifier in itertools.product(enumerate(vectorizer_configs), args.classifiers):
+        vectorizer = joblib.load(paths[v, 0] / 'vectorizer.joblib')
+        if args.featurizer == 'compact':
+            vectorizer = compact_vectorizer(vectorizer)
+        per_fold = [evaluations[v, classifier, f] for f in range(args.folds)]
+        latency = latency_ms_per_cv(vectorizer, per_fold[0]['model'], sample, job_text, args.repeat)
+        accuracy = [fold['accuracy'] for fold in per_fold]
+        for weight in args.weights:
+            maps = [fold['ranking'][weight]['map'] for fold in per_fold]
+            precisions = [fold['ranking'][weight]['precision_at_k'] for fold in per_fold]
+            rows.append({
+                'classifier': classifier,
+                'max_features': config['max_features'],
+                'ngram_range': config['ngram_range'],
+                'category_weight': weight,
+                'accuracy': round(float(np.mean(accuracy)), 4),
+                'accuracy_std': round(float(np.std(accuracy)), 4),
+                'ranking_map': round(float(np.mean(maps)), 4),
+                'ranking_map_std': round(float(np.std(maps)), 4),
+                f'precision_at_{args.top_k}': round(float(np.mean(precisions)), 4),
+                'latency_ms_per_cv': round(latency, 3),
+                'fit_s': round(float(np.mean([fold['fit_s'] for fold in per_fold])), 3),
+                'model_kb': per_fold[0]['model_kb'],
+            })
+    return len(corpus), rows, timings
+
+def best_row(rows, latency_budget_ms=None):
+    """Meilleure MAP (puis précision, puis latence) parmi les lignes qui tiennent dans le budget"""
+    eligible = [row for row in rows
+                if latency_budget_ms is None or row['latency_ms_per_cv'] <= latency_budget_ms]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda row: (row['ranking_map'], row['accuracy'], -row['latency_ms_per_cv']))
+
+# ==================== PROGRAMME PRINCIPAL ====================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-validated sweep over the screening model parameters")
+    parser.add_argument('--dataset', default=str(DATASET_PATH))
+    parser.add_argument('--synthetic', type=int, metavar='ROWS',
+                        help="sweep on a synthetic corpus of ROWS resumes instead of --dataset")
+    parser.add_argument('--classifiers', nargs='+', choices=['forest', 'linear'], default=['forest', 'linear'])
+    parser.add_argument('--max-features', nargs='+', type=int, default=[2000, 5000, 10000])
+    parser.add_argument('--ngrams', nargs='+', default=['1-1', '1-2'],
+                        help="n-gram ranges as MIN-MAX (default: 1-1 1-2)")
+    parser.add_argument('--weights', nargs='+', type=float, default=[0.2, 0.4, 0.6],
+                        help="category weights in the final score (default: 0.2 0.4 0.6)")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--top-k', type=int, default=10, help="shortlist size for precision@k")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per CPU core)")
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help="vectorized folds cache (default: AI/cache/sweep)")
+    parser.add_argument('--featurizer', choices=['tfidf', 'compact'], default='tfidf',
+                        help="vectorizer used for the latency measurement (see featurizer.py)")
+    parser.add_argument('--latency-sample', type=int, default=200, help="resumes per latency run")
+    parser.add_argument('--latency-budget-ms', type=float,
+                        help="pick the best model whose latency per resume fits this budget")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="latency repetitions, the best one is kept (default: 3)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix='cv_sweep_') as workdir:
+        dataset = Path(args.dataset)
+        if args.synthetic:
+            from bench_retrieval import write_training_csv
+
+            dataset = Path(workdir) / 'Resume.csv'
+            write_training_csv(dataset, random.Random(args.seed), args.synthetic, 300, 5000)
+        start = time.perf_counter()
+        n_rows, rows, timings = run_sweep(args, dataset)
+        timings['total_s'] = round(time.perf_counter() - start, 3)
+
+    best = best_row(rows, args.latency_budget_ms)
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'dataset': f"synthetic ({args.synthetic} rows)" if args.synthetic else args.dataset,
+        'rows': n_rows,
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'dataset')},
+        'timings': timings,
+        'best': best,
+        'results': sorted(rows, key=lambda row: -row['ranking_map']),
+    }
+    if best is None:
+        print(f"⚠️ No model fits {args.latency_budget_ms} ms per resume", file=sys.stderr)
+    else:
+        print(f"🏆 Best: {best['classifier']} max_features={best['max_features']} "
+              f"ngram={best['ngram_range']} weight={best['category_weight']} "
+              f"(MAP {best['ranking_map']}, {best['latency_ms_per_cv']} ms/CV)", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+        print(f"📊 Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+corpus.py - Chargement léger du corpus d'entraînement (utils/Resume.csv)
+Le CSV est lu par morceaux en ne gardant que les colonnes utiles. La colonne
+Resume_html (même contenu que Resume_str, avec le balisage) est ignorée par
+défaut, ou nettoyée de ses balises. Les textes sont stockés dans une seule
+chaîne avec un tableau d'offsets au lieu d'un DataFrame de chaînes longues.
+"""
+
+import re
+import sys
+import html
+
+import numpy as np
+import pandas as pd
+
+TEXT_COLUMN = 'Resume_str'
+HTML_COLUMN = 'Resume_html'
+LABEL_COLUMN = 'Category'
+
+# Schéma de utils/AI_Resume_Screening.csv: le texte est reconstruit à partir
+# des colonnes descriptives, la catégorie est le poste visé
+SCREENING_TEXT_COLUMNS = ['Skills', 'Education', 'Certifications']
+SCREENING_LABEL_COLUMN = 'Job Role'
+
+# Modes de traitement de la colonne HTML
+HTML_MODES = ('skip', 'strip', 'raw')
+
+_TAG_RE = re.compile(r'<[^>]*>')
+_SPACE_RE = re.compile(r'\s+')
+
+def strip_html(markup):
+    """Retire les balises et décode les entités HTML"""
+    return _SPACE_RE.sub(' ', html.unescape(_TAG_RE.sub(' ', markup))).strip()
+
+# ==================== STOCKAGE EN COLONNE ====================
+
+class TextColumn:
+    """Suite de textes stockés dans une seule chaîne + offsets"""
+
+    def __init__(self, data, offsets):
+        self._data = data
+        self._offsets = offsets
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Construit la colonne à partir de listes de textes"""
+        parts = []
+        lengths = []
+        for texts in chunks:
+            parts.append(''.join(texts))
+            lengths.extend(len(text) for text in texts)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(''.join(parts), offsets)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return self._data[self._offsets[i]:self._offsets[i + 1]]
+
+    def __iter__(self):
+        data, offsets = self._data, self._offsets
+        for i in range(len(self)):
+            yield data[offsets[i]:offsets[i + 1]]
+
+    def take(self, indices):
+        """Liste des textes aux positions données"""
+        return [self[int(i)] for i in indices]
+
+    @property
+    def nbytes(self):
+        return len(self._data) + self._offsets.nbytes
+
+class Corpus:
+    """Textes + catégories encodées (classes triées, comme LabelEncoder)"""
+
+    def __init__(self, texts, labels, classes):
+        self.texts = texts
+        self.labels = labels
+        self.classes = classes
+
+    def __len__(self):
+        return len(self.texts)
+
+    def to_frame(self):
+        """DataFrame 'CV_text' / 'Category' pour les scripts d'exploration"""
+        return pd.DataFrame({
+            'CV_text': list(self.texts),
+            LABEL_COLUMN: self.classes[self.labels],
+        })
+
+# ==================== CHARGEMENT ====================
+
+def _chunk_texts(chunk, html_mode):
+    texts = chunk[TEXT_COLUMN].fillna('')
+    if html_mode == 'skip':
+        return texts.tolist()
+    markup = chunk[HTML_COLUMN].fillna('')
+    if html_mode == 'strip':
+        markup = markup.map(strip_html)
+    return (texts + ' ' + markup).tolist()
+
+def _screening_chunk_texts(chunk):
+    columns = [chunk[column].fillna('') for column in SCREENING_TEXT_COLUMNS]
+    texts = columns[0]
+    for column in columns[1:]:
+        texts = texts + ' ' + column
+    return texts.tolist()
+
+def load_corpus(dataset_path, html_mode='skip', chunksize=500, encoding='latin-1'):
+    """
+    Lit le dataset par morceaux
+
+    Args:
+        dataset_path: CSV avec Resume_str, Resume_html et Category
+                      (ou le schéma de AI_Resume_Screening.csv)
+        html_mode: 'skip' (ignorer Resume_html), 'strip' (texte sans balises)
+                   ou 'raw' (ancien comportement: Resume_str + ' ' + Resume_html)
+        chunksize: nombre de lignes lues à la fois
+
+    Returns:
+        Corpus
+    """
+    if html_mode not in HTML_MODES:
+        raise ValueError(f"html_mode must be one of {HTML_MODES}, got {html_mode!r}")
+
+    header = pd.read_csv(dataset_path, encoding=encoding, nrows=0).columns
+    if TEXT_COLUMN in header:
+        columns = [TEXT_COLUMN, LABEL_COLUMN]
+        if html_mode != 'skip':
+            columns.append(HTML_COLUMN)
+        label_column = LABEL_COLUMN
+        chunk_texts = lambda chunk: _chunk_texts(chunk, html_mode)
+    elif SCREENING_LABEL_COLUMN in header:
+        columns = SCREENING_TEXT_COLUMNS + [SCREENING_LABEL_COLUMN]
+        label_column = SCREENING_LABEL_COLUMN
+        chunk_texts = _screening_chunk_texts
+    else:
+        raise ValueError(f"Unknown dataset schema in {dataset_path}: {list(header)}")
+
+    labels = []
+
+    def chunks():
+        reader = pd.read_csv(
+            dataset_path, encoding=encoding, usecols=columns,
+            dtype=str, chunksize=chunksize
+        )
+        for chunk in reader:
+            labels.extend(chunk[label_column].fillna('').tolist())
+            yield chunk_texts(chunk)
+
+    texts = TextColumn.from_chunks(chunks())
+    classes, codes = np.unique(np.asarray(labels, dtype=object).astype(str), return_inverse=True)
+    print(f"✅ Corpus loaded: {len(texts)} CVs, {len(classes)} categories, "
+          f"{texts.nbytes / (1024 * 1024):.1f} MB of text", file=sys.stderr)
+    return Corpus(texts, codes.astype(np.int32), classes.astype(object))
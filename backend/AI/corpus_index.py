@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+corpus_index.py - Index TF-IDF précalculé du corpus de référence
+Stocke sur disque la matrice CSR des CV (triés par catégorie), les bornes de
+chaque catégorie et les probabilités de classe déjà calculées. Les tableaux
+sont ouverts en memory-map: une recherche ne fait que transformer la
+description du poste et un produit creux sur les lignes de la catégorie.
+"""
+
+import sys
+import json
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+import sklearn
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+DEFAULT_INDEX_DIR = SCRIPT_DIR / 'cache' / 'corpus_index'
+
+_ARRAYS = ('data', 'indices', 'indptr', 'probas', 'rows')
+
+def index_key(dataset_sha256, params):
+    """Clé de l'index: dataset + paramètres du modèle + version de sklearn"""
+    payload = json.dumps(
+        {'dataset': dataset_sha256, 'params': params, 'sklearn': sklearn.__version__},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class CorpusIndex:
+    def __init__(self, path, meta, arrays):
+        self.path = Path(path)
+        self.meta = meta
+        self.data = arrays['data']
+        self.indices = arrays['indices']
+        self.indptr = arrays['indptr']
+        self.probas = arrays['probas']
+        # Position de chaque ligne de l'index dans le DataFrame d'origine
+        self.rows = arrays['rows']
+        self.categories = {cat: tuple(bounds) for cat, bounds in meta['categories'].items()}
+
+    # ==================== CONSTRUCTION ====================
+
+    @classmethod
+    def build(cls, path, key, vectorizer, clf, texts, categories):
+        """
+        Vectorise le corpus une seule fois et écrit l'index
+
+        Args:
+            path: dossier de l'index
+            key: clé identifiant le modèle (voir index_key)
+            vectorizer, clf: modèle déjà entraîné
+            texts: textes des CV (ordre du DataFrame)
+            categories: catégorie de chaque CV (même ordre)
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        print(f"🔧 Building corpus index ({len(texts)} CVs)...", file=sys.stderr)
+
+        categories = np.asarray(categories, dtype=object)
+        names, codes = np.unique(categories.astype(str), return_inverse=True)
+        # Tri stable: l'ordre du DataFrame est conservé dans chaque catégorie
+        rows = np.argsort(codes, kind='stable')
+
+        X = vectorizer.transform(list(texts)).tocsr()[rows]
+        X.sort_indices()
+        probas = clf.predict_proba(X)
+
+        bounds = np.searchsorted(codes[rows], np.arange(len(names) + 1))
+        meta = {
+            'key': key,
+            'shape': list(X.shape),
+            'categories': {
+                str(name): [int(bounds[i]), int(bounds[i + 1])]
+                for i, name in enumerate(names)
+            },
+        }
+
+        arrays = {
+            'data': X.data,
+            'indices': X.indices,
+            'indptr': X.indptr,
+            'probas': probas,
+            'rows': rows,
+        }
+        for name in _ARRAYS:
+            np.save(path / f"{name}.npy", arrays[name])
+        # meta.json en dernier: un index incomplet n'est jamais chargé
+        with open(path / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        print(f"💾 Corpus index saved to: {path}", file=sys.stderr)
+        return cls.load(path, key)
+
+    @classmethod
+    def load(cls, path, key=None):
+        """Ouvre l'index en memory-map, ou None s'il est absent ou obsolète"""
+        path = Path(path)
+        try:
+            with open(path / 'meta.json', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if key is not None and meta.get('key') != key:
+            return None
+
+        try:
+            arrays = {name: np.load(path / f"{name}.npy", mmap_mode='r') for name in _ARRAYS}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not open corpus index: {e}", file=sys.stderr)
+            return None
+        return cls(path, meta, arrays)
+
+    # ==================== RECHERCHE ====================
+
+    def category_matrix(self, category):
+        """Lignes CSR d'une catégorie (vues sur les tableaux memory-mappés)"""
+        start, end = self.categories[category]
+        ptr = self.indptr[start:end + 1]
+        lo, hi = int(ptr[0]), int(ptr[-1])
+        return sp.csr_matrix(
+            (self.data[lo:hi], self.indices[lo:hi], np.asarray(ptr) - lo),
+            shape=(end - start, self.meta['shape'][1])
+        )
+
+    def search(self, category, job_vector, target_idx):
+        """
+        Score les CV d'une catégorie pour une description de poste
+
+        Args:
+            category: catégorie filtrée
+            job_vector: description du poste déjà vectorisée (1 x n_features)
+            target_idx: colonne de la catégorie dans predict_proba
+
+        Returns:
+            (positions dans le DataFrame, category_scores, similarity_scores)
+        """
+        start, end = self.categories[category]
+        X = self.category_matrix(category)
+
+        # Les vecteurs TF-IDF sont normalisés (L2): produit scalaire = cosinus
+        job_vector = sp.csr_matrix(job_vector)
+        norm = np.sqrt(job_vector.multiply(job_vector).sum())
+        if norm > 0:
+            job_vector = job_vector / norm
+        similarity_scores = np.asarray((X @ job_vector.T).todense()).ravel()
+
+        category_scores = np.asarray(self.probas[start:end, target_idx])
+        return np.asarray(self.rows[start:end]), category_scores, similarity_scores
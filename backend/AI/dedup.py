@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+dedup.py - Regroupement des CV en double avant le scoring
+Un même candidat envoie souvent plusieurs fois son CV (copie, autre format,
+version corrigée). Les doublons sont détectés sur le texte extrait:
+  - 'exact': même texte une fois normalisé (minuscules, mots seulement)
+  - 'near': 'exact' + MinHash/LSH sur les triplets de mots. Les paires
+    candidates (même bande LSH) sont confirmées par la similarité de Jaccard
+    estimée (part des valeurs MinHash égales) >= threshold.
+  - email=True: deux CV avec le même premier email sont aussi regroupés.
+Chaque groupe garde son premier CV (ordre d'upload); les autres sont listés.
+DuplicateIndex garde les empreintes de tout un job découpé en paquets (file
+de jobs, rapport de lot): un doublon est reconnu même dans un autre paquet.
+
+Configuration: option --dedup de ai3.py, ou 'dedup' dans la requête (un mode
+ou un dict avec 'mode', 'threshold' et 'email').
+"""
+
+import re
+import hashlib
+import zlib
+
+import numpy as np
+
+from field_extraction import EMAIL_PATTERN
+
+DEDUP_MODES = ('off', 'exact', 'near')
+DEFAULT_THRESHOLD = 0.8
+SHINGLE_WORDS = 3
+NUM_PERM = 128
+# 32 bandes de 4 lignes: paire candidate dès ~0.4 de Jaccard, confirmée ensuite
+LSH_BANDS = 32
+
+_WORD_RE = re.compile(r'\w+')
+_EMAIL_RE = re.compile(EMAIL_PATTERN)
+# Nombre premier > 2^32 pour les permutations (a * x + b) mod p
+_PRIME = np.uint64(4294967311)
+
+def dedup_config(value, default='off'):
+    """
+    Lit la configuration de la déduplication ('near', {'mode': 'near', ...}...)
+
+    Args:
+        value: configuration de la requête, ou None
+        default: configuration utilisée si value est None (celle du screener)
+
+    Returns:
+        (mode, threshold, email)
+    """
+    if isinstance(value, DuplicateIndex):
+        return value.mode, value.threshold, value.email
+    config = default if value is None else value
+    if isinstance(config, str):
+        config = {'mode': config}
+    mode = config.get('mode', 'off')
+    if mode not in DEDUP_MODES:
+        raise ValueError(f"dedup mode must be one of {DEDUP_MODES}, got {mode!r}")
+    return mode, float(config.get('threshold', DEFAULT_THRESHOLD)), bool(config.get('email', False))
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2 ** 32, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2 ** 32, num_perm, dtype=np.uint64)
+        self._word_ids = {}
+
+    def shingles(self, words):
+        """Hash 32 bits des triplets de mots (calcul vectorisé)"""
+        word_ids = self._word_ids
+        for word in set(words).difference(word_ids):
+            word_ids[word] = zlib.crc32(word.encode('utf-8'))
+        ids = np.fromiter(map(word_ids.__getitem__, words), dtype=np.uint64, count=len(words))
+        if len(ids) < SHINGLE_WORDS:
+            ids = np.concatenate([ids, np.zeros(SHINGLE_WORDS - len(ids), dtype=np.uint64)])
+        # Combinaison des mots voisins (dépassements voulus, modulo 2^64)
+        combined = np.zeros(len(ids) - SHINGLE_WORDS + 1, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for offset in range(SHINGLE_WORDS):
+                combined = combined * np.uint64(1000003) + ids[offset:len(ids) - SHINGLE_WORDS + 1 + offset]
+        return np.unique((combined ^ (combined >> np.uint64(32))) & np.uint64(0xFFFFFFFF))
+
+    def signature(self, words):
+        """Signature MinHash (num_perm valeurs) d'une liste de mots"""
+        shingles = self.shingles(words)
+        # a * x + b < 2^64 pour a, b, x < 2^32
+        return ((np.outer(self.a, shingles) + self.b[:, None]) % _PRIME).min(axis=1)
+
+def _first_email(text):
+    match = _EMAIL_RE.search(text)
+    return match.group(0).lower() if match else None
+
+class DuplicateIndex:
+    """
+    Empreintes des CV déjà vus d'un job ou d'un rapport
+
+    Les CV sont ajoutés paquet par paquet (add): chacun est comparé à tous
+    les CV déjà ajoutés, y compris ceux des paquets précédents. Un doublon
+    rejoint le groupe du premier CV qu'il recoupe (le plus ancien s'il en
+    recoupe plusieurs); les groupes déjà formés ne sont jamais fusionnés,
+    un CV gardé et déjà scoré le reste.
+    """
+
+    def __init__(self, mode='near', threshold=DEFAULT_THRESHOLD, email=False):
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"dedup mode must be one of {DEDUP_MODES}, got {mode!r}")
+        self.mode = mode
+        self.threshold = threshold
+        self.email = email
+        # Par CV ajouté (id global): sa clé et le premier CV de son groupe
+        self._keys = []
+        self._roots = []
+        self._first_by_key = {}
+        self._hasher = MinHasher() if mode == 'near' else None
+        self._signatures = []
+        self._buckets = [{} for _ in range(LSH_BANDS)]
+        # Clé d'un doublon -> (clé du CV gardé, raison), pour tout le job
+        self.duplicate_of = {}
+
+    @property
+    def active(self):
+        return self.mode != 'off' or self.email
+
+    def _matches(self, i, text, words):
+        """(id du premier CV du groupe, raison) de chaque CV déjà vu que recoupe le CV i"""
+        matches = []
+        keys = []
+        if self.mode != 'off':
+            keys.append((('exact', hashlib.sha256(' '.join(words).encode('utf-8')).digest()), 'exact'))
+        if self.email:
+            address = _first_email(text)
+            if address:
+                keys.append((('email', address), 'email'))
+        for key, reason in keys:
+            first = self._first_by_key.setdefault(key, i)
+            if first != i:
+                matches.append((self._roots[first], reason))
+
+        if self._hasher is not None:
+            signature = self._hasher.signature(words)
+            self._signatures.append(signature)
+            rows = NUM_PERM // LSH_BANDS
+            compared = set()
+            for band, buckets in enumerate(self._buckets):
+                members = buckets.setdefault(signature[band * rows:(band + 1) * rows].tobytes(), [])
+                # Tous les membres du seau, pas seulement le premier
+                for j in members:
+                    if j in compared:
+                        continue
+                    compared.add(j)
+                    similarity = float(np.mean(signature == self._signatures[j]))
+                    if similarity >= self.threshold:
+                        matches.append((self._roots[j], f"near ({similarity:.2f})"))
+                members.append(i)
+        return matches
+
+    def add(self, texts, keys=None):
+        """
+        Ajoute un paquet de CV
+
+        Args:
+            texts: textes extraits des CV
+            keys: identifiant de chaque CV (ex: chemin), défaut: son id global
+
+        Returns:
+            (keep, duplicates): index dans le paquet des CV gardés (croissants)
+            et liste de (index dans le paquet, clé du CV gardé, raison)
+        """
+        keep, duplicates = [], []
+        for position, text in enumerate(texts):
+            i = len(self._roots)
+            key = i if keys is None else keys[position]
+            self._keys.append(key)
+            matches = self._matches(i, text, _WORD_RE.findall(text.lower()))
+            if matches:
+                # Le plus ancien groupe; à égalité, la première raison (exact, email, near)
+                root, reason = min(matches, key=lambda match: match[0])
+                self._roots.append(root)
+                self.duplicate_of[key] = (self._keys[root], reason)
+                duplicates.append((position, self._keys[root], reason))
+            else:
+                self._roots.append(i)
+                keep.append(position)
+        return keep, duplicates
+
+def find_duplicates(texts, mode='near', threshold=DEFAULT_THRESHOLD, email=False):
+    """
+    Regroupe les CV en double
+
+    Args:
+        texts: textes extraits des CV
+        mode: 'exact' ou 'near' ('off': seulement par email si email=True)
+        threshold: similarité de Jaccard minimale (mode 'near')
+        email: regroupe aussi les CV qui ont le même email
+
+    Returns:
+        (keep, duplicates): index des CV gardés (croissants) et dict
+        index gardé -> liste de (index du doublon, raison)
+    """
+    index = DuplicateIndex(mode, threshold, email)
+    if not index.active or len(texts) < 2:
+        return list(range(len(texts))), {}
+    keep, found = index.add(texts)
+    duplicates = {}
+    for i, root, reason in found:
+        duplicates.setdefault(root, []).append((i, reason))
+    return keep, duplicates
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+extraction.py - Extraction du texte des CV (PDF, DOCX)
+L'extraction d'un lot de CV peut être répartie sur un pool de processus.
+"""
+
+import sys
+import os
+import json
+import time
+import hashlib
+import signal
+import threading
+import multiprocessing
+from pathlib import Path
+from contextlib import ExitStack
+
+import instrumentation
+from ocr import needs_ocr, ocr_pages, ocr_settings
+from text_cache import TextCache
+
+# Incrémenter à chaque changement du texte produit (invalide le cache)
+EXTRACTOR_VERSION = 3
+
+# Limites de lecture d'un PDF (un portfolio de 60 pages n'est pas un CV)
+PDF_MAX_PAGES = int(os.environ.get('CV_PDF_MAX_PAGES', 25))
+PDF_MAX_CHARS = int(os.environ.get('CV_PDF_MAX_CHARS', 100000))
+
+# ==================== EXTRACTION DE TEXTE ====================
+
+def iter_pdf_pages(pdf_path, info=None, max_pages=None):
+    """
+    Parcourt les pages d'un PDF une à une
+    
+    pdfplumber est essayé d'abord; PyPDF2 n'est ouvert que si une page n'a
+    pas de texte avec pdfplumber, et seulement pour cette page. Le cache de
+    chaque page pdfplumber est libéré dès qu'elle est lue.
+    
+    Yields:
+        (texte de la page, la page contient une image, backend ou None)
+    """
+    # Imports différés: un lot de DOCX ne charge pas les backends PDF
+    import PyPDF2
+    import pdfplumber
+    
+    if info is None:
+        info = {}
+    if max_pages is None:
+        max_pages = PDF_MAX_PAGES
+    
+    with pdfplumber.open(pdf_path) as pdf, ExitStack() as stack:
+        info['pages'] = len(pdf.pages)
+        fallback = None
+        for number, page in enumerate(pdf.pages):
+            if number >= max_pages:
+                info['skipped_pages'] = len(pdf.pages) - max_pages
+                break
+            try:
+                text = page.extract_text() or ""
+                has_images = bool(page.images)
+            finally:
+                page.close()
+            backend = 'pdfplumber' if text.strip() else None
+            
+            if backend is None:
+                # Méthode 2: PyPDF2, pour cette page seulement
+                if fallback is None:
+                    fallback = PyPDF2.PdfReader(stack.enter_context(open(pdf_path, 'rb')))
+                try:
+                    text = fallback.pages[number].extract_text() or ""
+                except Exception as e:
+                    print(f"⚠️ PyPDF2 failed on page {number + 1} of {pdf_path}: {e}", file=sys.stderr)
+                    text = ""
+                backend = 'PyPDF2' if text.strip() else None
+            
+            yield text, has_images, backend
+
+def extract_text_from_pdf(pdf_path, info=None, max_pages=None, max_chars=None):
+    """
+    Extrait le texte d'un PDF (info reçoit le nombre de pages et le backend)
+    
+    Les pages sont lues une à une et la lecture s'arrête dès que max_chars
+    caractères sont réunis (défaut: CV_PDF_MAX_CHARS) ou après max_pages
+    pages (défaut: CV_PDF_MAX_PAGES). Les pages sans texte qui contiennent
+    une image (CV scanné) passent par l'OCR (voir ocr.py).
+    """
+    if info is None:
+        info = {}
+    if max_chars is None:
+        max_chars = PDF_MAX_CHARS
+    pages = []
+    scanned = []
+    backends = set()
+    total = 0
+    try:
+        for text, has_images, backend in iter_pdf_pages(pdf_path, info, max_pages):
+            if backend:
+                backends.add(backend)
+            if needs_ocr(text, has_images):
+                scanned.append(len(pages))
+            pages.append(text)
+            total += len(text)
+            if total >= max_chars:
+                info['truncated'] = True
+                break
+    except Exception as e:
+        info['error'] = str(e)
+        print(f"⚠️ Error extracting text from {pdf_path}: {e}", file=sys.stderr)
+        return ""
+    
+    # OCR des pages scannées seulement
+    if scanned:
+        ocr_texts = ocr_pages(pdf_path, scanned, info)
+        for i, text in ocr_texts.items():
+            if len(text) > len(pages[i].strip()):
+                pages[i] = text
+        if ocr_texts:
+            backends.add('ocr')
+    
+    if backends:
+        info['backend'] = '+'.join(name for name in ('pdfplumber', 'PyPDF2', 'ocr') if name in backends)
+    return "\n".join(text for text in pages if text).strip()[:max_chars]
+
+def extract_text_from_docx(docx_path, info=None):
+    """Extrait le texte d'un DOCX"""
+    import docx2txt
+    
+    if info is None:
+        info = {}
+    try:
+        text = docx2txt.process(docx_path)
+        info['backend'] = 'docx2txt'
+        return text.strip()
+    except Exception as e:
+        info['error'] = str(e)
+        print(f"⚠️ Error extracting text from {docx_path}: {e}", file=sys.stderr)
+        return ""
+
+def _extract_uncached(file_path, info):
+    """Extrait le texte selon le format du fichier"""
+    if file_path.suffix.lower() == '.pdf':
+        return extract_text_from_pdf(file_path, info)
+    elif file_path.suffix.lower() in ['.docx', '.doc']:
+        return extract_text_from_docx(file_path, info)
+    else:
+        print(f"⚠️ Unsupported file format: {file_path}", file=sys.stderr)
+        return ""
+
+def cache_version():
+    """
+    Version du texte produit pour la clé du cache: EXTRACTOR_VERSION et les
+    réglages qui changent le texte d'un même fichier (limites des PDF, OCR).
+    Un changement de réglage n'est pas servi par des entrées plus anciennes.
+    """
+    settings = {'pdf_max_pages': PDF_MAX_PAGES, 'pdf_max_chars': PDF_MAX_CHARS,
+                'ocr': ocr_settings()}
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"{EXTRACTOR_VERSION}-{digest[:8]}"
+
+_cache = None
+
+def get_text_cache():
+    """Cache de texte du processus courant (créé à la première utilisation)"""
+    global _cache
+    if _cache is None:
+        _cache = TextCache()
+    return _cache
+
+def extract_resume_text(file_path, info=None):
+    """
+    Extrait le texte d'un CV (PDF ou DOCX), via le cache si possible
+    
+    info (dict optionnel) reçoit les détails de l'extraction: fichier, durée,
+    pages, backend utilisé, succès du cache, nombre de caractères.
+    """
+    if info is None:
+        info = {}
+    file_path = Path(file_path)
+    info['file'] = str(file_path)
+    start = time.perf_counter()
+    text = _extract_cached(file_path, info)
+    info['wall_s'] = round(time.perf_counter() - start, 6)
+    info['chars'] = len(text)
+    return text
+
+def _extract_cached(file_path, info):
+    cache = get_text_cache()
+    if not cache.enabled:
+        return _extract_uncached(file_path, info)
+    
+    try:
+        key = cache.key(file_path, cache_version())
+    except OSError as e:
+        print(f"⚠️ Cannot read {file_path}: {e}", file=sys.stderr)
+        info['error'] = str(e)
+        return ""
+    
+    text = cache.get(key)
+    info['cached'] = text is not None
+    if text is not None:
+        return text
+    
+    text = _extract_uncached(file_path, info)
+    # Les échecs ne sont pas mis en cache (ils peuvent être transitoires),
+    # ni un OCR interrompu par son budget de temps
+    if text and not info.get('ocr_timeout'):
+        cache.put(key, text)
+    return text
+
+# ==================== EXTRACTION PARALLÈLE ====================
+
+class ExtractionTimeout(Exception):
+    """Levée quand l'extraction d'un fichier dépasse son délai"""
+
+def _on_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+def _extract_with_timeout(file_path, timeout):
+    """
+    Extraction avec délai maximum (SIGALRM), dans le thread principal d'un
+    processus: celui d'un processus du pool, ou le processus courant
+    """
+    info = {}
+    previous = None
+    if timeout:
+        previous = signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_resume_text(file_path, info), info
+    except ExtractionTimeout:
+        print(f"⚠️ Extraction timed out after {timeout}s: {file_path}", file=sys.stderr)
+        info['error'] = 'timeout'
+        return "", info
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool(workers):
+    """
+    Retourne le pool de processus partagé, créé à la première utilisation
+    avec workers processus. Il n'est jamais fermé ni remplacé: d'autres
+    threads (--serve, --queue) peuvent l'utiliser au même moment.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Pas de fork depuis un processus multi-thread (mode --serve)
+            method = 'forkserver' if threading.active_count() > 1 else None
+            _pool = multiprocessing.get_context(method).Pool(workers)
+        return _pool
+
+def extract_many(file_paths, workers=None, timeout=None):
+    """
+    Extrait le texte de plusieurs CV en parallèle
+
+    Args:
+        file_paths: liste de chemins de CV
+        workers: nombre de processus (défaut: nombre de coeurs)
+        timeout: délai maximum par fichier en secondes (None = illimité)
+
+    Returns:
+        liste de textes dans l'ordre des chemins ("" si échec ou délai dépassé)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    metrics = instrumentation.current()
+
+    # Un seul fichier (ou un seul processus demandé): pas de pool. SIGALRM
+    # n'agit que dans le thread principal; ailleurs (threads de --serve), le
+    # délai est appliqué par le pool.
+    in_process = workers <= 1 or len(file_paths) <= 1
+    if in_process and (not timeout or threading.current_thread() is threading.main_thread()):
+        texts = []
+        for path in file_paths:
+            text, info = _extract_with_timeout(str(path), timeout)
+            texts.append(text)
+            if metrics:
+                metrics.add_file(info)
+        return texts
+
+    pool = _get_pool(workers)
+    pending = [
+        pool.apply_async(_extract_with_timeout, (str(path), timeout))
+        for path in file_paths
+    ]
+
+    texts = []
+    for path, result in zip(file_paths, pending):
+        try:
+            # Filet de sécurité si le délai côté processus n'a pas pu agir:
+            # les fichiers précédents sont terminés, celui-ci attend au plus
+            # une tâche en cours puis sa propre extraction
+            text, info = result.get(timeout=None if timeout is None else timeout * 2 + 5)
+        except multiprocessing.TimeoutError:
+            print(f"⚠️ Extraction did not return in time: {path}", file=sys.stderr)
+            text, info = "", {'file': str(path), 'error': 'timeout'}
+        except Exception as e:
+            print(f"⚠️ Error extracting text from {path}: {e}", file=sys.stderr)
+            text, info = "", {'file': str(path), 'error': str(e)}
+        texts.append(text)
+        if metrics:
+            metrics.add_file(info)
+    return texts
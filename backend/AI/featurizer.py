@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+featurizer.py - Vectorisation TF-IDF rapide des CV (option --featurizer)
+Deux remplaçants de TfidfVectorizer.transform, qui traitent un lot de CV à la
+fois. Chaque CV n'est parcouru qu'une fois en Python (préprocesseur et
+tokenizer du vectorizer, puis un id par token distinct du lot); mots vides,
+n-grammes et recherche dans le vocabulaire se font ensuite en numpy sur des
+entiers, sans construire la chaîne de chaque n-gramme.
+
+  - CompactTfidfVectorizer ('compact'): vocabulaire figé d'un TfidfVectorizer
+    entraîné, en tableaux triés. words contient les mots du vocabulaire et
+    keys les n-grammes, codés en base (len(words) + 1) par les numéros de
+    leurs mots (1 à len(words)). La matrice produite est identique à celle de
+    TfidfVectorizer.transform: le modèle entraîné est gardé tel quel.
+  - HashedTfidfVectorizer ('hashing'): sans vocabulaire, chaque n-gramme va
+    dans la colonne donnée par un hash de ses mots (n_features colonnes) puis
+    est pondéré par l'IDF. C'est un autre espace de features: le modèle est
+    entraîné avec ce featurizer (bundle séparé, voir ai3.CLASSIFIERS).
+
+Les deux exposent transform, build_preprocessor, build_tokenizer et des
+tableaux partageables (arrays(), voir shared_model.py).
+"""
+
+import itertools
+import zlib
+
+import numpy as np
+
+FEATURIZERS = ('tfidf', 'compact', 'hashing')
+DEFAULT_HASH_FEATURES = 2 ** 18
+
+# ==================== TOKENS D'UN LOT ====================
+
+class TokenBatch:
+    """Tokens d'un lot de CV, mots vides retirés, sous forme d'entiers"""
+
+    def __init__(self, documents, preprocess, tokenize, stop_words):
+        term_ids, occurrences, counts = {}, [], []
+        next_id = itertools.count()
+        for document in documents:
+            tokens = tokenize(preprocess(document))
+            counts.append(len(tokens))
+            occurrences.extend(map(term_ids.setdefault, tokens, next_id))
+
+        # Ids denses 0..n_tokens-1 (setdefault consomme un id à chaque appel)
+        sparse_ids = np.fromiter(term_ids.values(), dtype=np.int64, count=len(term_ids))
+        dense = np.zeros(len(occurrences) + 1, dtype=np.int64)
+        dense[sparse_ids] = np.arange(len(sparse_ids))
+        ids = dense[np.asarray(occurrences, dtype=np.int64)]
+        documents_of = np.repeat(np.arange(len(counts)), counts)
+
+        # Comme scikit-learn: les mots vides sont retirés avant les n-grammes
+        if stop_words:
+            stop = np.zeros(len(term_ids), dtype=bool)
+            stop_ids = np.fromiter((term_ids[word] for word in term_ids.keys() & stop_words), dtype=np.int64)
+            stop[dense[stop_ids]] = True
+            keep = ~stop[ids]
+            ids, documents_of = ids[keep], documents_of[keep]
+
+        self.tokens = list(term_ids)
+        self.ids = ids
+        self.documents = documents_of
+        self.n_documents = len(counts)
+
+    def ngrams(self, codes, n, base):
+        """
+        Clés des n-grammes de chaque CV (mots codés 1..base-1, 0 = ignoré)
+
+        Returns:
+            (clés, CV de chaque clé), seulement pour les n-grammes sans mot ignoré
+        """
+        values = codes[self.ids]
+        length = len(values) - n + 1
+        if length <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        keys = np.zeros(length, dtype=np.int64)
+        valid = self.documents[:length] == self.documents[n - 1:]
+        for offset in range(n):
+            window = values[offset:offset + length]
+            valid &= window > 0
+            keys = keys * base + window
+        return keys[valid], self.documents[:length][valid]
+
+def supports(params):
+    """Les tokens sont des mots (analyzer='word'): les n-grammes sont reproduits"""
+    return params.analyzer == 'word' and params.input == 'content'
+
+def _counts_to_tfidf(rows, columns, n_documents, n_features, params, idf):
+    """Comptages (doublons additionnés) puis les mêmes étapes que TfidfTransformer"""
+    import scipy.sparse as sp
+    from sklearn.preprocessing import normalize
+
+    X = sp.csr_matrix(
+        (np.ones(len(rows)), (rows, columns)), shape=(n_documents, n_features), dtype=np.float64
+    )
+    X.sum_duplicates()
+    if params.binary:
+        X.data.fill(1)
+    if getattr(params, 'sublinear_tf', False):
+        np.log(X.data, X.data)
+        X.data += 1.0
+    if idf is not None:
+        X.data *= idf[X.indices]
+    norm = getattr(params, 'norm', 'l2')
+    if norm is not None:
+        X = normalize(X, norm=norm, copy=False)
+    return X
+
+# ==================== VOCABULAIRE FIGÉ ====================
+
+class CompactTfidfVectorizer:
+    kind = 'compact'
+    # Arguments du constructeur enregistrés en tableaux (shared_model.py)
+    ARRAYS = ('words', 'keys', 'columns', 'idf')
+
+    def __init__(self, params, words, keys, columns, idf):
+        """
+        Args:
+            params: TfidfVectorizer non entraîné (mêmes paramètres)
+            words: mots du vocabulaire triés (dtype 'S', UTF-8)
+            keys: n-grammes du vocabulaire codés (triés), columns: leur colonne
+            idf: poids IDF par colonne
+        """
+        self.params = params
+        self.words = words
+        self.keys = keys
+        self.columns = columns
+        self.idf_ = idf
+        self.min_n, self.max_n = params.ngram_range
+        self._preprocess = params.build_preprocessor()
+        self._tokenize = params.build_tokenizer()
+        self._stop_words = params.get_stop_words()
+        self._feature_names = None
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer):
+        """Fige le vocabulaire d'un TfidfVectorizer entraîné"""
+        from sklearn.base import clone
+
+        if not supports(vectorizer):
+            raise ValueError(f"Cannot compact analyzer {vectorizer.analyzer!r}: expected 'word'")
+        terms = list(vectorizer.vocabulary_)
+        split = [term.split(' ') for term in terms]
+        words = np.array(sorted({word.encode('utf-8') for term_words in split for word in term_words}))
+        base = len(words) + 1
+        if base ** vectorizer.ngram_range[1] >= 2 ** 63:
+            raise ValueError(f"Vocabulary too large to encode {vectorizer.ngram_range[1]}-grams")
+        index = {word.decode('utf-8'): i + 1 for i, word in enumerate(words)}
+
+        keys = np.empty(len(terms), dtype=np.int64)
+        for i, term_words in enumerate(split):
+            key = 0
+            for word in term_words:
+                key = key * base + index[word]
+            keys[i] = key
+        order = np.argsort(keys)
+        columns = np.array([vectorizer.vocabulary_[term] for term in terms], dtype=np.int32)[order]
+        return cls(clone(vectorizer), words, keys[order], columns,
+                   np.asarray(vectorizer.idf_, dtype=np.float64))
+
+    def arrays(self):
+        return dict(zip(self.ARRAYS, (self.words, self.keys, self.columns, self.idf_)))
+
+    # Sérialisation: paramètres et tableaux seulement (pas les fonctions construites)
+    def __getstate__(self):
+        return {'params': self.params, **self.arrays()}
+
+    def __setstate__(self, state):
+        state = dict(state)
+        self.__init__(state.pop('params'), **state)
+
+    @property
+    def n_features(self):
+        return len(self.columns)
+
+    def build_preprocessor(self):
+        return self._preprocess
+
+    def build_tokenizer(self):
+        return self._tokenize
+
+    def get_feature_names_out(self):
+        if self._feature_names is None:
+            base = len(self.words) + 1
+            names = np.empty(self.n_features, dtype=object)
+            for key, column in zip(self.keys.tolist(), self.columns.tolist()):
+                parts = []
+                while key:
+                    key, code = divmod(key, base)
+                    parts.append(self.words[code - 1].decode('utf-8'))
+                names[column] = ' '.join(reversed(parts))
+            self._feature_names = names
+        return self._feature_names
+
+    def _word_codes(self, tokens):
+        """Numéro (1..len(words)) de chaque token du lot dans le vocabulaire, 0 sinon"""
+        encoded = [token.encode('utf-8') for token in tokens]
+        probe = np.array(encoded, dtype=self.words.dtype)
+        positions = np.minimum(np.searchsorted(self.words, probe), len(self.words) - 1)
+        # Un token plus long que le plus long mot serait tronqué par le dtype
+        fits = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)) <= self.words.dtype.itemsize
+        found = fits & (self.words[positions] == probe)
+        return np.where(found, positions + 1, 0)
+
+    def transform(self, raw_documents):
+        """Matrice TF-IDF (CSR float64), identique à TfidfVectorizer.transform"""
+        batch = TokenBatch(raw_documents, self._preprocess, self._tokenize, self._stop_words)
+        codes = self._word_codes(batch.tokens)
+        base = len(self.words) + 1
+
+        rows, columns = [], []
+        for n in range(self.min_n, self.max_n + 1):
+            keys, documents = batch.ngrams(codes, n, base)
+            positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+            found = self.keys[positions] == keys
+            rows.append(documents[found])
+            columns.append(self.columns[positions[found]])
+        return _counts_to_tfidf(np.concatenate(rows), np.concatenate(columns),
+                                batch.n_documents, self.n_features, self.params, self.idf_)
+
+# ==================== HASHING ====================
+
+class HashedTfidfVectorizer:
+    kind = 'hashing'
+    ARRAYS = ('idf',)
+
+    def __init__(self, params, idf=None):
+        """
+        Args:
+            params: HashingVectorizer non entraîné (n_features, ngram_range,
+                    stop_words...; alternate_sign et norm ne sont pas utilisés)
+            idf: poids IDF appris par fit (None avant l'entraînement)
+        """
+        self.params = params
+        self.idf_ = idf
+        self.min_n, self.max_n = params.ngram_range
+        self._preprocess = params.build_preprocessor()
+        self._tokenize = params.build_tokenizer()
+        self._stop_words = params.get_stop_words()
+
+    @classmethod
+    def create(cls, n_features=DEFAULT_HASH_FEATURES, ngram_range=(1, 2), stop_words='english'):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        params = HashingVectorizer(n_features=n_features, ngram_range=ngram_range,
+                                   stop_words=stop_words, alternate_sign=False, norm='l2')
+        return cls(params)
+
+    def arrays(self):
+        return {'idf': self.idf_}
+
+    @property
+    def n_features(self):
+        return self.params.n_features
+
+    def build_preprocessor(self):
+        return self._preprocess
+
+    def build_tokenizer(self):
+        return self._tokenize
+
+    def _counts(self, raw_documents):
+        batch = TokenBatch(raw_documents, self._preprocess, self._tokenize, self._stop_words)
+        # Un hash 32 bits par token distinct, combinés pour les n-grammes
+        hashes = np.fromiter((zlib.crc32(token.encode('utf-8')) for token in batch.tokens),
+                             dtype=np.uint64, count=len(batch.tokens))
+        values = hashes[batch.ids]
+        rows, columns = [], []
+        with np.errstate(over='ignore'):
+            for n in range(self.min_n, self.max_n + 1):
+                length = len(values) - n + 1
+                if length <= 0:
+                    continue
+                keys = np.full(length, n, dtype=np.uint64)
+                for offset in range(n):
+                    keys = keys * np.uint64(0x100000001B3) ^ values[offset:offset + length]
+                keys ^= keys >> np.uint64(29)
+                valid = batch.documents[:length] == batch.documents[n - 1:]
+                rows.append(batch.documents[:length][valid])
+                columns.append((keys[valid] % np.uint64(self.n_features)).astype(np.int64))
+        if not rows:
+            rows, columns = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        return np.concatenate(rows), np.concatenate(columns), batch.n_documents
+
+    def __getstate__(self):
+        return {'params': self.params, 'idf': self.idf_}
+
+    def __setstate__(self, state):
+        self.__init__(state['params'], state['idf'])
+
+    def fit_transform(self, raw_documents):
+        """Apprend l'IDF (lissé, comme TfidfTransformer) et vectorise le corpus"""
+        rows, columns, n_documents = self._counts(raw_documents)
+        pairs = np.unique(rows * self.n_features + columns)
+        df = np.bincount(pairs % self.n_features, minlength=self.n_features)
+        self.idf_ = np.log((1 + n_documents) / (1 + df)) + 1
+        return _counts_to_tfidf(rows, columns, n_documents, self.n_features, self.params, self.idf_)
+
+    def transform(self, raw_documents):
+        rows, columns, n_documents = self._counts(raw_documents)
+        return _counts_to_tfidf(rows, columns, n_documents, self.n_features, self.params, self.idf_)
+
+def compact_vectorizer(vectorizer):
+    """Version compacte d'un TfidfVectorizer entraîné (les autres sont gardés tels quels)"""
+    if isinstance(vectorizer, (CompactTfidfVectorizer, HashedTfidfVectorizer)):
+        return vectorizer
+    if hasattr(vectorizer, 'vocabulary_') and hasattr(vectorizer, 'idf_') and supports(vectorizer):
+        return CompactTfidfVectorizer.from_vectorizer(vectorizer)
+    return vectorizer
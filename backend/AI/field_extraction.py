@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+field_extraction.py - Extraction des champs d'un CV (email, téléphone,
+compétences, années d'expérience)
+Chaque champ a sa propre passe: un motif ne peut pas consommer le texte d'un
+autre (un numéro de téléphone suivi de "3 ans d'expérience" garde ses 3 ans).
+Le dictionnaire de compétences est compilé en arbre de préfixes (une
+alternance par préfixe commun, une seule passe pour toute la liste), avec
+des frontières de mot et des synonymes.
+"""
+
+import re
+
+# Mêmes motifs que extraire_email / extraire_telephone / extraire_experience
+# (frontend/src/pages/extraction text.py)
+EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+# extraire_telephone essaie aussi r'\d{2}[-.\s]?\d{3}[-.\s]?\d{3}' quand ce motif
+# ne trouve rien, mais tout texte qu'il reconnaît l'est déjà par celui-ci:
+# le second motif ne change jamais le résultat
+PHONE_PATTERN = r'\+?\d{1,3}[-.\s]?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}'
+EXPERIENCE_PATTERNS = [
+    r'\d+\s*ans?\s+d[\'e]\s*expérience',
+    r'\d+\s+années?\s+d[\'e]\s*expérience',
+    r'expérience[:\s]+\d+\s*ans?',
+    r'\d+\+?\s*years?\s+(?:of\s+)?experience',
+]
+
+# Variantes courantes -> nom canonique de la compétence. Pas de variante qui
+# est aussi un mot courant ou une abréviation ambiguë ('vue' dans "point de
+# vue", 'ml', 'js', 'ts', 'dl')
+DEFAULT_SYNONYMS = {
+    'Node.js': ['nodejs', 'node js'],
+    'JavaScript': ['ecmascript'],
+    'React': ['reactjs', 'react.js'],
+    'Angular': ['angularjs', 'angular.js'],
+    'Vue.js': ['vuejs'],
+    'PostgreSQL': ['postgres'],
+    'Kubernetes': ['k8s'],
+    'C#': ['csharp', 'c sharp'],
+    'C++': ['cpp'],
+}
+
+_EMAIL_RE = re.compile(EMAIL_PATTERN)
+_PHONE_RE = re.compile(PHONE_PATTERN)
+_EXPERIENCE_RES = [re.compile(f'({pattern})') for pattern in EXPERIENCE_PATTERNS]
+_DIGITS_RE = re.compile(r'\d+')
+
+def _trie_pattern(terms):
+    """Alternance factorisée par préfixes communs (recherche en O(longueur))"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        end = '' in node
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            # Le terme peut s'arrêter ici: la suite est optionnelle
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+def extract_email(text):
+    """Premier email du texte (comme extraire_email)"""
+    match = _EMAIL_RE.search(text)
+    return match.group() if match else None
+
+def extract_phone(text):
+    """
+    Premier numéro de téléphone du texte (comme extraire_telephone), hors
+    chiffres d'une adresse email
+    """
+    emails = [match.span() for match in _EMAIL_RE.finditer(text)]
+    for match in _PHONE_RE.finditer(text):
+        if not any(start <= match.start() < end for start, end in emails):
+            return match.group()
+    return None
+
+def extract_experience(text):
+    """Années d'expérience: le premier motif qui correspond l'emporte (0 sinon)"""
+    lowered = text.lower()
+    for pattern in _EXPERIENCE_RES:
+        match = pattern.search(lowered)
+        if match:
+            return int(_DIGITS_RE.search(match.group(1)).group())
+    return 0
+
+class FieldExtractor:
+    def __init__(self, skills, synonyms=None):
+        """
+        Args:
+            skills: liste des compétences recherchées (noms renvoyés)
+            synonyms: dict nom canonique -> variantes (défaut: DEFAULT_SYNONYMS)
+        """
+        if synonyms is None:
+            synonyms = DEFAULT_SYNONYMS
+
+        self.skills = list(skills)
+        # Variante en minuscules -> nom tel que fourni dans skills
+        self.aliases = {}
+        for skill in self.skills:
+            self.aliases[skill.lower()] = skill
+            for variant in synonyms.get(skill, []):
+                self.aliases.setdefault(variant.lower(), skill)
+
+        self.pattern = None
+        if self.aliases:
+            # Le terme le plus long l'emporte (le trie essaie la suite d'abord)
+            self.pattern = re.compile(
+                rf'(?<!\w)(?:{_trie_pattern(self.aliases)})(?!\w)', re.IGNORECASE
+            )
+
+    def extract_skills(self, text):
+        """Compétences trouvées (mots entiers ou synonymes), dans l'ordre de la liste"""
+        if self.pattern is None:
+            return []
+        found = {self.aliases[match.group().lower()] for match in self.pattern.finditer(text)}
+        return [skill for skill in self.skills if skill in found]
+
+    def extract(self, text):
+        """
+        Extrait tous les champs d'un texte
+
+        Returns:
+            dict avec email, telephone, competences (ordre de la liste
+            fournie) et experience_annees
+        """
+        return {
+            'email': extract_email(text),
+            'telephone': extract_phone(text),
+            'competences': self.extract_skills(text),
+            'experience_annees': extract_experience(text),
+        }
+
+    def extract_many(self, texts):
+        """Applique extract à une liste de textes"""
+        return [self.extract(text) for text in texts]
+
+def extract_fields_batch(texts, skills, synonyms=None):
+    """Extrait les champs de plusieurs CV avec un seul automate compilé"""
+    return FieldExtractor(skills, synonyms).extract_many(texts)
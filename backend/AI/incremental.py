@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+incremental.py - Entraînement incrémental du modèle de screening
+Le vectorizer par hachage n'a pas de vocabulaire à réapprendre et le
+classificateur SGD (régression logistique) accepte partial_fit: seules les
+lignes du dataset qui ne sont pas encore dans le modèle sont traitées.
+Chaque ligne est identifiée par le hash de (catégorie, texte). Environ 20%
+des lignes (choisies par leur hash, donc stables) forment le jeu de test.
+"""
+
+import sys
+import os
+import time
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+import joblib
+import sklearn
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.preprocessing import LabelEncoder
+
+from corpus import load_corpus
+from linear_scorer import LinearCategoryScorer
+from model_store import MODEL_DIR, dataset_fingerprint, save_bundle
+
+STATE_VERSION = 1
+DEFAULT_STATE_PATH = MODEL_DIR / 'incremental_state.joblib'
+DEFAULT_INCREMENTAL_BUNDLE_PATH = MODEL_DIR / 'cv_screener_incremental.joblib'
+
+INCREMENTAL_PARAMS = {
+    'kind': 'incremental',
+    'n_features': 2 ** 18,
+    'stop_words': 'english',
+    'ngram_range': (1, 2),
+    'loss': 'log_loss',
+    'alpha': 1e-5,
+    'random_state': 42,
+    'holdout_percent': 20,
+    'html': 'skip',
+}
+
+def row_hash(label, text):
+    """Identifiant stable d'une ligne du dataset"""
+    return hashlib.sha1(f"{label}\x1f{text}".encode('utf-8')).hexdigest()
+
+def is_holdout(digest):
+    """Affectation déterministe au jeu de test (ne change pas quand le dataset grandit)"""
+    return int(digest[:8], 16) % 100 < INCREMENTAL_PARAMS['holdout_percent']
+
+def make_vectorizer():
+    """Vectorizer sans état: même espace de features pour toutes les mises à jour"""
+    return HashingVectorizer(
+        n_features=INCREMENTAL_PARAMS['n_features'],
+        stop_words=INCREMENTAL_PARAMS['stop_words'],
+        ngram_range=INCREMENTAL_PARAMS['ngram_range'],
+        alternate_sign=False,
+        norm='l2'
+    )
+
+class IncrementalTrainer:
+    def __init__(self, state_path=None):
+        self.state_path = Path(state_path or DEFAULT_STATE_PATH)
+        self.vectorizer = make_vectorizer()
+        self.state = self._load_state()
+
+    def _load_state(self):
+        if not self.state_path.exists():
+            return None
+        state = joblib.load(self.state_path)
+        if (state.get('version') != STATE_VERSION
+                or state.get('sklearn_version') != sklearn.__version__
+                or state.get('params') != INCREMENTAL_PARAMS):
+            print("⚠️ Incremental state is outdated, starting from scratch", file=sys.stderr)
+            return None
+        return state
+
+    def _new_state(self, classes):
+        print(f"🆕 New incremental model with {len(classes)} categories", file=sys.stderr)
+        return {
+            'version': STATE_VERSION,
+            'sklearn_version': sklearn.__version__,
+            'params': INCREMENTAL_PARAMS,
+            'classes': list(classes),
+            'clf': SGDClassifier(
+                loss=INCREMENTAL_PARAMS['loss'],
+                alpha=INCREMENTAL_PARAMS['alpha'],
+                random_state=INCREMENTAL_PARAMS['random_state']
+            ),
+            'seen': set(),
+            'n_train': 0,
+            'X_holdout': sp.csr_matrix((0, INCREMENTAL_PARAMS['n_features'])),
+            'y_holdout': np.zeros(0, dtype=np.int32),
+        }
+
+    def update(self, dataset_path, batch_size=1000, reset=False):
+        """
+        Ajoute au modèle les lignes du dataset qu'il n'a pas encore vues
+
+        Returns:
+            dict de statistiques (lignes ajoutées, ignorées, précision...)
+        """
+        start = time.perf_counter()
+        corpus = load_corpus(dataset_path, html_mode=INCREMENTAL_PARAMS['html'])
+        labels = corpus.classes[corpus.labels]
+
+        if reset or self.state is None:
+            self.state = self._new_state(corpus.classes)
+        state = self.state
+        class_index = {name: i for i, name in enumerate(state['classes'])}
+
+        train_rows, holdout_rows, unknown = [], [], 0
+        for i, (label, text) in enumerate(zip(labels, corpus.texts)):
+            digest = row_hash(label, text)
+            if digest in state['seen']:
+                continue
+            if label not in class_index:
+                unknown += 1
+                continue
+            state['seen'].add(digest)
+            (holdout_rows if is_holdout(digest) else train_rows).append(i)
+
+        if unknown:
+            print(f"⚠️ {unknown} rows have categories unknown to the model, "
+                  f"run with --reset to retrain with the new categories", file=sys.stderr)
+
+        classes = np.arange(len(state['classes']))
+        # -1 pour une catégorie inconnue: ces lignes ne sont ni dans train_rows
+        # ni dans holdout_rows, elles ne sont jamais passées à partial_fit
+        targets = np.array([class_index.get(label, -1) for label in labels], dtype=np.int32)
+
+        # Ordre mélangé (déterministe) pour la descente de gradient
+        rng = np.random.default_rng(INCREMENTAL_PARAMS['random_state'] + state['n_train'])
+        train_rows = rng.permutation(np.array(train_rows, dtype=np.int64))
+        for begin in range(0, len(train_rows), batch_size):
+            rows = train_rows[begin:begin + batch_size]
+            X = self.vectorizer.transform(corpus.texts.take(rows))
+            state['clf'].partial_fit(X, targets[rows], classes=classes)
+        state['n_train'] += len(train_rows)
+
+        if holdout_rows:
+            X_new = self.vectorizer.transform(corpus.texts.take(holdout_rows))
+            state['X_holdout'] = sp.vstack([state['X_holdout'], X_new]).tocsr()
+            state['y_holdout'] = np.concatenate([state['y_holdout'], targets[holdout_rows]])
+
+        stats = {
+            'added_train': len(train_rows),
+            'added_holdout': len(holdout_rows),
+            'skipped_unknown_category': unknown,
+            'total_train': state['n_train'],
+            'total_holdout': len(state['y_holdout']),
+            'seconds': round(time.perf_counter() - start, 3),
+        }
+        if state['n_train'] and len(state['y_holdout']):
+            pred = state['clf'].predict(state['X_holdout'])
+            stats['accuracy'] = round(accuracy_score(state['y_holdout'], pred), 4)
+        return stats
+
+    def save(self, dataset_path, bundle_path=None):
+        """Sauvegarde l'état et un bundle utilisable par CVScreener (--model)"""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        joblib.dump(self.state, tmp_path)
+        os.replace(tmp_path, self.state_path)
+        print(f"💾 Incremental state saved to: {self.state_path}", file=sys.stderr)
+
+        # Le bundle ne garde que les poids (score de la catégorie visée par
+        # un seul produit creux), l'état garde le SGDClassifier pour partial_fit
+        le = LabelEncoder().fit(self.state['classes'])
+        save_bundle(
+            bundle_path or DEFAULT_INCREMENTAL_BUNDLE_PATH,
+            self.vectorizer, LinearCategoryScorer.from_estimator(self.state['clf']), le,
+            dataset_fingerprint(dataset_path), INCREMENTAL_PARAMS
+        )
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+instrumentation.py - Mesure du temps et de la mémoire par étape du screening
+Les étapes sont enregistrées dans les Metrics actives du contexte courant
+(une par job). Sans Metrics actives, stage() ne fait rien.
+"""
+
+import sys
+import time
+import resource
+import tracemalloc
+import contextvars
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar('screening_metrics', default=None)
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus (Mo)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sur macOS, en Ko ailleurs
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class Metrics:
+    def __init__(self):
+        self.stages = []
+        self.files = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def activate(self):
+        """Rend ces Metrics actives pour le code exécuté dans le bloc"""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def add_stage(self, name, wall, cpu, **extra):
+        record = {
+            'stage': name,
+            'wall_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+        record.update(extra)
+        self.stages.append(record)
+
+    def add_file(self, info):
+        """Détails d'extraction d'un fichier (pages, backend, cache...)"""
+        self.files.append(info)
+
+    def as_dict(self):
+        return {
+            'total_wall_s': round(time.perf_counter() - self._start, 6),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'stages': self.stages,
+            'files': self.files,
+        }
+
+def current():
+    """Metrics actives, ou None"""
+    return _current.get()
+
+@contextmanager
+def stage(name, **extra):
+    """
+    Mesure une étape: temps réel, temps CPU du thread, pic mémoire
+
+    Le pic mémoire Python (tracemalloc) n'est ajouté que si tracemalloc a été
+    démarré (option --metrics-memory), car il ralentit les allocations.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield extra
+        return
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield extra
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        if tracing:
+            extra['python_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        metrics.add_stage(name, wall, cpu, **extra)
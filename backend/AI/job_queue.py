@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+job_queue.py - File de jobs de screening asyncio (ai3.py --serve --queue)
+Même protocole que screening_worker.py (un JSON par ligne sur stdin ou sur un
+socket Unix), avec en plus:
+  - progression: les CV d'un job sont extraits et scorés par paquets de
+    taille croissante (16 fichiers, puis 32...). Avec "progress": true, un
+    événement est envoyé après chaque paquet avec le classement provisoire.
+  - annulation: {"cancel": "<id>"} arrête le job sans attendre la fin du lot.
+  - équité: au plus --tenant-workers jobs en cours par "tenant" et --workers
+    au total. Les paquets des différents jobs se partagent le pool
+    d'extraction: un gros lot ne bloque pas les autres.
+  - doublons ("dedup"): cherchés dans tout le job, pas seulement dans un
+    paquet; une copie d'un CV d'un paquet précédent est ajoutée à ses
+    'duplicates' s'il est dans le classement.
+
+Requête    : {"id": "...", "tenant": "...", "job": {...}, "resume_paths": [...], "progress": true}
+Événement  : {"id": "...", "event": "progress", "extracted": 48, "scored": 47, "total": 500,
+              "partial": [...]}
+Réponse    : {"id": "...", "results": [...]}  ou  {"id": "...", "error": "..."}
+             ({"id": "...", "error": "cancelled", "cancelled": true} après une annulation)
+"""
+
+import sys
+import os
+import json
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import Metrics
+
+FIRST_CHUNK = 16
+MAX_CHUNK = 256
+DEFAULT_TENANT = 'default'
+# Une requête peut contenir des milliers de chemins
+_LINE_LIMIT = 64 * 1024 * 1024
+
+def chunks(items, first=FIRST_CHUNK, largest=MAX_CHUNK):
+    """Paquets de taille croissante: premiers résultats rapides, peu de surcoût ensuite"""
+    size, begin = first, 0
+    while begin < len(items):
+        yield items[begin:begin + size]
+        begin += size
+        size = min(size * 2, largest)
+
+def merge_top_k(ranked, new, job_data):
+    """
+    Fusionne deux classements d'un même poste
+
+    Les scores d'un CV ne dépendent pas des autres CV du lot: le top-k des
+    top-k par paquet est celui du lot complet (même ordre que select_top_k,
+    à score égal par candidate_id).
+    """
+    merged = sorted(ranked + new, key=lambda result: (-result['final_score'], result['candidate_id']))
+    return merged[:job_data.get('nb_postes', 10)]
+
+# ==================== FILE DE JOBS ====================
+
+class ScreeningQueue:
+    def __init__(self, screen_chunk, run_job, workers=4, tenant_workers=2, metrics=False,
+                 dedup_index=None):
+        """
+        Args:
+            screen_chunk: fonction (jobs, chemins, dedup) -> (résultats par
+                          poste, chemins valides), voir ai3.screen_paths
+            dedup_index: fonction (dedup de la requête) -> DuplicateIndex
+                         (dedup.py), créé une fois par job et passé à
+                         screen_chunk pour chacun de ses paquets
+            run_job: fonction (message) -> résultats, pour les jobs sans
+                     resume_paths (search_pool)
+            workers: jobs en cours au total
+            tenant_workers: jobs en cours par tenant
+            metrics: ajoute les métriques par étape à chaque réponse
+        """
+        self.screen_chunk = screen_chunk
+        self.run_job = run_job
+        self.dedup_index = dedup_index
+        self.metrics = metrics
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._slots = asyncio.Semaphore(max(1, workers))
+        self.tenant_workers = max(1, tenant_workers)
+        # tenant -> [créneaux, jobs en attente ou en cours]; retiré quand le
+        # tenant n'a plus de job (le serveur vit longtemps, les tenants passent)
+        self._tenant_slots = {}
+        self._by_id = {}
+        self._running = set()
+
+    def submit(self, message, write):
+        """Lance un job; write(dict) reçoit les événements puis la réponse"""
+        job_id = message.get('id')
+        task = asyncio.create_task(self._run(message, write))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        if job_id is not None:
+            self._by_id[job_id] = task
+            task.add_done_callback(lambda done: self._forget(job_id, done))
+        return task
+
+    def _forget(self, job_id, task):
+        if self._by_id.get(job_id) is task:
+            del self._by_id[job_id]
+
+    def cancel(self, job_id):
+        """Annule un job en attente ou en cours (False s'il est inconnu ou terminé)"""
+        task = self._by_id.get(job_id)
+        if task is None:
+            print(f"⚠️ Cannot cancel job {job_id}: not running", file=sys.stderr)
+            return False
+        return task.cancel()
+
+    async def join(self):
+        """Attend la fin de tous les jobs soumis"""
+        while self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _in_thread(self, func, *args):
+        """Exécute func dans le pool de threads, avec les Metrics du job"""
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: context.run(func, *args))
+
+    async def _run(self, message, write):
+        job_id = message.get('id')
+        tenant = str(message.get('tenant') or DEFAULT_TENANT)
+        slot = self._tenant_slots.get(tenant)
+        if slot is None:
+            slot = self._tenant_slots[tenant] = [asyncio.Semaphore(self.tenant_workers), 0]
+        slot[1] += 1
+        try:
+            # Créneau du tenant d'abord: un job en attente ne bloque pas un créneau global
+            async with slot[0]:
+                async with self._slots:
+                    response = await self._screen(message, write)
+        except asyncio.CancelledError:
+            print(f"🛑 Job {job_id} cancelled", file=sys.stderr)
+            write({'id': job_id, 'error': 'cancelled', 'cancelled': True})
+            return
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}", file=sys.stderr)
+            write({'id': job_id, 'error': str(e)})
+            return
+        finally:
+            slot[1] -= 1
+            if not slot[1]:
+                del self._tenant_slots[tenant]
+        write({'id': job_id, **response})
+
+    async def _screen(self, message, write):
+        metrics = Metrics()
+        with metrics.activate():
+            results = await self._results(message, write)
+        if self.metrics:
+            return {'results': results, 'metrics': metrics.as_dict()}
+        return {'results': results}
+
+    async def _results(self, message, write):
+        """Screening paquet par paquet, classement fusionné au fur et à mesure"""
+        if 'resume_paths' not in message:
+            return await self._in_thread(self.run_job, message)
+
+        is_batch = 'jobs' in message
+        jobs = message['jobs'] if is_batch else [message['job']]
+        paths = message['resume_paths']
+        ranked = [[] for _ in jobs]
+        extracted = scored = 0
+        dedup = message.get('dedup')
+        if self.dedup_index is not None:
+            dedup = self.dedup_index(dedup)
+        for chunk in chunks(paths):
+            batch_results, valid_paths = await self._in_thread(
+                self.screen_chunk, jobs, chunk, dedup
+            )
+            for j, results in enumerate(batch_results):
+                # candidate_id: position parmi les CV valides de tout le lot
+                for result in results:
+                    result['candidate_id'] += scored
+                ranked[j] = merge_top_k(ranked[j], results, jobs[j])
+                _attach_earlier_duplicates(ranked[j], valid_paths, dedup)
+            extracted += len(chunk)
+            scored += len(valid_paths)
+            if message.get('progress') and extracted < len(paths):
+                write({
+                    'id': message.get('id'), 'event': 'progress',
+                    'extracted': extracted, 'scored': scored, 'total': len(paths),
+                    'partial': ranked if is_batch else ranked[0],
+                })
+        if not scored:
+            print("❌ No valid resumes found", file=sys.stderr)
+        return ranked if is_batch else ranked[0]
+
+def _attach_earlier_duplicates(ranked, valid_paths, index):
+    """Copies d'un paquet dont le CV gardé vient d'un paquet précédent"""
+    duplicate_of = getattr(index, 'duplicate_of', None)
+    if not duplicate_of:
+        return
+    by_path = {result['file_path']: result for result in ranked}
+    in_chunk = set(valid_paths)
+    for path in valid_paths:
+        original, reason = duplicate_of.get(path, (None, None))
+        if original in by_path and original not in in_chunk:
+            by_path[original].setdefault('duplicates', []).append(
+                {'file_path': path, 'file_name': os.path.basename(path), 'reason': reason}
+            )
+
+# ==================== SERVEUR ====================
+
+def _dispatch(queue, line, write):
+    """Décode une ligne: nouveau job (retourne sa tâche) ou annulation"""
+    try:
+        message = json.loads(line)
+    except ValueError as e:
+        print(f"❌ Invalid request: {e}", file=sys.stderr)
+        write({'id': None, 'error': f"invalid JSON: {e}"})
+        return None
+    if not isinstance(message, dict):
+        error = "expected a JSON object"
+    elif not isinstance(message.get('id'), (str, int, type(None))):
+        error = "'id' must be a string or a number"
+    elif 'cancel' in message and not isinstance(message['cancel'], (str, int)):
+        error = "'cancel' must be a job id"
+    else:
+        error = None
+    if error is not None:
+        print(f"❌ Invalid request: {error}", file=sys.stderr)
+        write({'id': None, 'error': f"invalid request: {error}"})
+        return None
+    # Une requête mal formée ne doit pas arrêter le serveur ni les autres jobs
+    try:
+        if 'cancel' in message:
+            queue.cancel(message['cancel'])
+            return None
+        return queue.submit(message, write)
+    except Exception as e:
+        print(f"❌ Invalid request: {e}", file=sys.stderr)
+        write({'id': message.get('id'), 'error': str(e)})
+        return None
+
+async def _serve_stdio(queue):
+    """Lit les jobs sur stdin et écrit événements et réponses sur stdout"""
+    loop = asyncio.get_running_loop()
+
+    def write(response):
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+    # stdin peut être un fichier: lecture bloquante dans un thread dédié
+    reader = ThreadPoolExecutor(max_workers=1)
+    try:
+        while True:
+            line = await loop.run_in_executor(reader, sys.stdin.readline)
+            if not line:
+                break
+            if line.strip():
+                _dispatch(queue, line, write)
+    finally:
+        reader.shutdown(wait=False)
+    await queue.join()
+
+async def _serve_socket(queue, socket_path):
+    """Écoute sur un socket Unix, une connexion peut envoyer plusieurs jobs"""
+
+    async def handle_client(reader, writer):
+        def write(response):
+            if not writer.is_closing():
+                writer.write((json.dumps(response) + "\n").encode('utf-8'))
+
+        pending = []
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = _dispatch(queue, line.decode('utf-8'), write)
+                    if task is not None:
+                        pending.append(task)
+            # Les jobs de cette connexion seulement
+            await asyncio.gather(*pending, return_exceptions=True)
+            await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            print(f"⚠️ Client connection closed: {e}", file=sys.stderr)
+        finally:
+            writer.close()
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = await asyncio.start_unix_server(handle_client, socket_path, limit=_LINE_LIMIT)
+    print(f"🔌 Listening on {socket_path}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        os.unlink(socket_path)
+
+async def _main(screen_chunk, run_job, socket_path, workers, tenant_workers, metrics, dedup_index):
+    queue = ScreeningQueue(screen_chunk, run_job, workers=workers,
+                           tenant_workers=tenant_workers, metrics=metrics, dedup_index=dedup_index)
+    try:
+        if socket_path:
+            await _serve_socket(queue, socket_path)
+        else:
+            await _serve_stdio(queue)
+    finally:
+        queue.close()
+
+def serve_queue(screen_chunk, run_job, socket_path=None, workers=4, tenant_workers=2, metrics=False,
+                dedup_index=None):
+    """
+    Démarre la file de jobs (voir ScreeningQueue pour les arguments)
+
+    Args:
+        socket_path: chemin du socket Unix, ou None pour stdin/stdout
+    """
+    print(f"🚀 Screening queue ready ({workers} workers, {tenant_workers} per tenant)",
+          file=sys.stderr)
+    try:
+        asyncio.run(_main(screen_chunk, run_job, socket_path, workers, tenant_workers, metrics,
+                          dedup_index))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+linear_scorer.py - Score de catégorie linéaire (un-contre-tous)
+Remplace la forêt aléatoire pour le score de catégorie: une régression
+logistique par catégorie, stockée comme une seule matrice de poids dense
+(features x catégories, float32). Le score de la catégorie visée par le
+poste ne demande qu'un produit matrice creuse x vecteur.
+"""
+
+import numpy as np
+
+def _sigmoid(z):
+    # exp(-|z|) évite les débordements pour les grandes valeurs
+    e = np.exp(-np.abs(z))
+    return np.where(z >= 0, 1.0 / (1.0 + e), e / (1.0 + e))
+
+class LinearCategoryScorer:
+    """Poids + biais d'un modèle linéaire un-contre-tous"""
+
+    def __init__(self, coef, intercept):
+        # (n_features, n_classes): une colonne contiguë par catégorie
+        self.weights = np.asfortranarray(np.asarray(coef, dtype=np.float32).T)
+        self.intercept = np.asarray(intercept, dtype=np.float32).ravel()
+
+    @classmethod
+    def fit(cls, X, y, C=1.0, max_iter=300):
+        """Entraîne une régression logistique par catégorie"""
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.multiclass import OneVsRestClassifier
+
+        ovr = OneVsRestClassifier(LogisticRegression(C=C, max_iter=max_iter))
+        ovr.fit(X, y)
+        return cls.from_estimator(ovr)
+
+    @classmethod
+    def from_estimator(cls, estimator):
+        """
+        Extrait les poids d'un modèle un-contre-tous déjà entraîné
+        (OneVsRestClassifier de modèles linéaires, ou SGDClassifier)
+        """
+        if hasattr(estimator, 'estimators_'):
+            coef = np.vstack([e.coef_ for e in estimator.estimators_])
+            intercept = np.concatenate([e.intercept_ for e in estimator.estimators_])
+        else:
+            coef, intercept = estimator.coef_, estimator.intercept_
+        if len(coef) == 1:
+            # Deux catégories: un seul modèle, la première est son complément
+            coef = np.vstack([-coef[0], coef[0]])
+            intercept = np.array([-intercept[0], intercept[0]])
+        return cls(coef, intercept)
+
+    @property
+    def n_classes(self):
+        return len(self.intercept)
+
+    @property
+    def nbytes(self):
+        return self.weights.nbytes + self.intercept.nbytes
+
+    def decision_function(self, X, columns=None):
+        """Scores linéaires (avant sigmoïde), pour toutes les catégories ou certaines"""
+        if columns is None:
+            return np.asarray(X @ self.weights) + self.intercept
+        columns = np.asarray(columns)
+        return np.asarray(X @ self.weights[:, columns]) + self.intercept[columns]
+
+    def class_scores(self, X):
+        """
+        Score un-contre-tous de chaque catégorie (même échelle que
+        target_scores): c'est le score de catégorie utilisé par le screening
+        """
+        return _sigmoid(self.decision_function(X))
+
+    def target_scores(self, X, columns):
+        """
+        Probabilité un-contre-tous des catégories demandées seulement
+
+        Args:
+            X: matrice creuse des CV
+            columns: index des catégories (une colonne de sortie par index)
+
+        Returns:
+            array (n_cv, len(columns)) dans [0, 1]
+        """
+        return _sigmoid(self.decision_function(X, columns))
+
+    def predict_proba(self, X):
+        """Probabilités normalisées sur toutes les catégories (comme OneVsRestClassifier)"""
+        scores = _sigmoid(self.decision_function(X))
+        totals = scores.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1
+        return scores / totals
+
+    def predict(self, X):
+        return np.argmax(self.decision_function(X), axis=1)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+model_store.py - Sauvegarde et chargement du modèle de screening entraîné
+Le bundle contient le vectorizer, le classificateur, le LabelEncoder et
+l'empreinte du dataset utilisé pour l'entraînement.
+"""
+
+import sys
+import os
+import json
+import hashlib
+from pathlib import Path
+
+# Incrémenter à chaque changement du contenu ou du format du bundle
+BUNDLE_VERSION = 1
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+MODEL_DIR = SCRIPT_DIR / 'models'
+DEFAULT_BUNDLE_PATH = MODEL_DIR / 'cv_screener.joblib'
+LINEAR_BUNDLE_PATH = MODEL_DIR / 'cv_screener_linear.joblib'
+
+# ==================== EMPREINTE DU DATASET ====================
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Calcule le SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def dataset_fingerprint(dataset_path):
+    """Retourne l'empreinte (taille, mtime, sha256) du dataset"""
+    stat = os.stat(dataset_path)
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_sha256(dataset_path),
+    }
+
+def fingerprint_matches(saved, dataset_path):
+    """Vérifie que le dataset n'a pas changé depuis l'entraînement"""
+    try:
+        stat = os.stat(dataset_path)
+    except OSError:
+        # Pas de dataset à côté du bundle (déploiement du seul artefact)
+        print(f"⚠️ Dataset not found at {dataset_path}, trusting saved model", file=sys.stderr)
+        return True
+
+    if stat.st_size != saved.get('size'):
+        return False
+    # Raccourci: même taille et même mtime => pas besoin de re-hacher
+    if stat.st_mtime_ns == saved.get('mtime_ns'):
+        return True
+    return file_sha256(dataset_path) == saved.get('sha256')
+
+# ==================== SAUVEGARDE / CHARGEMENT ====================
+
+def model_version(fingerprint, params):
+    """
+    Identifiant du modèle: dataset + paramètres + versions du bundle et de
+    scikit-learn (l'entraînement est déterministe, random_state fixé)
+    """
+    import sklearn
+
+    payload = json.dumps(
+        {'dataset': fingerprint.get('sha256'), 'params': params,
+         'bundle': BUNDLE_VERSION, 'sklearn': sklearn.__version__},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def save_bundle(path, vectorizer, clf, le, fingerprint, params):
+    """Écrit le bundle du modèle de façon atomique"""
+    import joblib
+    import sklearn
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    bundle = {
+        'bundle_version': BUNDLE_VERSION,
+        'sklearn_version': sklearn.__version__,
+        'params': params,
+        'dataset': fingerprint,
+        'vectorizer': vectorizer,
+        'clf': clf,
+        'le': le,
+    }
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, path)
+    print(f"💾 Model bundle saved to: {path}", file=sys.stderr)
+    return bundle
+
+def load_bundle(path, dataset_path=None, params=None):
+    """
+    Charge le bundle s'il est encore valide
+
+    Returns:
+        dict du bundle, ou None s'il est absent, obsolète ou illisible
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    # Imports différés: le CLI ne les paie que s'il charge un modèle
+    import joblib
+    import sklearn
+
+    try:
+        bundle = joblib.load(path)
+    except Exception as e:
+        print(f"⚠️ Could not read model bundle {path}: {e}", file=sys.stderr)
+        return None
+
+    if bundle.get('bundle_version') != BUNDLE_VERSION:
+        print("⚠️ Model bundle version mismatch, retraining", file=sys.stderr)
+        return None
+    if bundle.get('sklearn_version') != sklearn.__version__:
+        print("⚠️ Model bundle built with another scikit-learn, retraining", file=sys.stderr)
+        return None
+    if params is not None and bundle.get('params') != params:
+        print("⚠️ Model parameters changed, retraining", file=sys.stderr)
+        return None
+    if dataset_path is not None and not fingerprint_matches(bundle.get('dataset', {}), dataset_path):
+        print("⚠️ Dataset changed since last training, retraining", file=sys.stderr)
+        return None
+
+    return bundle
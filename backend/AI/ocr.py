@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+ocr.py - OCR des pages scannées des CV PDF
+N'intervient que pour les pages où pdfplumber et PyPDF2 ne trouvent presque
+pas de texte (voir extraction.py). Chaque page est rastérisée (pdf2image /
+pdftoppm) puis lue par tesseract (pytesseract). Ces deux outils sont des
+processus externes: les pages d'un document sont traitées en parallèle par
+un pool de threads, y compris depuis un processus du pool d'extraction.
+Le nombre de pages et le temps par document sont bornés.
+
+Dépendances optionnelles: pdf2image + poppler, pytesseract + tesseract.
+Sans elles, l'OCR est désactivé et les CV scannés restent ignorés.
+
+Configuration (variables d'environnement):
+    CV_OCR=0              désactive l'OCR
+    CV_OCR_DPI            résolution de rastérisation (défaut: 200)
+    CV_OCR_LANG           langues tesseract (défaut: eng+fra)
+    CV_OCR_MAX_PAGES      pages OCR maximum par document (défaut: 5)
+    CV_OCR_TIMEOUT        budget de temps par document en secondes (défaut: 45)
+    CV_OCR_WORKERS        pages traitées en parallèle (défaut: nombre de coeurs)
+    CV_OCR_MIN_CHARS      en dessous, une page est considérée sans texte (défaut: 50)
+
+La disponibilité de l'OCR, la langue, la résolution, CV_OCR_MAX_PAGES et
+CV_OCR_MIN_CHARS font partie de la clé du cache de texte (voir ocr_settings).
+"""
+
+import sys
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+
+OCR_ENABLED = os.environ.get('CV_OCR', '1') != '0'
+OCR_DPI = int(os.environ.get('CV_OCR_DPI', 200))
+OCR_LANG = os.environ.get('CV_OCR_LANG', 'eng+fra')
+OCR_MAX_PAGES = int(os.environ.get('CV_OCR_MAX_PAGES', 5))
+OCR_TIMEOUT = float(os.environ.get('CV_OCR_TIMEOUT', 45))
+OCR_WORKERS = int(os.environ.get('CV_OCR_WORKERS', os.cpu_count() or 1))
+OCR_MIN_CHARS = int(os.environ.get('CV_OCR_MIN_CHARS', 50))
+
+_available = None
+_available_lock = threading.Lock()
+
+def ocr_available():
+    """Vérifie une fois par processus que l'OCR est activé et installé"""
+    global _available
+    with _available_lock:
+        if _available is None:
+            _available = False
+            if OCR_ENABLED:
+                try:
+                    import pdf2image  # noqa: F401
+                    import pytesseract
+                    pytesseract.get_tesseract_version()
+                    _available = True
+                except Exception as e:
+                    print(f"ℹ️ OCR unavailable, scanned PDFs will be skipped ({e})", file=sys.stderr)
+        return _available
+
+def ocr_settings():
+    """
+    Réglages qui changent le texte obtenu (pour la clé du cache de texte):
+    un PDF extrait sans OCR est relu quand l'OCR devient disponible
+    """
+    return {
+        'available': ocr_available(),
+        'lang': OCR_LANG,
+        'dpi': OCR_DPI,
+        'max_pages': OCR_MAX_PAGES,
+        'min_chars': OCR_MIN_CHARS,
+    }
+
+def needs_ocr(page_text, has_images=True):
+    """Page (presque) sans texte qui contient une image: probablement scannée"""
+    return has_images and len(page_text.strip()) < OCR_MIN_CHARS
+
+def _ocr_page(pdf_path, page_number, timeout):
+    """Rastérise une page (numérotée à partir de 1) et la lit avec tesseract"""
+    from pdf2image import convert_from_path
+    import pytesseract
+
+    images = convert_from_path(
+        str(pdf_path), dpi=OCR_DPI, first_page=page_number, last_page=page_number,
+        grayscale=True, timeout=timeout
+    )
+    if not images:
+        return ""
+    return pytesseract.image_to_string(images[0], lang=OCR_LANG, timeout=timeout).strip()
+
+def ocr_pages(pdf_path, pages, info=None):
+    """
+    OCR de pages d'un PDF, en parallèle et dans le budget du document
+
+    Args:
+        pdf_path: chemin du PDF
+        pages: index des pages à lire (à partir de 0)
+        info: dict optionnel qui reçoit ocr_pages, ocr_s et, si le budget est
+              dépassé, ocr_timeout / ocr_skipped_pages
+
+    Returns:
+        dict index de page -> texte lu (pages réussies seulement)
+    """
+    if info is None:
+        info = {}
+    if not pages or not ocr_available():
+        return {}
+
+    selected = list(pages)[:OCR_MAX_PAGES]
+    if len(pages) > len(selected):
+        info['ocr_skipped_pages'] = len(pages) - len(selected)
+
+    start = time.monotonic()
+    results = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, min(OCR_WORKERS, len(selected))))
+    futures = {
+        pool.submit(_ocr_page, pdf_path, page + 1, OCR_TIMEOUT): page for page in selected
+    }
+    try:
+        # Le délai de as_completed porte sur l'ensemble du document
+        for future in as_completed(futures, timeout=OCR_TIMEOUT):
+            page = futures[future]
+            try:
+                results[page] = future.result()
+            except Exception as e:
+                print(f"⚠️ OCR failed on page {page + 1} of {pdf_path}: {e}", file=sys.stderr)
+    except FutureTimeout:
+        info['ocr_timeout'] = True
+        print(f"⚠️ OCR budget of {OCR_TIMEOUT}s exceeded: {pdf_path} "
+              f"({len(results)}/{len(selected)} pages read)", file=sys.stderr)
+    finally:
+        # Les pages en cours s'arrêtent d'elles-mêmes (timeout de tesseract)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    info['ocr_pages'] = len(results)
+    info['ocr_s'] = round(time.monotonic() - start, 3)
+    return results
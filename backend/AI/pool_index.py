@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+pool_index.py - Index de recherche approchée du stock de vecteurs (ann_index.py)
+Usage: python pool_index.py build [--components 128] [--lists <n>] [--model <bundle>] [--classifier forest|linear]
+           [--featurizer tfidf|compact|hashing]
+       python pool_index.py evaluate [--queries 50] [--top 10] [--nprobe 32] [--rerank 100] [--output <json>]
+       (evaluate compare search_pool au classement exact de tout le stock:
+        rappel des top-N et latence par requête)
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+
+from ai3 import CVScreener, CLASSIFIERS, open_vector_store, search_pool
+from featurizer import FEATURIZERS
+from ann_index import (
+    DEFAULT_COMPONENTS, DEFAULT_NPROBE, DEFAULT_RERANK, build_pool_index, load_pool_index
+)
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)), 2) if values else None
+
+def evaluate_index(screener, store, n_queries=50, top=10, nprobe=DEFAULT_NPROBE, rerank=DEFAULT_RERANK, seed=0):
+    """
+    Rappel et latence de search_pool par rapport au classement exact
+
+    Les requêtes sont des CV du stock (début du texte), avec pour catégorie
+    la plus probable de ce CV.
+
+    Returns:
+        dict de mesures (recall moyen et minimum, latences en ms)
+    """
+    index = load_pool_index(store)
+    if index is None:
+        raise ValueError("No ANN index for this vector store, run: python pool_index.py build")
+    hashes = store.hashes()
+    matrix, probas, previews = store.get(hashes)
+    classes = screener.le.classes_
+
+    rng = np.random.default_rng(seed)
+    recalls, ann_ms, exact_ms = [], [], []
+    for row in rng.choice(len(hashes), min(n_queries, len(hashes)), replace=False):
+        job = {
+            'description': previews[row],
+            'category': str(classes[int(np.argmax(probas[row]))]),
+            'nb_postes': top,
+            'min_score': 0.0,
+        }
+        start = time.perf_counter()
+        exact = screener.screen_vectors([job], matrix, previews, probas)[0]
+        exact_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        found = search_pool(screener, store, [job], nprobe=nprobe, rerank=rerank)[0]
+        ann_ms.append((time.perf_counter() - start) * 1000)
+
+        expected = {hashes[result['candidate_id'] - 1] for result in exact}
+        retrieved = {result['content_hash'] for result in found}
+        recalls.append(len(expected & retrieved) / max(1, len(expected)))
+
+    return {
+        'rows': len(hashes),
+        'index': index.meta,
+        'queries': len(recalls),
+        'top': top,
+        'nprobe': nprobe,
+        'rerank': rerank,
+        'recall_mean': round(float(np.mean(recalls)), 4),
+        'recall_min': round(float(np.min(recalls)), 4),
+        'ann_ms_p50': _percentile(ann_ms, 50),
+        'ann_ms_p95': _percentile(ann_ms, 95),
+        'exact_ms_p50': _percentile(exact_ms, 50),
+        'exact_ms_p95': _percentile(exact_ms, 95),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or evaluate the ANN index of the vector store")
+    parser.add_argument('command', choices=['build', 'evaluate'])
+    parser.add_argument('--model', help="model bundle path (trusted, like ai3.py --model)")
+    parser.add_argument('--classifier', choices=sorted(CLASSIFIERS), default='forest',
+                        help="category scorer whose vector store is indexed (default: forest)")
+    parser.add_argument('--featurizer', choices=FEATURIZERS,
+                        default=os.environ.get('CV_SCREENING_FEATURIZER', 'tfidf'),
+                        help="resume vectorization whose vector store is indexed, as in ai3.py "
+                             "(default: $CV_SCREENING_FEATURIZER or tfidf)")
+    parser.add_argument('--components', type=int, default=DEFAULT_COMPONENTS,
+                        help="build: SVD dimensions (default: 128)")
+    parser.add_argument('--lists', type=int,
+                        help="build: number of IVF lists (default: 4 * sqrt(pool size))")
+    parser.add_argument('--queries', type=int, default=50, help="evaluate: number of queries")
+    parser.add_argument('--top', type=int, default=10, help="evaluate: candidates per query")
+    parser.add_argument('--nprobe', type=int, default=DEFAULT_NPROBE,
+                        help="evaluate: IVF lists scanned per query")
+    parser.add_argument('--rerank', type=int, default=DEFAULT_RERANK,
+                        help="evaluate: candidates re-ranked exactly, as a multiple of --top")
+    parser.add_argument('--output', help="evaluate: also write the report to this JSON file")
+    args = parser.parse_args()
+
+    screener = CVScreener(model_path=args.model, trust_model=args.model is not None,
+                          classifier=args.classifier, featurizer=args.featurizer, verbose=False)
+    store = open_vector_store(screener)
+
+    try:
+        if args.command == 'build':
+            index = build_pool_index(store, n_components=args.components, n_lists=args.lists)
+            print(json.dumps(index.meta))
+            return
+        report = evaluate_index(screener, store, n_queries=args.queries, top=args.top,
+                                nprobe=args.nprobe, rerank=args.rerank)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"🎯 Recall@{args.top}: {report['recall_mean']} "
+          f"(ANN {report['ann_ms_p50']} ms, exact {report['exact_ms_p50']} ms)", file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+prefilter.py - Pré-filtre des CV avant le scoring complet
+Deux modes, configurables par poste ('prefilter' dans le job) ou par défaut
+(option --prefilter de ai3.py):
+  - 'bound': conservateur. Le score final vaut 0.4 * catégorie + 0.6 *
+    similarité, avec catégorie <= 1. Le vecteur TF-IDF du CV étant de norme 1,
+    la similarité cosinus est bornée par la norme de la partie du vecteur du
+    poste dont les termes apparaissent dans le CV (Cauchy-Schwarz). Un CV
+    dont la borne reste sous min_score ne peut pas l'atteindre: il est écarté.
+    La borne ne peut écarter personne si min_score <= 0.4 (le score de
+    catégorie seul peut suffire; défaut du backend Node: 0.3) ni avec le
+    featurizer 'hashing' (pas de vocabulaire): elle n'est alors pas calculée.
+  - 'heuristic': 'bound' + couverture des compétences demandées et années
+    d'expérience (voir field_extraction.py). Plus agressif, non garanti.
+"""
+
+import numpy as np
+
+from field_extraction import FieldExtractor, extract_experience
+
+PREFILTER_MODES = ('off', 'bound', 'heuristic')
+
+# Poids du score final (voir CVScreener._rank_candidates)
+CATEGORY_WEIGHT = 0.4
+SIMILARITY_WEIGHT = 0.6
+# Marge pour les arrondis flottants de la borne
+BOUND_EPSILON = 1e-9
+
+DEFAULT_MIN_SKILL_COVERAGE = 0.5
+
+def prefilter_config(job_data, default_mode='off'):
+    """
+    Lit la configuration du pré-filtre d'un poste
+
+    'prefilter' peut être un mode ('bound', ...) ou un dict avec 'mode' et
+    'min_skill_coverage'.
+
+    Returns:
+        (mode, min_skill_coverage)
+    """
+    config = job_data.get('prefilter', default_mode)
+    if config is None:
+        config = default_mode
+    if isinstance(config, str):
+        config = {'mode': config}
+    mode = config.get('mode', default_mode)
+    if mode not in PREFILTER_MODES:
+        raise ValueError(f"prefilter mode must be one of {PREFILTER_MODES}, got {mode!r}")
+    return mode, float(config.get('min_skill_coverage', DEFAULT_MIN_SKILL_COVERAGE))
+
+def similarity_bounds(vectorizer, job_vector, texts):
+    """
+    Borne supérieure de la similarité cosinus de chaque CV avec le poste
+
+    Un terme du poste (unigramme ou bigramme) ne peut avoir de poids dans le
+    CV que si tous ses mots sont des tokens du CV: la borne utilise les
+    tokens produits par le préprocesseur et le tokenizer du vectorizer, sans
+    calculer le vecteur TF-IDF du CV.
+
+    Returns:
+        array (n_cv,), ou None si le vectorizer n'a pas de vocabulaire
+        (HashingVectorizer: les termes ne sont pas connus)
+    """
+    if not hasattr(vectorizer, 'get_feature_names_out'):
+        return None
+    try:
+        feature_names = vectorizer.get_feature_names_out()
+    except (AttributeError, ValueError):
+        return None
+
+    job_vector = job_vector.tocsr()
+    terms = [feature_names[i].split() for i in job_vector.indices]
+    weights = np.square(job_vector.data)
+    if not terms:
+        return np.zeros(len(texts))
+
+    preprocess = vectorizer.build_preprocessor()
+    tokenize = vectorizer.build_tokenizer()
+    job_words = {word for words in terms for word in words}
+
+    bounds = np.empty(len(texts))
+    for i, text in enumerate(texts):
+        words = job_words.intersection(tokenize(preprocess(text)))
+        present = [all(word in words for word in term) for term in terms]
+        bounds[i] = np.sqrt(weights[present].sum())
+    return bounds
+
+def bound_mask(vectorizer, job_vector, texts, min_score):
+    """
+    CV qui peuvent encore atteindre min_score (True = garder)
+
+    Returns:
+        masque booléen, ou None si la borne ne peut écarter aucun CV
+    """
+    # Le score de catégorie seul suffit: personne ne peut être écarté
+    if CATEGORY_WEIGHT >= min_score:
+        return None
+    bounds = similarity_bounds(vectorizer, job_vector, texts)
+    if bounds is None:
+        return None
+    return CATEGORY_WEIGHT + SIMILARITY_WEIGHT * bounds >= min_score - BOUND_EPSILON
+
+def heuristic_mask(job_data, texts, min_skill_coverage):
+    """
+    Compétences demandées et expérience minimale (True = garder)
+
+    Un CV dont l'expérience n'est pas trouvée n'est pas écarté sur ce critère.
+    """
+    keep = np.ones(len(texts), dtype=bool)
+    skills = job_data.get('skills') or []
+    try:
+        min_years = float(job_data.get('experience') or 0)
+    except (TypeError, ValueError):
+        min_years = 0
+    if not skills and min_years <= 0:
+        return keep
+
+    extractor = FieldExtractor(skills)
+    for i, text in enumerate(texts):
+        if skills and len(extractor.extract_skills(text)) < min_skill_coverage * len(skills):
+            keep[i] = False
+        elif min_years > 0 and 0 < extract_experience(text) < min_years:
+            keep[i] = False
+    return keep
+
+def prefilter_mask(vectorizer, job_data, job_vector, texts, default_mode='off'):
+    """
+    Applique le pré-filtre configuré pour un poste
+
+    Returns:
+        (mode, masque booléen des CV gardés ou None si le pré-filtre est
+        désactivé ou ne peut écarter aucun CV)
+    """
+    mode, min_skill_coverage = prefilter_config(job_data, default_mode)
+    if mode == 'off':
+        return mode, None
+    keep = bound_mask(vectorizer, job_vector, texts, job_data.get('min_score', 0.0))
+    if mode == 'heuristic':
+        heuristic = heuristic_mask(job_data, texts, min_skill_coverage)
+        keep = heuristic if keep is None else keep & heuristic
+    return mode, keep
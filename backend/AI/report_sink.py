@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+report_sink.py - Rapport de lot écrit au fil de l'eau
+Chaque enregistrement est écrit (et vidé sur disque) dès qu'il est produit:
+la mémoire ne dépend pas de la taille du lot et un arrêt brutal ne perd que
+le dernier paquet. Un enregistrement de synthèse ({"type": "summary", ...})
+termine le rapport. Avec resume=True, un rapport interrompu est complété:
+les clés déjà présentes (ex: chemin du CV) sont connues via done_keys(), et
+la synthèse d'une exécution précédente est retirée (une seule à la fin).
+
+Formats:
+    ndjson   un objet JSON par ligne, en ajout (une ligne tronquée par un
+             arrêt brutal est ignorée puis écrasée à la reprise)
+    parquet  dossier de fichiers part-NNNNN.parquet (un par paquet vidé,
+             chacun complet à sa fermeture) et _summary.json; se lit avec
+             pyarrow.parquet.read_table(dossier). Dépendance optionnelle: pyarrow.
+"""
+
+import sys
+import os
+import json
+import time
+from pathlib import Path
+
+REPORT_FORMATS = ('ndjson', 'parquet')
+# Enregistrements gardés en mémoire avant un fichier Parquet
+PARQUET_ROWS_PER_PART = 5000
+SUMMARY_TYPE = 'summary'
+
+def resolve_format(path, report_format=None):
+    """Format demandé, sinon déduit de l'extension (.parquet), sinon ndjson"""
+    if report_format is None:
+        report_format = 'parquet' if str(path).endswith('.parquet') else 'ndjson'
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"report format must be one of {REPORT_FORMATS}, got {report_format!r}")
+    return report_format
+
+class ReportSink:
+    def __init__(self, path, report_format=None, key='file_path', resume=False, schema=None):
+        """
+        Args:
+            path: fichier NDJSON ou dossier Parquet
+            report_format: 'ndjson' ou 'parquet' (défaut: selon l'extension)
+            key: champ qui identifie un élément du lot (pour la reprise)
+            resume: complète un rapport existant au lieu de le remplacer
+            schema: schéma pyarrow (parquet; défaut: déduit du premier paquet)
+        """
+        self.path = Path(path)
+        self.format = resolve_format(path, report_format)
+        self.key = key
+        self.schema = schema
+        # Enregistrements écrits par cette exécution / lus à la reprise
+        self.records = 0
+        self.resumed_records = 0
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self._done = {}
+        self._buffer = []
+        self._file = None
+        self._parts = 0
+
+        if self.format == 'parquet':
+            import pyarrow  # noqa: F401  (erreur explicite avant le traitement)
+            self._open_parquet(resume)
+        else:
+            self._open_ndjson(resume)
+        if self._done:
+            print(f"⏩ Resuming report {self.path}: {len(self._done)} items already done",
+                  file=sys.stderr)
+
+    # ==================== NDJSON ====================
+
+    def _open_ndjson(self, resume):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not resume or not self.path.exists():
+            self._file = open(self.path, 'w', encoding='utf-8')
+            return
+
+        valid_lines = 0
+        valid_bytes = 0
+        summaries = set()
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    break
+                if record.get('type') == SUMMARY_TYPE:
+                    summaries.add(valid_lines)
+                valid_lines += 1
+                valid_bytes += len(raw)
+                self._remember(record)
+        if summaries:
+            self._drop_lines(summaries, valid_lines)
+        else:
+            # Écraser une fin de fichier incomplète (arrêt pendant une écriture)
+            os.truncate(self.path, valid_bytes)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _drop_lines(self, dropped, valid_lines):
+        """Réécrit les valid_lines premières lignes sans celles de dropped"""
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with open(self.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            for i, raw in enumerate(src):
+                if i >= valid_lines:
+                    break
+                if i not in dropped:
+                    dst.write(raw)
+        os.replace(tmp_path, self.path)
+
+    def iter_records(self):
+        """Relit les enregistrements écrits (hors synthèse), sans tout charger"""
+        self.flush()
+        if self.format == 'parquet':
+            yield from self._iter_parquet()
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('type') != SUMMARY_TYPE:
+                    yield record
+
+    # ==================== PARQUET ====================
+
+    def _part_paths(self):
+        return sorted(self.path.glob('part-*.parquet'))
+
+    def _open_parquet(self, resume):
+        import pyarrow.parquet as pq
+
+        if not resume and self.path.exists():
+            for stale in self._part_paths():
+                stale.unlink()
+            (self.path / '_summary.json').unlink(missing_ok=True)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        for part in self._part_paths():
+            try:
+                table = pq.read_table(part)
+            except Exception as e:
+                # Fichier en cours d'écriture lors de l'arrêt: son paquet sera refait
+                print(f"⚠️ Dropping incomplete report part {part.name}: {e}", file=sys.stderr)
+                part.unlink()
+                continue
+            if self.schema is None:
+                self.schema = table.schema
+            for record in table.to_pylist():
+                self._remember(record)
+            self._parts = max(self._parts, int(part.stem.split('-')[1]) + 1)
+
+    def _iter_parquet(self):
+        import pyarrow.parquet as pq
+
+        for part in self._part_paths():
+            yield from pq.read_table(part).to_pylist()
+
+    def _write_part(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.schema is None:
+            # Colonnes toujours vides dans le premier paquet: texte
+            inferred = pa.Table.from_pylist(self._buffer).schema
+            self.schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                for field in inferred
+            ])
+        table = pa.Table.from_pylist(self._buffer, schema=self.schema)
+        final_path = self.path / f"part-{self._parts:05d}.parquet"
+        tmp_path = final_path.with_suffix('.tmp')
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, final_path)
+        self._parts += 1
+        self._buffer = []
+
+    # ==================== ÉCRITURE ====================
+
+    def _remember(self, record):
+        if record.get('type') == SUMMARY_TYPE:
+            return
+        self.resumed_records += 1
+        value = record.get(self.key)
+        if value is not None:
+            self._done[value] = self._done.get(value, 0) + 1
+
+    def done_keys(self, min_records=1):
+        """Clés déjà écrites au moins min_records fois (ex: une ligne par poste)"""
+        return {value for value, count in self._done.items() if count >= min_records}
+
+    def write(self, record):
+        self.write_many([record])
+
+    def write_many(self, records):
+        """Ajoute des enregistrements; NDJSON: écrits et vidés immédiatement"""
+        if not records:
+            return
+        self.records += len(records)
+        if self.format == 'parquet':
+            self._buffer.extend(records)
+            if len(self._buffer) >= PARQUET_ROWS_PER_PART:
+                self._write_part()
+            return
+        self._file.write(''.join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        self._file.flush()
+
+    def flush(self):
+        """Parquet: écrit le paquet en cours (un fichier part-*.parquet)"""
+        if self.format == 'parquet' and self._buffer:
+            self._write_part()
+        elif self._file is not None:
+            self._file.flush()
+
+    def close(self, summary=None):
+        """
+        Termine le rapport avec un enregistrement de synthèse
+
+        records_written compte les enregistrements de cette exécution,
+        records_resumed ceux d'exécutions précédentes (reprise) et
+        records_total ceux du rapport complet; resumed_items est le nombre
+        de clés déjà présentes à la reprise.
+
+        Args:
+            summary: champs ajoutés à la synthèse (ex: classement final)
+        """
+        self.flush()
+        record = {
+            'type': SUMMARY_TYPE,
+            'records_written': self.records,
+            'records_resumed': self.resumed_records,
+            'records_total': self.resumed_records + self.records,
+            'resumed_items': len(self._done),
+            'started_at': self.started_at,
+            'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            **(summary or {}),
+        }
+        if self.format == 'parquet':
+            tmp_path = self.path / '_summary.json.tmp'
+            tmp_path.write_text(json.dumps(record, ensure_ascii=False, indent=2), encoding='utf-8')
+            os.replace(tmp_path, self.path / '_summary.json')
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.close()
+            self._file = None
+        return record
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # En cas d'erreur: ce qui est écrit reste, sans synthèse (reprise possible)
+        if exc_type is not None:
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        return False
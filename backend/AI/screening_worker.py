@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+screening_worker.py - Worker de screening longue durée
+Lit des jobs JSON (un par ligne) sur stdin ou sur un socket Unix et répond
+sur le même canal. Le modèle reste chargé en mémoire entre les jobs.
+
+Requête : {"id": "...", "job": {...}, "resume_paths": [...]}
+          (ou "jobs": [...] pour plusieurs postes, une liste de résultats par poste)
+Réponse : {"id": "...", "results": [...]}  ou  {"id": "...", "error": "..."}
+          ("metrics" est ajouté si le worker est lancé avec --metrics)
+"""
+
+import sys
+import os
+import json
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# ==================== TRAITEMENT D'UN JOB ====================
+
+def handle_line(line, handler):
+    """Décode une ligne de requête et exécute le job"""
+    job_id = None
+    try:
+        message = json.loads(line)
+        job_id = message.get('id')
+        return {'id': job_id, **handler(message)}
+    except Exception as e:
+        print(f"❌ Job {job_id} failed: {e}", file=sys.stderr)
+        return {'id': job_id, 'error': str(e)}
+
+def _submit(pool, line, handler, write):
+    """Soumet une ligne au pool, la réponse est écrite à la fin du job"""
+    return pool.submit(lambda: write(handle_line(line, handler)))
+
+# ==================== MODE STDIN ====================
+
+def _serve_stdio(handler, pool):
+    """Lit les jobs sur stdin et écrit les réponses sur stdout"""
+    lock = threading.Lock()
+
+    def write(response):
+        with lock:
+            sys.stdout.write(json.dumps(response) + "\n")
+            sys.stdout.flush()
+
+    for line in sys.stdin:
+        if line.strip():
+            _submit(pool, line, handler, write)
+
+# ==================== MODE SOCKET UNIX ====================
+
+def _serve_socket(handler, pool, socket_path):
+    """Écoute sur un socket Unix, une connexion peut envoyer plusieurs jobs"""
+
+    class JobHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            lock = threading.Lock()
+            pending = []
+
+            def write(response):
+                with lock:
+                    try:
+                        self.wfile.write((json.dumps(response) + "\n").encode('utf-8'))
+                        self.wfile.flush()
+                    except OSError:
+                        # Le client s'est déconnecté
+                        pass
+
+            for raw in self.rfile:
+                line = raw.decode('utf-8')
+                if line.strip():
+                    pending.append(_submit(pool, line, handler, write))
+            wait(pending)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    with socketserver.ThreadingUnixStreamServer(socket_path, JobHandler) as server:
+        server.daemon_threads = True
+        print(f"🔌 Listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(socket_path)
+
+# ==================== POINT D'ENTRÉE ====================
+
+def serve(handler, socket_path=None, workers=4):
+    """
+    Démarre le worker
+
+    Args:
+        handler: fonction (message) -> dict de la réponse ('results', 'metrics'...)
+        socket_path: chemin du socket Unix, ou None pour stdin/stdout
+        workers: nombre de jobs traités en parallèle
+    """
+    print(f"🚀 Screening worker ready ({workers} workers)", file=sys.stderr)
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        if socket_path:
+            _serve_socket(handler, pool, socket_path)
+        else:
+            _serve_stdio(handler, pool)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown(wait=True)
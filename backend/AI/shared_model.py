@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+shared_model.py - Modèle de screening partagé entre plusieurs processus
+Les gros tableaux du modèle sont écrits une fois dans un dossier de fichiers
+.npy, puis chaque worker les ouvre en mémoire mappée: les pages viennent du
+cache du système et sont communes à tous les processus. Un worker de plus ne
+recopie ni le vocabulaire ni les arbres (ai3.py --serve --processes N).
+
+    words, keys, columns
+                        vocabulaire figé du TfidfVectorizer (featurizer.py,
+                        CompactTfidfVectorizer): mots triés et n-grammes codés,
+                        recherche par np.searchsorted au lieu du dict vocabulary_
+    idf                 poids IDF (TF-IDF ou featurizer 'hashing')
+    roots, left, right, feature, threshold, leaf_values
+                        nœuds de tous les arbres de la forêt à la suite
+                        (fils en index absolus; pour une feuille, left = -1 et
+                        right = sa ligne dans leaf_values)
+    weights, intercept  modèle linéaire (linear_scorer.py)
+    vectorizer.joblib   paramètres du vectorizer, sans vocabulaire ni mots vides
+    meta.json           version du modèle, classes, types
+
+Les scores sont identiques à ceux de scikit-learn: mêmes comptages TF-IDF,
+mêmes comparaisons (valeurs float32, seuils float64) et moyenne des arbres
+dans le même ordre.
+"""
+
+import sys
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from featurizer import CompactTfidfVectorizer, HashedTfidfVectorizer, compact_vectorizer
+from linear_scorer import LinearCategoryScorer
+from model_store import MODEL_DIR
+
+SHARED_VERSION = 2
+DEFAULT_SHARED_DIR = MODEL_DIR / 'shared'
+# Featurizers dont les tableaux sont partagés
+_FEATURIZERS = {cls.kind: cls for cls in (CompactTfidfVectorizer, HashedTfidfVectorizer)}
+# CV densifiés à la fois pour le parcours des arbres (5000 features: ~5 Mo)
+_PREDICT_CHUNK = 256
+
+def shared_model_path(model_version, shared_dir=None):
+    """Dossier du modèle partagé d'une version du modèle"""
+    return Path(shared_dir or DEFAULT_SHARED_DIR) / model_version
+
+# ==================== CLASSIFICATEURS ====================
+
+class SharedForest:
+    """predict_proba d'une RandomForestClassifier, arbres en tableaux numpy"""
+
+    def __init__(self, roots, left, right, feature, threshold, leaf_values):
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.leaf_values = leaf_values
+
+    @classmethod
+    def arrays(cls, forest):
+        """Tableaux à partager d'une forêt entraînée (arbres concaténés)"""
+        roots, left, right, feature, threshold, leaf_values = [], [], [], [], [], []
+        node_offset = leaf_offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            leaf_rows = np.cumsum(is_leaf) - 1 + leaf_offset
+            roots.append(node_offset)
+            left.append(np.where(is_leaf, -1, tree.children_left + node_offset))
+            right.append(np.where(is_leaf, leaf_rows, tree.children_right + node_offset))
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            # Depuis scikit-learn 1.4, value contient déjà les proportions
+            leaf_values.append(tree.value[is_leaf, 0, :forest.n_classes_])
+            node_offset += tree.node_count
+            leaf_offset += int(is_leaf.sum())
+        return {
+            'roots': np.array(roots, dtype=np.int64),
+            'left': np.concatenate(left).astype(np.int64),
+            'right': np.concatenate(right).astype(np.int64),
+            'feature': np.concatenate(feature).astype(np.int32),
+            'threshold': np.concatenate(threshold).astype(np.float64),
+            'leaf_values': np.concatenate(leaf_values).astype(np.float64),
+        }
+
+    @property
+    def n_classes(self):
+        return self.leaf_values.shape[1]
+
+    def predict_proba(self, X):
+        """Moyenne des probabilités des feuilles atteintes (comme scikit-learn)"""
+        import scipy.sparse as sp
+
+        # scikit-learn compare les valeurs converties en float32
+        X = sp.csr_matrix(X, dtype=np.float32)
+        probas = np.empty((X.shape[0], self.n_classes))
+        for begin in range(0, X.shape[0], _PREDICT_CHUNK):
+            block = X[begin:begin + _PREDICT_CHUNK].toarray()
+            probas[begin:begin + len(block)] = self._predict_dense(block)
+        return probas
+
+    def _predict_dense(self, block):
+        n, n_trees = len(block), len(self.roots)
+        # Tous les arbres à la fois: une position par (arbre, CV)
+        node = np.repeat(self.roots, n)
+        sample = np.tile(np.arange(n), n_trees)
+        active = np.flatnonzero(self.left[node] >= 0)
+        while active.size:
+            current = node[active]
+            go_left = block[sample[active], self.feature[current]] <= self.threshold[current]
+            node[active] = np.where(go_left, self.left[current], self.right[current])
+            active = active[self.left[node[active]] >= 0]
+
+        leaves = self.leaf_values[self.right[node]].reshape(n_trees, n, self.n_classes)
+        total = np.zeros((n, self.n_classes))
+        for tree_probas in leaves:
+            total += tree_probas
+        total /= n_trees
+        return total
+
+class SharedLabels:
+    """transform() et classes_ d'un LabelEncoder"""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+        self._index = {label: i for i, label in enumerate(classes)}
+
+    def transform(self, labels):
+        try:
+            return np.array([self._index[label] for label in labels], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"y contains previously unseen labels: {e}") from None
+
+# ==================== EXPORT / CHARGEMENT ====================
+
+def export_model(vectorizer, clf, le, model_version, path=None):
+    """
+    Écrit les tableaux du modèle (une fois par version du modèle)
+
+    Returns:
+        le dossier du modèle partagé
+    """
+    import joblib
+
+    path = Path(path or shared_model_path(model_version))
+    meta = _read_meta(path)
+    if meta is not None and meta.get('model_version') == model_version:
+        return path
+
+    arrays = {}
+    if hasattr(vectorizer, 'vocabulary_'):
+        vectorizer = compact_vectorizer(vectorizer)
+        if not isinstance(vectorizer, CompactTfidfVectorizer):
+            raise ValueError(f"Cannot share vectorizer {type(vectorizer).__name__}: expected TF-IDF")
+    if isinstance(vectorizer, tuple(_FEATURIZERS.values())):
+        arrays.update(vectorizer.arrays())
+        # Mêmes paramètres, sans vocabulary_ (les tableaux le remplacent)
+        vectorizer_params, vectorizer_kind = vectorizer.params, vectorizer.kind
+    else:
+        # HashingVectorizer: aucun état à partager
+        vectorizer_params, vectorizer_kind = vectorizer, 'stateless'
+
+    if isinstance(clf, LinearCategoryScorer):
+        arrays.update({'weights': clf.weights, 'intercept': clf.intercept})
+        classifier_kind = 'linear'
+    elif hasattr(clf, 'estimators_') and hasattr(clf.estimators_[0], 'tree_'):
+        arrays.update(SharedForest.arrays(clf))
+        classifier_kind = 'forest'
+    else:
+        raise ValueError(f"Cannot share classifier {type(clf).__name__}")
+
+    meta = {
+        'version': SHARED_VERSION,
+        'model_version': model_version,
+        'vectorizer': vectorizer_kind,
+        'classifier': classifier_kind,
+        'classes': [str(label) for label in le.classes_],
+        'arrays_mb': round(sum(array.nbytes for array in arrays.values()) / (1024 * 1024), 1),
+    }
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+    for name, array in arrays.items():
+        np.save(tmp_path / f"{name}.npy", array)
+    joblib.dump(vectorizer_params, tmp_path / 'vectorizer.joblib')
+    (tmp_path / 'meta.json').write_text(json.dumps(meta, indent=2), encoding='utf-8')
+    shutil.rmtree(path, ignore_errors=True)
+    tmp_path.rename(path)
+    print(f"💾 Shared model written to {path} ({meta['arrays_mb']} MB of arrays)", file=sys.stderr)
+    return path
+
+def _read_meta(path):
+    try:
+        meta = json.loads((Path(path) / 'meta.json').read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == SHARED_VERSION else None
+
+def load_model(path):
+    """
+    Ouvre un modèle partagé en mémoire mappée
+
+    Returns:
+        dict avec vectorizer, clf, le et model_version (mêmes méthodes que
+        le bundle), ou None s'il est absent ou d'une autre version
+    """
+    import joblib
+
+    path = Path(path)
+    meta = _read_meta(path)
+    if meta is None:
+        return None
+
+    def array(name):
+        return np.load(path / f"{name}.npy", mmap_mode='r')
+
+    vectorizer = joblib.load(path / 'vectorizer.joblib')
+    featurizer = _FEATURIZERS.get(meta['vectorizer'])
+    if featurizer is not None:
+        vectorizer = featurizer(vectorizer, **{name: array(name) for name in featurizer.ARRAYS})
+
+    if meta['classifier'] == 'linear':
+        # weights est enregistré en ordre Fortran: .T et le constructeur ne copient rien
+        clf = LinearCategoryScorer(array('weights').T, array('intercept'))
+    else:
+        clf = SharedForest(*(array(name) for name in
+                             ('roots', 'left', 'right', 'feature', 'threshold', 'leaf_values')))
+
+    return {
+        'vectorizer': vectorizer,
+        'clf': clf,
+        'le': SharedLabels(meta['classes']),
+        'model_version': meta['model_version'],
+    }
@@ -0,0 +1,20 @@
+"""Fixtures partagées des tests de backend/AI (lancer pytest depuis backend/AI)"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+AI_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AI_DIR))
+
+# Dataset livré avec le dépôt (schéma de AI_Resume_Screening.csv, 4 catégories)
+SCREENING_DATASET = AI_DIR.parent.parent / 'utils' / 'AI_Resume_Screening.csv'
+
+@pytest.fixture(scope='session')
+def screener(tmp_path_factory):
+    """CVScreener entraîné une fois pour la session, bundle dans un dossier temporaire"""
+    from ai3 import CVScreener
+
+    bundle = tmp_path_factory.mktemp('model') / 'cv_screener.joblib'
+    return CVScreener(dataset_path=SCREENING_DATASET, model_path=bundle, verbose=False)
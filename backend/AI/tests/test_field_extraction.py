@@ -0,0 +1,41 @@
+from field_extraction import (FieldExtractor, extract_email, extract_experience,
+                              extract_phone)
+
+SKILLS = ['Python', 'Node.js', 'Vue.js', 'Machine Learning', 'JavaScript', 'C++', 'Git']
+
+def test_all_fields_are_extracted():
+    text = ("Jean Dupont - jean.dupont@mail.com - 06 12 34 56 78\n"
+            "5 years of experience with Python, NodeJS and C++")
+    fields = FieldExtractor(SKILLS).extract(text)
+    assert fields == {
+        'email': 'jean.dupont@mail.com',
+        'telephone': '06 12 34 56 78',
+        'competences': ['Python', 'Node.js', 'C++'],
+        'experience_annees': 5,
+    }
+
+def test_phone_does_not_swallow_experience():
+    text = "Tél: 22 333 444\n3 ans d'expérience"
+    assert extract_experience(text) == 3
+    assert FieldExtractor(SKILLS).extract(text)['experience_annees'] == 3
+
+def test_phone_after_punctuation():
+    assert extract_phone("tel.0612345678") == '0612345678'
+
+def test_email_digits_are_not_a_phone():
+    text = "contact: jdupont1234567@mail.com, tel 0612345678"
+    assert extract_email(text) == 'jdupont1234567@mail.com'
+    assert extract_phone(text) == '0612345678'
+
+def test_ambiguous_synonyms_are_not_skills():
+    text = "Du point de vue technique, ML et JS ne sont pas cités en entier"
+    assert FieldExtractor(SKILLS).extract_skills(text) == []
+
+def test_skills_match_whole_words_and_synonyms():
+    extractor = FieldExtractor(SKILLS)
+    assert extractor.extract_skills("github, vuejs, machine learning") == ['Vue.js', 'Machine Learning']
+    assert extractor.extract_skills("JavaScript et ECMAScript") == ['JavaScript']
+
+def test_first_experience_pattern_wins():
+    assert extract_experience("Expérience: 4 ans. 7 years of experience") == 4
+    assert extract_experience("aucune mention") == 0
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import threading
+
+from job_queue import ScreeningQueue, _dispatch, chunks
+
+JOB = {'category': 'Data Scientist', 'description': 'python', 'nb_postes': 3}
+
+def _result(path, score):
+    return {'candidate_id': 1, 'final_score': score, 'file_path': path}
+
+def test_chunks_grow_up_to_the_largest_size():
+    sizes = [len(chunk) for chunk in chunks(list(range(100)), first=4, largest=16)]
+    assert sizes == [4, 8, 16, 16, 16, 16, 16, 8]
+
+def test_results_are_merged_across_chunks():
+    def screen_chunk(jobs, paths, dedup):
+        return [[_result(path, int(path)) for path in paths]], list(paths)
+
+    async def run():
+        queue = ScreeningQueue(screen_chunk, run_job=None)
+        responses = []
+        paths = [str(i) for i in range(40)]
+        await queue.submit({'id': 'a', 'job': JOB, 'resume_paths': paths}, responses.append)
+        queue.close()
+        return responses
+
+    [response] = asyncio.run(run())
+    assert [result['file_path'] for result in response['results']] == ['39', '38', '37']
+
+def test_cancel_stops_a_running_job():
+    started = threading.Event()
+    release = threading.Event()
+
+    def screen_chunk(jobs, paths, dedup):
+        started.set()
+        release.wait(5)
+        return [[]], list(paths)
+
+    async def run():
+        queue = ScreeningQueue(screen_chunk, run_job=None)
+        responses = []
+        paths = [str(i) for i in range(100)]
+        task = _dispatch(queue, json.dumps({'id': 'a', 'job': JOB, 'resume_paths': paths}),
+                         responses.append)
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        _dispatch(queue, json.dumps({'cancel': 'a'}), responses.append)
+        await asyncio.gather(task, return_exceptions=True)
+        release.set()
+        queue.close()
+        return responses
+
+    responses = asyncio.run(run())
+    assert responses == [{'id': 'a', 'error': 'cancelled', 'cancelled': True}]
+
+def test_malformed_requests_get_an_error_reply():
+    async def run():
+        queue = ScreeningQueue(lambda *args: None, run_job=None)
+        responses = []
+        for line in ('not json', '[1, 2]', '{"id": [1]}', '{"cancel": {}}'):
+            assert _dispatch(queue, line, responses.append) is None
+        queue.close()
+        return responses
+
+    responses = asyncio.run(run())
+    assert len(responses) == 4
+    assert all(response['id'] is None and 'error' in response for response in responses)
+
+def test_idle_tenants_are_forgotten():
+    seen = []
+
+    def screen_chunk(jobs, paths, dedup):
+        return [[]], list(paths)
+
+    async def run():
+        queue = ScreeningQueue(screen_chunk, run_job=lambda message: [], tenant_workers=1)
+        responses = []
+        tasks = [queue.submit({'id': str(i), 'tenant': f"t{i % 3}", 'job': JOB,
+                               'resume_paths': ['a', 'b']}, responses.append)
+                 for i in range(9)]
+        await asyncio.sleep(0)
+        seen.append(len(queue._tenant_slots))
+        await asyncio.gather(*tasks)
+        seen.append(len(queue._tenant_slots))
+        queue.close()
+        return responses
+
+    responses = asyncio.run(run())
+    assert len(responses) == 9
+    assert seen == [3, 0]
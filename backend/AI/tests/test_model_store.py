@@ -0,0 +1,17 @@
+from ai3 import CVScreener
+from conftest import SCREENING_DATASET
+
+def test_bundle_is_reloaded_without_retraining(screener, tmp_path):
+    bundle = tmp_path / 'bundle.joblib'
+    first = CVScreener(dataset_path=SCREENING_DATASET, model_path=bundle, verbose=False)
+    assert bundle.exists()
+    mtime = bundle.stat().st_mtime_ns
+
+    second = CVScreener(dataset_path=SCREENING_DATASET, model_path=bundle, verbose=False)
+    assert bundle.stat().st_mtime_ns == mtime
+    assert second.model_version == first.model_version
+
+    texts = ['Python, SQL, Deep Learning B.Sc', 'Linux, Ethical Hacking MBA']
+    job = {'category': 'Data Scientist', 'description': 'python sql machine learning',
+           'nb_postes': 2}
+    assert second.screen_batch([job], texts) == first.screen_batch([job], texts)
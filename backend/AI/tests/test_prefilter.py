@@ -0,0 +1,28 @@
+"""Pré-filtre de CVScreener.screen_batch (prefilter.py)"""
+
+from instrumentation import Metrics
+
+JOB = {
+    'category': 'Data Scientist',
+    'description': 'Python machine learning pandas scikit-learn deep learning',
+    'nb_postes': 2,
+    'min_score': 0.6,
+}
+
+RESUMES = [
+    "Data scientist, 5 years of experience with Python, pandas and scikit-learn, deep learning",
+    "Chef cuisinier, 10 ans d'expérience en restauration",
+]
+
+def _stages(screener, jobs):
+    metrics = Metrics()
+    with metrics.activate():
+        screener.screen_batch(jobs, RESUMES)
+    return [record['stage'] for record in metrics.stages]
+
+def test_prefilter_off_records_no_stage(screener):
+    assert screener.prefilter == 'off'
+    assert 'prefilter' not in _stages(screener, [JOB, dict(JOB, prefilter='off')])
+
+def test_prefilter_stage_recorded_when_a_job_enables_it(screener):
+    assert 'prefilter' in _stages(screener, [JOB, dict(JOB, prefilter='bound')])
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from report_sink import ReportSink, resolve_format
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+def test_format_follows_the_extension():
+    assert resolve_format('report.parquet') == 'parquet'
+    assert resolve_format('report.ndjson') == 'ndjson'
+    with pytest.raises(ValueError):
+        resolve_format('report.csv', 'csv')
+
+def test_resume_keeps_one_summary_and_drops_a_truncated_tail(tmp_path):
+    path = tmp_path / 'report.ndjson'
+    with ReportSink(path) as sink:
+        sink.write_many([{'file_path': 'a'}, {'file_path': 'b'}])
+        sink.close()
+    for key in ('c', 'd'):
+        with ReportSink(path, resume=True) as sink:
+            sink.write({'file_path': key})
+            sink.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"file_path": "trunc')
+
+    with ReportSink(path, resume=True) as sink:
+        assert sink.done_keys() == {'a', 'b', 'c', 'd'}
+        sink.write({'file_path': 'e'})
+        summary = sink.close()
+
+    records = _lines(path)
+    assert [record.get('file_path') for record in records[:-1]] == ['a', 'b', 'c', 'd', 'e']
+    assert [record for record in records if record.get('type') == 'summary'] == [summary]
+    assert summary['records_written'] == 1
+    assert summary['records_resumed'] == 4
+    assert summary['records_total'] == 5
+
+def test_interrupted_report_has_no_summary(tmp_path):
+    path = tmp_path / 'report.ndjson'
+    with pytest.raises(RuntimeError):
+        with ReportSink(path) as sink:
+            sink.write({'file_path': 'a'})
+            raise RuntimeError('stop')
+    assert _lines(path) == [{'file_path': 'a'}]
+
+def test_done_keys_counts_records_per_key(tmp_path):
+    path = tmp_path / 'report.ndjson'
+    with ReportSink(path) as sink:
+        sink.write_many([{'file_path': 'a', 'job': 0}, {'file_path': 'a', 'job': 1},
+                         {'file_path': 'b', 'job': 0}])
+    sink = ReportSink(path, resume=True)
+    assert sink.done_keys(min_records=2) == {'a'}
+    sink.close()
+
+def test_parquet_resume(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'report.parquet'
+    with ReportSink(path) as sink:
+        sink.write_many([{'file_path': 'a', 'score': 0.5}])
+        sink.close()
+    with ReportSink(path, resume=True) as sink:
+        assert sink.done_keys() == {'a'}
+        sink.write({'file_path': 'b', 'score': 0.25})
+        summary = sink.close()
+    assert [record['file_path'] for record in sink.iter_records()] == ['a', 'b']
+    assert summary['records_total'] == 2
@@ -0,0 +1,67 @@
+import extraction
+from text_cache import TextCache
+
+def test_key_depends_on_content_not_name(tmp_path):
+    cache = TextCache(tmp_path / 'cache')
+    first, copy, other = tmp_path / 'a.pdf', tmp_path / 'b.pdf', tmp_path / 'c.pdf'
+    first.write_bytes(b'resume one')
+    copy.write_bytes(b'resume one')
+    other.write_bytes(b'resume two')
+    assert cache.key(first, 1) == cache.key(copy, 1)
+    assert cache.key(first, 1) != cache.key(other, 1)
+    assert cache.key(first, 1) != cache.key(first, 2)
+
+def test_size_limit_evicts_oldest_entries(tmp_path):
+    cache = TextCache(tmp_path / 'cache', max_bytes=1000)
+    for i in range(10):
+        cache.put(f"{i:02d}-v1", 'x' * 200)
+    assert sum(size for _, _, size in cache._scan()) <= 1000
+    assert cache.get('09-v1') == 'x' * 200
+
+def _fake_extraction(monkeypatch, tmp_path):
+    """Extraction factice dont le texte dépend de PDF_MAX_CHARS"""
+    calls = []
+
+    def extract(file_path, info):
+        calls.append(file_path)
+        return 'x' * extraction.PDF_MAX_CHARS
+
+    monkeypatch.setattr(extraction, '_cache', TextCache(tmp_path / 'cache'))
+    monkeypatch.setattr(extraction, '_extract_uncached', extract)
+    resume = tmp_path / 'cv.pdf'
+    resume.write_bytes(b'%PDF-1.4 resume')
+    return resume, calls
+
+def test_cached_text_is_reused(tmp_path, monkeypatch):
+    resume, calls = _fake_extraction(monkeypatch, tmp_path)
+    info = {}
+    first = extraction.extract_resume_text(resume, info)
+    assert not info['cached']
+    info = {}
+    assert extraction.extract_resume_text(resume, info) == first
+    assert info['cached']
+    assert len(calls) == 1
+
+def test_changing_pdf_limits_invalidates_the_cache(tmp_path, monkeypatch):
+    resume, calls = _fake_extraction(monkeypatch, tmp_path)
+    monkeypatch.setattr(extraction, 'PDF_MAX_CHARS', 100)
+    assert len(extraction.extract_resume_text(resume)) == 100
+    monkeypatch.setattr(extraction, 'PDF_MAX_CHARS', 10)
+    assert len(extraction.extract_resume_text(resume)) == 10
+    monkeypatch.setattr(extraction, 'PDF_MAX_PAGES', 1)
+    extraction.extract_resume_text(resume)
+    assert len(calls) == 3
+
+def test_enabling_ocr_invalidates_the_cache(tmp_path, monkeypatch):
+    import ocr
+
+    resume, calls = _fake_extraction(monkeypatch, tmp_path)
+    monkeypatch.setattr(ocr, '_available', False)
+    extraction.extract_resume_text(resume)
+    monkeypatch.setattr(ocr, '_available', True)
+    extraction.extract_resume_text(resume)
+    monkeypatch.setattr(ocr, 'OCR_LANG', 'fra')
+    extraction.extract_resume_text(resume)
+    monkeypatch.setattr(ocr, 'OCR_DPI', 300)
+    extraction.extract_resume_text(resume)
+    assert len(calls) == 4
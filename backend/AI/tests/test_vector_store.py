@@ -0,0 +1,63 @@
+import hashlib
+
+import pytest
+
+import vector_store
+from vector_store import VectorStore
+
+TEXTS = [
+    'Python, SQL, Deep Learning B.Sc Google ML',
+    'TensorFlow, NLP, Pytorch M.Tech Deep Learning Specialization',
+    'Ethical Hacking, Cybersecurity, Linux MBA AWS Certified',
+    'Java, Spring Boot, SQL B.Tech',
+    'React, Node.js, Java B.Sc AWS Certified',
+    'Machine Learning, Python, NLP PhD',
+]
+JOBS = [
+    {'category': 'Data Scientist', 'description': 'python sql machine learning', 'nb_postes': 6},
+    {'category': 'Cybersecurity Analyst', 'description': 'linux hacking network', 'nb_postes': 6},
+]
+
+def _digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def test_stored_vectors_score_like_the_text_path(screener, tmp_path):
+    store = VectorStore('test', store_dir=tmp_path)
+    hashes = [_digest(text) for text in TEXTS]
+    cv_vectors, probas = screener.encode(TEXTS)
+    assert store.add(hashes, cv_vectors, probas, TEXTS) == len(TEXTS)
+    assert store.add(hashes, cv_vectors, probas, TEXTS) == 0
+
+    stored = VectorStore('test', store_dir=tmp_path)
+    matrix, stored_probas, previews = stored.get(hashes)
+    from_store = screener.screen_vectors(JOBS, matrix, previews, stored_probas)
+    from_text = screener.screen_batch(JOBS, TEXTS)
+    for expected, actual in zip(from_text, from_store):
+        assert [r['candidate_id'] for r in actual] == [r['candidate_id'] for r in expected]
+        for e, a in zip(expected, actual):
+            # Vecteurs stockés en float32
+            assert a['final_score'] == pytest.approx(e['final_score'], abs=1e-6)
+
+def test_compaction_prunes_stale_paths(screener, tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, 'MAX_SEGMENTS', 2)
+    store = VectorStore('test', store_dir=tmp_path / 'store')
+    files = []
+    for i, text in enumerate(TEXTS[:4]):
+        path = tmp_path / f"cv{i}.txt"
+        path.write_text(text, encoding='utf-8')
+        files.append(path)
+    # Hashé mais jamais stocké (extraction vide, par exemple)
+    never_stored = tmp_path / 'empty.txt'
+    never_stored.write_text('', encoding='utf-8')
+    store.hash_files([never_stored])
+
+    for path in files[:2]:
+        [digest] = store.hash_files([path])
+        store.add([digest], *screener.encode([path.read_text()]), [path.read_text()])
+    files[0].unlink()
+    [digest] = store.hash_files([files[2]])
+    store.add([digest], *screener.encode([files[2].read_text()]), [files[2].read_text()])
+
+    known = set(VectorStore('test', store_dir=tmp_path / 'store').paths_by_hash().values())
+    assert known == {str(files[1]), str(files[2])}
+    assert len(store) == 3
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+text_cache.py - Cache disque du texte extrait des CV
+Les entrées sont indexées par le SHA-256 du contenu du fichier et la version
+de l'extracteur: un même CV uploadé sous un autre nom réutilise le cache.
+La taille totale est bornée, les entrées les moins récemment lues sont
+supprimées en premier (LRU basé sur le mtime).
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+from model_store import file_sha256
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+DEFAULT_CACHE_DIR = SCRIPT_DIR / 'cache' / 'text'
+DEFAULT_MAX_MB = 256
+
+class TextCache:
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        Args:
+            cache_dir: dossier du cache (défaut: $CV_TEXT_CACHE_DIR ou AI/cache/text)
+            max_bytes: taille maximale (défaut: $CV_TEXT_CACHE_MAX_MB, 256 Mo)
+        """
+        if cache_dir is None:
+            cache_dir = os.environ.get('CV_TEXT_CACHE_DIR', DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('CV_TEXT_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        # Taille estimée, calculée au premier ajout
+        self._size = None
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def key(self, file_path, version):
+        """Clé de cache: contenu du fichier + version de l'extracteur"""
+        return f"{file_sha256(file_path)}-v{version}"
+
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.txt"
+
+    def get(self, key):
+        """Retourne le texte en cache, ou None"""
+        path = self._entry_path(key)
+        try:
+            text = path.read_text(encoding='utf-8')
+        except OSError:
+            return None
+        # Marquer l'entrée comme récemment utilisée
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return text
+
+    def put(self, key, text):
+        """Ajoute une entrée (écriture atomique) puis applique la limite de taille"""
+        path = self._entry_path(key)
+        data = text.encode('utf-8')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write text cache entry: {e}", file=sys.stderr)
+            return
+
+        if self._size is None:
+            self._size = sum(size for _, _, size in self._scan())
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _scan(self):
+        """Liste (mtime, chemin, taille) de toutes les entrées"""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.txt'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _evict(self):
+        """Supprime les entrées les plus anciennes jusqu'à 90% de la limite"""
+        entries = sorted(self._scan())
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * 0.9
+        for _, path, size in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+        self._size = total
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+train_model.py - Entraîne le modèle de screening et écrit le bundle versionné
+Usage: python train_model.py [--dataset <csv>] [--output <bundle>] [--classifier forest|linear]
+                             [--featurizer tfidf|hashing]
+       python train_model.py --incremental [--reset] [--batch-size <n>] [--dataset <csv>]
+       (mode incrémental: seules les nouvelles lignes du dataset sont apprises,
+        le bundle s'utilise avec: python ai3.py --model <bundle> ...)
+"""
+
+import sys
+import json
+import argparse
+
+from ai3 import CVScreener, CLASSIFIERS, DATASET_PATH
+
+def _train_incremental(args):
+    from incremental import IncrementalTrainer, DEFAULT_INCREMENTAL_BUNDLE_PATH
+
+    trainer = IncrementalTrainer()
+    stats = trainer.update(args.dataset, batch_size=args.batch_size, reset=args.reset)
+    print(f"➕ {stats['added_train']} new training rows, {stats['added_holdout']} new test rows "
+          f"in {stats['seconds']}s", file=sys.stderr)
+    if 'accuracy' in stats:
+        print(f"🎯 Accuracy on {stats['total_holdout']} test rows: {stats['accuracy']}", file=sys.stderr)
+    trainer.save(args.dataset, args.output or DEFAULT_INCREMENTAL_BUNDLE_PATH)
+    print(json.dumps(stats))
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the CV screening model")
+    parser.add_argument('--dataset', default=str(DATASET_PATH),
+                        help="labeled resume CSV (default: utils/Resume.csv)")
+    parser.add_argument('--output',
+                        help="model bundle path (default: AI/models/cv_screener.joblib, "
+                             "cv_screener_linear.joblib or cv_screener_incremental.joblib)")
+    parser.add_argument('--classifier', choices=sorted(CLASSIFIERS), default='forest',
+                        help="category scorer to train (default: forest)")
+    parser.add_argument('--featurizer', choices=['tfidf', 'hashing'], default='tfidf',
+                        help="'hashing' trains on hashed features, in its own bundle "
+                             "(e.g. cv_screener_hashing.joblib) (default: tfidf)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="update the hashing/SGD model with rows it has not seen yet")
+    parser.add_argument('--reset', action='store_true',
+                        help="with --incremental: forget the saved state and start over")
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help="with --incremental: rows per partial_fit call")
+    args = parser.parse_args()
+
+    if args.incremental:
+        _train_incremental(args)
+    else:
+        CVScreener(dataset_path=args.dataset, model_path=args.output, retrain=True,
+                   classifier=args.classifier, featurizer=args.featurizer)
+    print("✅ Training complete", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+vector_store.py - Stock persistant des vecteurs des CV uploadés
+Pour chaque CV (identifié par le SHA-256 de son contenu), le vecteur TF-IDF
+et la ligne de probabilités de catégorie sont gardés sur disque au format
+CSR (float32), dans un dossier par version du modèle et de l'extracteur.
+Les segments sont ouverts en mémoire mappée: re-classer un pool de CV déjà
+vus pour un nouveau poste ne demande que la vectorisation de la description
+et un produit creux, sans extraction ni predict_proba.
+
+Les vecteurs sont gardés en float32: les scores relus du stock diffèrent
+de ceux du calcul en mémoire (float64) de l'ordre de 1e-8 (moins de 1e-6),
+avec le même classement hors quasi-égalités.
+
+Organisation:
+    <store>/paths.json                  chemin + taille + mtime -> SHA-256
+                                        (élagué à chaque fusion des segments)
+    <store>/<version>/manifest.json     liste des segments
+    <store>/<version>/<segment>/        data, indices, indptr, probas, hashes (.npy)
+                                        + previews.json (début du texte)
+"""
+
+import sys
+import os
+import json
+import uuid
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from model_store import file_sha256
+
+# 2: scores de catégorie du modèle linéaire non normalisés (voir ai3._class_scores)
+STORE_VERSION = 2
+SCRIPT_DIR = Path(__file__).parent.absolute()
+DEFAULT_STORE_DIR = SCRIPT_DIR / 'cache' / 'vectors'
+# Au-delà, les segments sont fusionnés en un seul
+MAX_SEGMENTS = 32
+# Longueur gardée pour cv_preview (200 caractères + de quoi savoir s'il y a une suite)
+PREVIEW_CHARS = 201
+
+_ARRAYS = ('data', 'indices', 'indptr', 'probas', 'hashes')
+
+def _write_json(path, payload):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(payload), encoding='utf-8')
+    os.replace(tmp_path, path)
+
+class VectorStore:
+    def __init__(self, version, store_dir=None):
+        """
+        Args:
+            version: identifiant du modèle et de l'extracteur (un dossier par version)
+            store_dir: dossier racine (défaut: $CV_VECTOR_STORE_DIR ou AI/cache/vectors)
+        """
+        if store_dir is None:
+            store_dir = os.environ.get('CV_VECTOR_STORE_DIR', DEFAULT_STORE_DIR)
+        self.root = Path(store_dir)
+        self.path = self.root / f"{version}-s{STORE_VERSION}"
+        self._lock = threading.Lock()
+        self._manifest_mtime = None
+        self._segments = []
+        self._rows = {}
+        self._path_hashes = None
+        self._hash_paths = None
+
+    # ==================== HASH DES FICHIERS ====================
+
+    def _load_path_hashes(self):
+        try:
+            return json.loads((self.root / 'paths.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def hash_files(self, file_paths):
+        """
+        SHA-256 du contenu de chaque fichier (None si illisible)
+
+        Le hash est mémorisé par chemin, taille et mtime: un pool de CV déjà
+        vus n'est pas relu.
+        """
+        with self._lock:
+            if self._path_hashes is None:
+                self._path_hashes = self._load_path_hashes()
+            memo = self._path_hashes
+
+        hashes, updates = [], {}
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                hashes.append(None)
+                continue
+            key = os.path.abspath(file_path)
+            signature = [stat.st_size, stat.st_mtime_ns]
+            entry = memo.get(key)
+            if entry is not None and entry[:2] == signature:
+                hashes.append(entry[2])
+                continue
+            try:
+                digest = file_sha256(file_path)
+            except OSError:
+                hashes.append(None)
+                continue
+            updates[key] = signature + [digest]
+            hashes.append(digest)
+
+        if updates:
+            with self._lock:
+                memo.update(updates)
+                self._hash_paths = None
+                self.root.mkdir(parents=True, exist_ok=True)
+                _write_json(self.root / 'paths.json', memo)
+        return hashes
+
+    # ==================== SEGMENTS ====================
+
+    def _refresh(self):
+        """Relit le manifest s'il a changé (autre processus, autre thread)"""
+        manifest_path = self.path / 'manifest.json'
+        try:
+            mtime = manifest_path.stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        segments, rows = [], {}
+        for name in manifest['segments']:
+            segment = self._open_segment(name, manifest['n_features'])
+            if segment is None:
+                continue
+            for row, digest in enumerate(segment['hashes']):
+                rows[digest.decode('ascii')] = (len(segments), row)
+            segments.append(segment)
+        self._segments, self._rows = segments, rows
+        self._manifest_mtime = mtime
+
+    def _open_segment(self, name, n_features):
+        directory = self.path / name
+        try:
+            segment = {
+                key: np.load(directory / f"{key}.npy", mmap_mode='r') for key in _ARRAYS
+            }
+            segment['previews'] = json.loads((directory / 'previews.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skipping unreadable vector segment {name}: {e}", file=sys.stderr)
+            return None
+        segment['name'] = name
+        segment['matrix'] = sp.csr_matrix(
+            (segment['data'], segment['indices'], segment['indptr']),
+            shape=(len(segment['hashes']), n_features)
+        )
+        return segment
+
+    def _write_segment(self, hashes, matrix, probas, previews):
+        name = uuid.uuid4().hex[:12]
+        tmp_dir = self.path / f".{name}.tmp"
+        tmp_dir.mkdir(parents=True)
+        matrix = matrix.tocsr()
+        index_dtype = np.int32 if matrix.nnz < 2 ** 31 else np.int64
+        np.save(tmp_dir / 'data.npy', matrix.data.astype(np.float32))
+        np.save(tmp_dir / 'indices.npy', matrix.indices.astype(index_dtype))
+        np.save(tmp_dir / 'indptr.npy', matrix.indptr.astype(index_dtype))
+        np.save(tmp_dir / 'probas.npy', np.asarray(probas, dtype=np.float32))
+        np.save(tmp_dir / 'hashes.npy', np.array(hashes, dtype='S64'))
+        (tmp_dir / 'previews.json').write_text(json.dumps(previews), encoding='utf-8')
+        os.replace(tmp_dir, self.path / name)
+        return name
+
+    def _write_manifest(self, names, n_features):
+        _write_json(self.path / 'manifest.json', {
+            'version': STORE_VERSION, 'n_features': n_features, 'segments': names,
+        })
+        # Relecture forcée au prochain _refresh (mtime de résolution grossière)
+        self._manifest_mtime = None
+
+    def _compact(self, n_features):
+        """Fusionne tous les segments en un seul"""
+        matrix = sp.vstack([segment['matrix'] for segment in self._segments]).tocsr()
+        probas = np.vstack([segment['probas'] for segment in self._segments])
+        hashes = [digest.decode('ascii') for segment in self._segments for digest in segment['hashes']]
+        previews = [preview for segment in self._segments for preview in segment['previews']]
+        old = [segment['name'] for segment in self._segments]
+        name = self._write_segment(hashes, matrix, probas, previews)
+        self._write_manifest([name], n_features)
+        for stale in old:
+            shutil.rmtree(self.path / stale, ignore_errors=True)
+        print(f"🗜️ Vector store compacted: {len(old)} segments -> 1", file=sys.stderr)
+        self._prune_paths()
+
+    def _stored_hashes(self):
+        """Hashes présents dans toutes les versions du stock (pas seulement celle-ci)"""
+        stored = set()
+        for manifest_path in self.root.glob('*/manifest.json'):
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+                for name in manifest['segments']:
+                    hashes = np.load(manifest_path.parent / name / 'hashes.npy', mmap_mode='r')
+                    stored.update(digest.decode('ascii') for digest in hashes)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Cannot read {manifest_path}: {e}", file=sys.stderr)
+                # Version illisible: ne rien élaguer plutôt que tout réhacher
+                return None
+        return stored
+
+    def _prune_paths(self):
+        """
+        Retire de paths.json les chemins disparus et ceux dont le contenu
+        n'est plus dans le stock: le fichier ne grandit pas avec chaque
+        chemin jamais vu
+        """
+        stored = self._stored_hashes()
+        if stored is None:
+            return
+        # Relu sur disque: entrées ajoutées par d'autres processus
+        memo = self._load_path_hashes()
+        memo.update(self._path_hashes or {})
+        kept = {path: entry for path, entry in memo.items()
+                if entry[2] in stored and os.path.exists(path)}
+        if len(kept) < len(memo):
+            _write_json(self.root / 'paths.json', kept)
+            print(f"🗜️ Pruned {len(memo) - len(kept)} stale paths from the vector store",
+                  file=sys.stderr)
+        self._path_hashes = kept
+        self._hash_paths = None
+
+    # ==================== LECTURE / AJOUT ====================
+
+    def lookup(self, hashes):
+        """Hashes déjà dans le stock (set)"""
+        with self._lock:
+            self._refresh()
+            return {digest for digest in hashes if digest in self._rows}
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+    def hashes(self):
+        """Tous les hashes du stock (ordre des segments)"""
+        with self._lock:
+            self._refresh()
+            return list(self._rows)
+
+    def paths_by_hash(self):
+        """Dernier chemin connu de chaque contenu (d'après paths.json)"""
+        with self._lock:
+            if self._path_hashes is None:
+                self._path_hashes = self._load_path_hashes()
+            if self._hash_paths is None:
+                self._hash_paths = {entry[2]: path for path, entry in self._path_hashes.items()}
+            return self._hash_paths
+
+    def add(self, hashes, matrix, probas, texts):
+        """Ajoute un segment (les hashes déjà présents sont ignorés)"""
+        with self._lock:
+            self._refresh()
+            new = []
+            seen = set()
+            for i, digest in enumerate(hashes):
+                if digest not in self._rows and digest not in seen:
+                    seen.add(digest)
+                    new.append(i)
+            if not new:
+                return 0
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            name = self._write_segment(
+                [hashes[i] for i in new], matrix[new], np.asarray(probas)[new],
+                [texts[i][:PREVIEW_CHARS] for i in new]
+            )
+            names = [segment['name'] for segment in self._segments] + [name]
+            self._write_manifest(names, matrix.shape[1])
+            self._refresh()
+            if len(self._segments) > MAX_SEGMENTS:
+                self._compact(matrix.shape[1])
+                self._refresh()
+            return len(new)
+
+    def get(self, hashes):
+        """
+        Lignes stockées pour les hashes donnés (tous doivent être présents)
+
+        Returns:
+            (matrice CSR float32, probabilités, previews), dans l'ordre de hashes
+        """
+        with self._lock:
+            self._refresh()
+            segments, rows = self._segments, self._rows
+        located = np.array([rows[digest] for digest in hashes], dtype=np.int64).reshape(-1, 2)
+        if not len(located):
+            return None, None, []
+
+        # Une extraction de lignes par segment, puis remise dans l'ordre demandé
+        blocks, probas, previews = [], [], []
+        positions = np.empty(len(located), dtype=np.int64)
+        start = 0
+        for s, segment in enumerate(segments):
+            indices = np.flatnonzero(located[:, 0] == s)
+            if not len(indices):
+                continue
+            seg_rows = located[indices, 1]
+            blocks.append(segment['matrix'][seg_rows])
+            probas.append(np.asarray(segment['probas'][seg_rows]))
+            previews.extend(segment['previews'][row] for row in seg_rows)
+            positions[indices] = np.arange(start, start + len(indices))
+            start += len(indices)
+
+        matrix = sp.vstack(blocks).tocsr()[positions]
+        return matrix, np.vstack(probas)[positions], [previews[p] for p in positions]
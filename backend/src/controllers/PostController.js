@@ -194,6 +194,7 @@ export const screenResumes = async (request, reply) => {
     const files = [];
     let nb_postes = 3;
     let min_score = 0.3;
+    let dedup;
 
     request.log.info(`📦 Body keys: ${Object.keys(request.body || {})}`);
 
@@ -219,6 +220,10 @@ export const screenResumes = async (request, reply) => {
     if (request.body?.min_score) {
       min_score = parseFloat(request.body.min_score.value || request.body.min_score) || 0.3;
     }
+    // CV en double regroupés avant le scoring: 'off', 'exact' ou 'near'
+    if (request.body?.dedup) {
+      dedup = request.body.dedup.value || request.body.dedup;
+    }
 
     if (files.length === 0) {
       request.log.info(`❌ No files found in body`);
@@ -232,13 +237,27 @@ export const screenResumes = async (request, reply) => {
     request.log.info(`🎯 Screening params: nb_postes=${nb_postes}, min_score=${min_score}`);
 
     // 3. Lancer le screening avec le service Python
+    // Le job est annulé si le client se déconnecte avant la réponse
+    const abort = new AbortController();
+    reply.raw.on('close', () => {
+      if (!reply.raw.writableFinished) {
+        abort.abort();
+      }
+    });
+
     const screeningResult = await cvScreeningService.screenResumes(
       job,
       files,
       {
         nb_postes,
         min_score,
-        cleanup: false // Garder les fichiers pour référence
+        dedup,
+        cleanup: false, // Garder les fichiers pour référence
+        tenant: request.user?.id || request.ip,
+        signal: abort.signal,
+        onProgress: (event) => {
+          request.log.info(`⏳ Screening progress: ${event.extracted}/${event.total} files, ${event.partial.length} provisional candidates`);
+        }
       }
     );
 
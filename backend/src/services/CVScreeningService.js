@@ -2,6 +2,7 @@
 import { spawn } from 'child_process';
 import fs from 'fs';
 import path from 'path';
+import readline from 'readline';
 import { fileURLToPath } from 'url';
 
 const __filename = fileURLToPath(import.meta.url);
@@ -13,15 +14,19 @@ const __dirname = path.dirname(__filename);
 class CVScreeningService {
   constructor() {
     this.pythonScriptPath = path.join(__dirname, '../../AI/ai3.py');
-    this.tempDir = path.join(__dirname, '../../temp');
     this.uploadsDir = path.join(__dirname, '../../uploads/resumes');
 
+    // Worker Python longue durée (modèle chargé une seule fois)
+    this.worker = null;
+    this.pendingJobs = new Map();
+    this.nextJobId = 1;
+
     // Créer les dossiers s'ils n'existent pas
     this.ensureDirectories();
   }
 
   ensureDirectories() {
-    [this.tempDir, this.uploadsDir].forEach(dir => {
+    [this.uploadsDir].forEach(dir => {
       if (!fs.existsSync(dir)) {
         fs.mkdirSync(dir, { recursive: true });
       }
@@ -89,17 +94,146 @@ class CVScreeningService {
   }
 
   /**
-   * Exécute le script Python de screening
+   * Démarre le worker Python s'il ne tourne pas déjà
    */
-  async runPythonScreening(jobData, resumePaths) {
+  getWorker() {
+    if (this.worker) {
+      return this.worker;
+    }
+
+    console.log('🐍 Launching Python screening worker...');
+
+    const args = [this.pythonScriptPath, '--serve'];
+    // Métriques par étape (temps, mémoire) ajoutées à chaque réponse
+    if (process.env.SCREENING_METRICS === '1') {
+      args.push('--metrics');
+    }
+    // Score de catégorie: 'forest' (défaut) ou 'linear' (plus rapide)
+    if (process.env.SCREENING_CLASSIFIER) {
+      args.push('--classifier', process.env.SCREENING_CLASSIFIER);
+    }
+    // Vectorisation des CV: 'compact' (même modèle, plus rapide) ou 'hashing'
+    if (process.env.SCREENING_FEATURIZER) {
+      args.push('--featurizer', process.env.SCREENING_FEATURIZER);
+    }
+    // CV en double regroupés avant le scoring ('exact' ou 'near')
+    if (process.env.SCREENING_DEDUP) {
+      args.push('--dedup', process.env.SCREENING_DEDUP);
+    }
+    // Vecteurs des CV gardés sur disque entre deux screenings
+    if (process.env.SCREENING_VECTOR_STORE === '1') {
+      args.push('--vector-store');
+    }
+    // Jobs répartis sur N processus qui partagent le modèle en mémoire mappée
+    if (process.env.SCREENING_PROCESSES) {
+      args.push('--processes', process.env.SCREENING_PROCESSES);
+    }
+    // File asyncio: progression, annulation et limite de jobs par tenant
+    if (this.queueEnabled()) {
+      args.push('--queue');
+    }
+
+    const worker = spawn('python', args);
+
+    // Une réponse JSON par ligne sur stdout
+    const lines = readline.createInterface({ input: worker.stdout });
+    lines.on('line', (line) => {
+      let response;
+      try {
+        response = JSON.parse(line);
+      } catch (error) {
+        console.error('Unexpected worker output:', line);
+        return;
+      }
+
+      const pending = this.pendingJobs.get(response.id);
+      if (!pending) {
+        return;
+      }
+
+      // Événement de progression: le job continue
+      if (response.event) {
+        if (pending.onProgress) {
+          pending.onProgress(response);
+        }
+        return;
+      }
+      this.pendingJobs.delete(response.id);
+
+      if (response.metrics) {
+        console.log('📈 Screening metrics:', JSON.stringify(response.metrics));
+      }
+
+      if (response.cancelled) {
+        pending.reject(new Error('Screening cancelled'));
+      } else if (response.error) {
+        pending.reject(new Error(`Python screening failed: ${response.error}`));
+      } else {
+        console.log('✅ Python screening completed');
+        pending.resolve(response.results);
+      }
+    });
+
+    worker.stderr.on('data', (data) => {
+      console.error('Python error:', data.toString());
+    });
+
+    const failPending = (error) => {
+      this.pendingJobs.forEach(({ reject }) => reject(error));
+      this.pendingJobs.clear();
+      // Un ancien worker ne doit pas effacer celui qui l'a remplacé
+      if (this.worker === worker) {
+        this.worker = null;
+      }
+    };
+
+    worker.on('close', (code) => {
+      failPending(new Error(`Python worker exited with code ${code}`));
+    });
+
+    worker.on('error', (error) => {
+      failPending(new Error(`Failed to start Python process: ${error.message}`));
+    });
+
+    // Écriture vers un worker déjà arrêté (EPIPE): sans ce gestionnaire,
+    // l'erreur du flux arrêterait le processus Node
+    worker.stdin.on('error', (error) => {
+      failPending(new Error(`Python worker stdin failed: ${error.message}`));
+      worker.kill();
+    });
+
+    this.worker = worker;
+    return worker;
+  }
+
+  queueEnabled() {
+    return process.env.SCREENING_QUEUE === '1';
+  }
+
+  /**
+   * Demande l'arrêt d'un job en cours (mode SCREENING_QUEUE=1)
+   */
+  cancelScreening(id) {
+    if (!this.worker || !this.pendingJobs.has(id)) {
+      return;
+    }
+    this.worker.stdin.write(JSON.stringify({ cancel: id }) + '\n');
+  }
+
+  /**
+   * Envoie un job de screening au worker Python
+   *
+   * Avec SCREENING_QUEUE=1: onProgress reçoit les événements de progression
+   * (fichiers extraits, CV scorés, classement provisoire), signal
+   * (AbortSignal) annule le job et tenant limite les jobs simultanés d'un
+   * même client.
+   */
+  async runPythonScreening(jobData, resumePaths, { onProgress, signal, tenant } = {}) {
     return new Promise((resolve, reject) => {
-      // Créer un fichier JSON temporaire avec les données
-      const tempDataFile = path.join(
-        this.tempDir,
-        `job_data_${Date.now()}.json`
-      );
+      const id = String(this.nextJobId++);
 
       const dataToSend = {
+        id,
         job: {
           category: jobData.jobTitle,
           description: this.formatJobDescription(jobData),
@@ -109,71 +243,59 @@ class CVScreeningService {
           major: jobData.Major,
           skills: jobData.Skills || [],
           softSkills: jobData.SoftSkills || [],
-          experience: jobData.Exp_Year || 0
+          experience: jobData.Exp_Year || 0,
+          // Pré-filtre optionnel ('bound' = conservateur, 'heuristic')
+          prefilter: jobData.prefilter
         },
         resume_paths: resumePaths
       };
+      // Déduplication de cette requête ('off', 'exact', 'near'), sinon celle du worker
+      if (jobData.dedup) {
+        dataToSend.dedup = jobData.dedup;
+      }
+      if (this.queueEnabled()) {
+        dataToSend.tenant = tenant;
+        dataToSend.progress = Boolean(onProgress);
+      }
 
-      // Sauvegarder les données dans le fichier temporaire
-      fs.writeFileSync(tempDataFile, JSON.stringify(dataToSend, null, 2));
-
-      console.log('📄 Temp data file created:', tempDataFile);
-      console.log('🐍 Launching Python script...');
-
-      // Lancer le script Python
-      const pythonProcess = spawn('python', [
-        this.pythonScriptPath,
-        tempDataFile
-      ]);
-
-      let dataString = '';
-      let errorString = '';
-
-      pythonProcess.stdout.on('data', (data) => {
-        const output = data.toString();
-        console.log('Python output:', output);
-        dataString += output;
-      });
-
-      pythonProcess.stderr.on('data', (data) => {
-        const error = data.toString();
-        console.error('Python error:', error);
-        errorString += error;
-      });
-
-      pythonProcess.on('close', (code) => {
-        // Nettoyer le fichier temporaire
-        try {
-          fs.unlinkSync(tempDataFile);
-        } catch (err) {
-          console.error('Error deleting temp file:', err);
-        }
-
-        if (code !== 0) {
-          reject(new Error(
-            `Python script exited with code ${code}: ${errorString}`
-          ));
-          return;
-        }
-
-        try {
-          // Parser les résultats JSON
-          const results = JSON.parse(dataString);
-          console.log('✅ Python screening completed');
-          resolve(results);
-        } catch (error) {
-          reject(new Error(
-            `Failed to parse Python output: ${error.message}\\nOutput: ${dataString}`
-          ));
-        }
-      });
+      if (signal?.aborted) {
+        reject(new Error('Screening cancelled'));
+        return;
+      }
+      this.pendingJobs.set(id, { resolve, reject, onProgress });
+      if (signal && this.queueEnabled()) {
+        signal.addEventListener('abort', () => this.cancelScreening(id), { once: true });
+      }
 
-      pythonProcess.on('error', (error) => {
-        reject(new Error(`Failed to start Python process: ${error.message}`));
-      });
+      try {
+        this.getWorker().stdin.write(JSON.stringify(dataToSend) + '\n');
+      } catch (error) {
+        this.pendingJobs.delete(id);
+        reject(new Error(`Failed to send job to Python worker: ${error.message}`));
+      }
     });
   }
 
+  /**
+   * Ajoute le nom et la taille du fichier d'origine à chaque résultat
+   * (et aux CV en double regroupés avec lui)
+   */
+  enrichResults(results, savedFiles) {
+    const byPath = new Map(savedFiles.map(file => [file.savedPath, file]));
+    return results.map(result => ({
+      ...result,
+      originalFileName: savedFiles[result.candidate_id - 1]?.originalName,
+      fileSize: savedFiles[result.candidate_id - 1]?.size,
+      ...(result.duplicates && {
+        duplicates: result.duplicates.map(duplicate => ({
+          ...duplicate,
+          originalFileName: byPath.get(duplicate.file_path)?.originalName
+        }))
+      }),
+      processedAt: new Date().toISOString()
+    }));
+  }
+
   /**
    * Nettoie les fichiers uploadés (optionnel)
    */
@@ -211,20 +333,26 @@ class CVScreeningService {
       const jobData = {
         ...jobObj,
         nb_postes: options.nb_postes || 3,
-        min_score: options.min_score || 0.3
+        min_score: options.min_score || 0.3,
+        prefilter: options.prefilter,
+        dedup: options.dedup
       };
+      // Progression relayée avec les résultats provisoires enrichis
+      const onProgress = options.onProgress && ((event) => options.onProgress({
+        ...event,
+        partial: this.enrichResults(event.partial, savedFiles)
+      }));
       console.log(`📋 JobData: ${JSON.stringify({ jobTitle: jobData.jobTitle, jobDescription: jobData.jobDescription?.substring(0, 50) })}`);
 
       // 3. Exécuter le script Python
-      const results = await this.runPythonScreening(jobData, resumePaths);
+      const results = await this.runPythonScreening(jobData, resumePaths, {
+        onProgress,
+        signal: options.signal,
+        tenant: options.tenant
+      });
 
       // 4. Enrichir les résultats avec les métadonnées
-      const enrichedResults = results.map(result => ({
-        ...result,
-        originalFileName: savedFiles[result.candidate_id - 1]?.originalName,
-        fileSize: savedFiles[result.candidate_id - 1]?.size,
-        processedAt: new Date().toISOString()
-      }));
+      const enrichedResults = this.enrichResults(results, savedFiles);
 
       // 5. Optionnel: Nettoyer les fichiers
       if (options.cleanup) {
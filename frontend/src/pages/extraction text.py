@@ -1,49 +1,36 @@
 # ========================== EXTRACTION D'INFORMATIONS ==========================
+# Mêmes règles que le screening: backend/AI/field_extraction.py
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "backend" / "AI"))
+from field_extraction import FieldExtractor, extract_email, extract_experience, extract_phone
+
 def extraire_email(texte):
     """Extrait l'email du CV"""
-    pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    emails = re.findall(pattern, texte)
-    return emails[0] if emails else None
+    return extract_email(texte)
 
 def extraire_telephone(texte):
-    """Extrait le numéro de téléphone du CV"""
-    patterns = [
-        r'\+?\d{1,3}[-.\s]?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}',
-        r'\d{2}[-.\s]?\d{3}[-.\s]?\d{3}',
-    ]
-    for pattern in patterns:
-        telephones = re.findall(pattern, texte)
-        if telephones:
-            return telephones[0]
-    return None
+    """Extrait le numéro de téléphone du CV (hors chiffres d'un email)"""
+    return extract_phone(texte)
 
-def extraire_competences(texte, liste_competences):
-    """Extrait les compétences trouvées dans le CV"""
-    texte_lower = texte.lower()
-    competences_trouvees = []
-    for comp in liste_competences:
-        if comp.lower() in texte_lower:
-            competences_trouvees.append(comp)
-    return competences_trouvees
+def extraire_competences(texte, liste_competences, extracteur=None):
+    """Extrait les compétences trouvées dans le CV (mots entiers et synonymes,
+    ex: NodeJS -> Node.js). Pour plusieurs CV, passer un FieldExtractor
+    construit une fois: le dictionnaire n'est compilé qu'une fois."""
+    if extracteur is None:
+        extracteur = FieldExtractor(liste_competences)
+    return extracteur.extract_skills(texte)
 
 def extraire_experience(texte):
     """Estime l'expérience en années"""
     # Recherche de patterns comme "5 ans d'expérience", "3 années"
-    patterns = [
-        r'(\d+)\s*ans?\s+d[\'e]\s*expérience',
-        r'(\d+)\s+années?\s+d[\'e]\s*expérience',
-        r'expérience[:\s]+(\d+)\s*ans?',
-        r'(\d+)\+?\s*years?\s+(?:of\s+)?experience',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, texte.lower())
-        if match:
-            return int(match.group(1))
-    return 0
+    return extract_experience(texte)
 
 # ========================== TRAITEMENT MULTIPLE ==========================
-def traiter_cv(fichier_path, competences_requises, output_dir="resultats_cv"):
-    """Traite un seul CV et retourne les informations extraites"""
+def traiter_cv(fichier_path, competences_requises, output_dir="resultats_cv", extracteur=None):
+    """Traite un seul CV et retourne les informations extraites
+    (extracteur: FieldExtractor des compétences, partagé par un lot de CV)"""
     os.makedirs(output_dir, exist_ok=True)
     
     nom_fichier = os.path.basename(fichier_path)
@@ -65,7 +52,7 @@ def traiter_cv(fichier_path, competences_requises, output_dir="resultats_cv"):
             "chemin": fichier_path,
             "email": extraire_email(texte),
             "telephone": extraire_telephone(texte),
-            "competences": extraire_competences(texte, competences_requises),
+            "competences": extraire_competences(texte, competences_requises, extracteur),
             "experience_annees": extraire_experience(texte),
             "photo_profil": None,
             "texte_extrait": texte_path,
@@ -85,14 +72,16 @@ def traiter_cv(fichier_path, competences_requises, output_dir="resultats_cv"):
         return None
 
 def traiter_plusieurs_cv(fichiers_paths, competences_requises):
-    """Traite plusieurs CV et génère un rapport"""
+    """Traite plusieurs CV et génère un rapport
+    (gros lots ou reprise d'un lot interrompu: traiter_plusieurs_cv_en_flux)"""
     resultats = []
     
     print(f"\n🚀 Traitement de {len(fichiers_paths)} CV...\n")
     print("="*60)
     
+    extracteur = FieldExtractor(competences_requises)
     for fichier in fichiers_paths:
-        cv_info = traiter_cv(fichier, competences_requises)
+        cv_info = traiter_cv(fichier, competences_requises, extracteur=extracteur)
         if cv_info:
             resultats.append(cv_info)
     
@@ -108,4 +97,63 @@ def traiter_plusieurs_cv(fichiers_paths, competences_requises):
     print(f"✅ Traitement terminé: {len(resultats)}/{len(fichiers_paths)} CV traités avec succès")
     print(f"📊 Rapport sauvegardé: {rapport_path}")
     
-    return resultats
\ No newline at end of file
+    return resultats
+
+def traiter_plusieurs_cv_en_flux(fichiers_paths, competences_requises, rapport_path=None):
+    """Comme traiter_plusieurs_cv, pour les gros lots: le rapport est écrit au
+    fil de l'eau sans garder les résultats en mémoire (NDJSON: une ligne par
+    CV, écrite dès qu'il est traité, puis une ligne de synthèse
+    {"type": "summary", ...}). Pour reprendre un lot interrompu, passer le
+    rapport existant: les CV déjà présents sont sautés.
+    Pour le screening, voir backend/AI/report_sink.py (ai3.py --report).
+    Retourne le chemin du rapport."""
+    output_dir = "utils/rapport_cv"
+    os.makedirs(output_dir, exist_ok=True)
+    if rapport_path is None:
+        rapport_path = os.path.join(output_dir, f"rapport_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson")
+    
+    # Reprise: CV déjà dans le rapport (une dernière ligne tronquée est ignorée,
+    # la synthèse de l'exécution précédente est retirée)
+    deja_traites = set()
+    if os.path.exists(rapport_path):
+        tmp_path = rapport_path + ".tmp"
+        with open(rapport_path, "rb") as f, open(tmp_path, "wb") as tmp:
+            for ligne in f:
+                if not ligne.endswith(b"\n"):
+                    break
+                try:
+                    enregistrement = json.loads(ligne)
+                except ValueError:
+                    break
+                if enregistrement.get("type") != "summary":
+                    deja_traites.add(enregistrement["chemin"])
+                    tmp.write(ligne)
+        os.replace(tmp_path, rapport_path)
+    
+    a_traiter = [fichier for fichier in fichiers_paths if fichier not in deja_traites]
+    print(f"\n🚀 Traitement de {len(a_traiter)} CV ({len(deja_traites)} déjà dans le rapport)...\n")
+    print("="*60)
+    
+    nb_succes = 0
+    extracteur = FieldExtractor(competences_requises)
+    with open(rapport_path, "a", encoding="utf-8") as rapport:
+        for fichier in a_traiter:
+            cv_info = traiter_cv(fichier, competences_requises, extracteur=extracteur)
+            if cv_info:
+                rapport.write(json.dumps(cv_info, ensure_ascii=False) + "\n")
+                rapport.flush()
+                nb_succes += 1
+        
+        rapport.write(json.dumps({
+            "type": "summary",
+            "cv_traites": nb_succes,
+            "cv_en_echec": len(a_traiter) - nb_succes,
+            "cv_deja_traites": len(deja_traites),
+            "date_fin": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }, ensure_ascii=False) + "\n")
+    
+    print("\n" + "="*60)
+    print(f"✅ Traitement terminé: {nb_succes}/{len(a_traiter)} CV traités avec succès")
+    print(f"📊 Rapport sauvegardé: {rapport_path}")
+    
+    return rapport_path
\ No newline at end of file